@@ -0,0 +1,902 @@
+"""
+JARVIS benchmarks
+Micro-benchmarks for the hot paths of the assistant.
+
+Usage:
+    python benchmark.py intents [--queries 5000]
+    python benchmark.py wakeword [--templates DIR --positives DIR --negatives DIR]
+    python benchmark.py recognizers --corpus DIR [--backends google vosk sphinx]
+    python benchmark.py http [--requests 50]
+    python benchmark.py pipeline [--repeat 20] [--corpus FILE] [--output results.json] [--profile out.prof]
+    xvfb-run python benchmark.py gui [--seconds 10] [--output gui.json]
+    python benchmark.py startup [--runs 5] [--output startup.json]
+    python benchmark.py load [--socket PATH | --tcp HOST:PORT] [--clients 8] [--requests 500] [--window 16]
+    python benchmark.py files [--files 50000] [--queries 1000] [--output files.json]
+    python benchmark.py translate [--backend stub|dictionary|argos|libretranslate] [--target es] [--repeat 20]
+
+The pipeline and gui benchmarks emit JSON so results can be compared
+between releases.
+"""
+
+import argparse
+import contextlib
+import copy
+import cProfile
+import datetime
+import json
+import os
+import platform
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import wave
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+import numpy as np
+import speech_recognition as sr
+
+import jarvis as jarvis_module
+from jarvis import (Jarvis, METRICS, IntentMatcher, WakeWordGate, HttpClient, ResponseCache, CommandServer,
+                    FileIndex, Translator, LibreTranslateBackend, ArgosBackend, DictionaryBackend,
+                    GoogleBackend, VoskBackend, SphinxBackend, parse_tcp_address)
+
+SAMPLE_QUERIES = [
+    "hello jarvis",
+    "what time is it",
+    "what is the date today",
+    "weather in london",
+    "what is the weather in paris",
+    "tell me the latest news",
+    "system information",
+    "calculate 25 times 17",
+    "take a screenshot",
+    "check internet speed",
+    "who is albert einstein",
+    "what is quantum computing",
+    "search for python tutorials",
+    "open chrome",
+    "launch visual studio code",
+    "what is my name",
+    "who are you",
+    "this sentence matches nothing at all"
+]
+
+# Safe to replay against a live daemon: no screenshots, speed tests or apps
+LOAD_QUERIES = [
+    "hello jarvis",
+    "what time is it",
+    "what is the date today",
+    "who are you",
+    "what is my name",
+    "system information",
+    "weather in london",
+    "tell me the latest news",
+    "this sentence matches nothing at all"
+]
+
+
+def linear_scan(commands, priority, query):
+    """The original process_command dispatch, kept as a baseline"""
+    for intent in priority:
+        if any(word in query for word in commands[intent]):
+            return intent
+    return None
+
+
+def bench_intents(n_queries: int) -> None:
+    """Replay n_queries utterances through the linear scan and the compiled matcher"""
+    jarvis = Jarvis.__new__(Jarvis)
+    commands = jarvis.load_commands()
+    priority = list(jarvis.load_handlers())
+
+    start = time.perf_counter()
+    matcher = IntentMatcher(commands, priority=priority)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    rng = random.Random(42)
+    queries = [rng.choice(SAMPLE_QUERIES) for _ in range(n_queries)]
+
+    start = time.perf_counter()
+    for query in queries:
+        linear_scan(commands, priority, query)
+    linear = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for query in queries:
+        matcher.match(query)
+    compiled = time.perf_counter() - start
+
+    print(f"Matcher build time: {build_ms:.2f} ms")
+    print(f"Linear scan:      {linear / n_queries * 1e6:8.2f} us/query")
+    print(f"Compiled matcher: {compiled / n_queries * 1e6:8.2f} us/query")
+
+    disagreements = [q for q in SAMPLE_QUERIES
+                     if linear_scan(commands, priority, q) != next(
+                         (m.intent for m in matcher.match(q) if m.intent in priority), None)]
+    for query in disagreements:
+        print(f"  routed differently: {query!r}")
+
+
+def bench_wakeword(templates: str, positives: str, negatives: str, threshold: float) -> None:
+    """Replay recorded WAV fixtures through the wake word gate.
+
+    Positives should start with the wake word; negatives are speech, music or
+    room noise that must never reach the recognizer.
+    """
+    gate = WakeWordGate(templates, threshold=threshold, follow_up_seconds=0)
+    if not gate.templates:
+        print(f"No templates in {templates}; record a few WAVs of the wake word there")
+        return
+
+    results = {}
+    timings = []
+    for label, directory in (("positives", positives), ("negatives", negatives)):
+        detected = total = 0
+        for path in sorted(Path(directory).glob("*.wav")):
+            samples, rate = gate.read_wav(str(path))
+            pcm = (samples * 32767).astype("<i2").tobytes()
+            start = time.perf_counter()
+            woke = []
+            gate.on_wake = lambda: woke.append(True)
+            forwarded = gate.filter(sr.AudioData(pcm, rate, 2))
+            timings.append(time.perf_counter() - start)
+            total += 1
+            detected += bool(forwarded is not None or woke)
+        results[label] = (detected, total)
+
+    hits, positives_total = results["positives"]
+    false_accepts, negatives_total = results["negatives"]
+    print(f"Detection rate:    {hits}/{positives_total}")
+    print(f"False accepts:     {false_accepts}/{negatives_total}")
+    print(f"Gate stats:        {gate.stats()}")
+    if timings:
+        print(f"Gate cost:         {sum(timings) / len(timings) * 1000:.2f} ms/segment")
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """Word-level Levenshtein distance divided by the reference length"""
+    ref = reference.lower().split()
+    hyp = hypothesis.lower().split()
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hyp, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1,
+                               previous[j - 1] + (ref_word != hyp_word)))
+        previous = current
+    return previous[-1] / max(len(ref), 1)
+
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def bench_recognizers(corpus: str, names, language: str, vosk_model: str) -> None:
+    """Feed a corpus of WAV files (with .txt transcripts) through each backend"""
+    recognizer = sr.Recognizer()
+    factories = {
+        "google": lambda: GoogleBackend(recognizer),
+        "vosk": lambda: VoskBackend(vosk_model),
+        "sphinx": lambda: SphinxBackend(recognizer)
+    }
+
+    samples = []
+    for path in sorted(Path(corpus).glob("*.wav")):
+        transcript = path.with_suffix(".txt")
+        if not transcript.exists():
+            continue
+        with wave.open(str(path), "rb") as wav:
+            duration = wav.getnframes() / wav.getframerate()
+        with sr.AudioFile(str(path)) as source:
+            audio = recognizer.record(source)
+        samples.append((audio, duration, transcript.read_text().strip()))
+    if not samples:
+        print(f"No .wav/.txt pairs found in {corpus}")
+        return
+
+    print(f"{'backend':<8} {'RTF':>6} {'p50 ms':>8} {'p95 ms':>8} {'WER':>6} {'errors':>7}")
+    for name in names:
+        backend = factories[name]()
+        if not backend.available():
+            print(f"{name:<8} not available")
+            continue
+        latencies, errors, wers = [], 0, []
+        audio_seconds = 0.0
+        for audio, duration, reference in samples:
+            start = time.perf_counter()
+            try:
+                hypothesis = backend.recognize(audio, language)
+            except sr.UnknownValueError:
+                hypothesis = ""
+            except Exception:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+            audio_seconds += duration
+            wers.append(word_error_rate(reference, hypothesis))
+        if not latencies:
+            print(f"{name:<8} every request failed")
+            continue
+        rtf = sum(latencies) / audio_seconds
+        print(f"{name:<8} {rtf:6.2f} {percentile(latencies, 50) * 1000:8.0f} "
+              f"{percentile(latencies, 95) * 1000:8.0f} {statistics.mean(wers):6.2%} {errors:7d}")
+
+
+class StubUpstream(BaseHTTPRequestHandler):
+    """Local stand-in for the web APIs with healthy, slow and failing routes"""
+
+    protocol_version = "HTTP/1.1"
+    # Send headers and body in one segment so delayed ACKs don't skew timings
+    wbufsize = 64 * 1024
+    connections = set()
+    flaky_failures = {}
+    lock = threading.Lock()
+
+    def do_GET(self):
+        with self.lock:
+            self.connections.add(self.client_address)
+        if self.path.startswith("/slow"):
+            time.sleep(0.5)
+        elif self.path.startswith("/hang"):
+            time.sleep(30)
+        elif self.path.startswith("/flaky"):
+            with self.lock:
+                failures = self.flaky_failures.get(self.path, 0)
+                self.flaky_failures[self.path] = failures + 1
+            if failures < 2:
+                self.send_response(503)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+        body = json.dumps({"status": "ok", "path": self.path}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def bench_http(n_requests: int) -> None:
+    """Exercise HttpClient against a local stub server"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubUpstream)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    client = HttpClient(timeout=1.0, retries=2, backoff=0.05, max_concurrency=4)
+
+    start = time.perf_counter()
+    for i in range(n_requests):
+        client.get_json(f"{base}/ok", params={"i": i})
+    elapsed = time.perf_counter() - start
+    print(f"Keep-alive:  {n_requests} requests in {elapsed * 1000:.0f} ms "
+          f"over {len(StubUpstream.connections)} connection(s)")
+
+    start = time.perf_counter()
+    data = client.get_json(f"{base}/flaky/1")
+    print(f"Flaky:       recovered with {data['status']!r} after retries "
+          f"in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client.get, args=(f"{base}/slow",)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    print(f"Slow x8:     {(time.perf_counter() - start) * 1000:.0f} ms with 4 concurrent slots")
+
+    start = time.perf_counter()
+    try:
+        client.get(f"{base}/hang")
+        print("Hang:        unexpectedly returned")
+    except Exception as e:
+        print(f"Hang:        gave up after {(time.perf_counter() - start) * 1000:.0f} ms "
+              f"({type(e).__name__})")
+
+    client.close()
+    server.shutdown()
+
+
+NEWS_HEADLINES = [
+    "Central bank holds interest rates steady as inflation cools",
+    "Storm brings heavy rain and strong winds to the east coast",
+    "Local team wins the championship after a dramatic final",
+    "Scientists discover a new species of frog in the rainforest",
+    "City council approves plan for a new public library",
+    "Tech company unveils a faster and cheaper electric car",
+    "Schools prepare for the start of the new academic year",
+    "Health officials urge people to get the flu vaccine",
+    "Airport expands with a new terminal and more flights",
+    "Researchers say the ocean is warming faster than expected"
+]
+
+
+class StubHttp:
+    """Canned upstream responses standing in for HttpClient"""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+
+    def get_json(self, url, params=None, timeout=None):
+        if self.latency:
+            time.sleep(self.latency)
+        if "openweathermap" in url:
+            return {"cod": 200, "main": {"temp": 18.5, "humidity": 60},
+                    "weather": [{"description": "light rain"}], "wind": {"speed": 3.2}}
+        if "newsapi" in url:
+            return {"status": "ok", "articles": [{"title": title} for title in NEWS_HEADLINES]}
+        if "wikipedia" in url:
+            return {"query": {"pages": {"1": {"index": 1, "extract": "A stub article. It has two sentences."}}}}
+        if "wolframalpha" in url:
+            return {"queryresult": {"pods": [{"primary": True, "subpods": [{"plaintext": "425"}]}]}}
+        raise ValueError(f"No stub for {url}")
+
+    def post_json(self, url, payload, timeout=None):
+        if self.latency:
+            time.sleep(self.latency)
+        if url.endswith("/translate"):
+            # Reverse each word: as much work per phrase as a lookup, no model needed
+            return {"translatedText": [" ".join(word[::-1] for word in text.split()) for text in payload["q"]]}
+        raise ValueError(f"No stub for {url}")
+
+
+class StubSpeedtest:
+    def download(self):
+        return 95_000_000
+
+    def upload(self):
+        return 20_000_000
+
+
+class StubScreenshot:
+    def save(self, filename):
+        pass
+
+
+@contextlib.contextmanager
+def scratch_directory():
+    """Run in a throwaway directory with its own config.json.
+
+    Jarvis reads its config and writes its caches relative to the working
+    directory, so this keeps benchmarks away from the checkout's files.
+    """
+    previous = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        config = copy.deepcopy(jarvis_module.DEFAULT_CONFIG)
+        config["logging"]["file"] = os.path.join(workdir, "jarvis.log")
+        config["files"]["index"] = False
+        for api in config["apis"]:
+            config["apis"][api] = "benchmark"
+        Path(workdir, "config.json").write_text(json.dumps(config, indent=4))
+        os.chdir(workdir)
+        try:
+            yield workdir
+        finally:
+            os.chdir(previous)
+
+
+@contextlib.contextmanager
+def stubbed_jarvis(network_latency: float, use_cache: bool):
+    """A Jarvis whose speech, network and desktop side effects are stubbed out"""
+    with scratch_directory():
+        jarvis = Jarvis(voice=False)
+        jarvis.http = StubHttp(network_latency)
+        if not use_cache:
+            jarvis.responses = ResponseCache({})
+        try:
+            yield jarvis
+        finally:
+            jarvis.executor.shutdown()
+
+
+@contextlib.contextmanager
+def stubbed_side_effects():
+    """Stub out desktop side effects; handler output goes to stderr, keeping stdout for the report"""
+    with contextlib.ExitStack() as stack:
+        # Replace the lazy proxies outright: touching their attributes would import the real modules
+        stack.enter_context(mock.patch.object(jarvis_module, "speedtest", SimpleNamespace(Speedtest=StubSpeedtest)))
+        stack.enter_context(mock.patch.object(jarvis_module, "pyautogui", SimpleNamespace(screenshot=StubScreenshot)))
+        stack.enter_context(mock.patch.object(jarvis_module.webbrowser, "open", lambda url: True))
+        stack.enter_context(mock.patch.object(jarvis_module.AppLauncher, "launch", lambda self, entry: None))
+        stack.enter_context(contextlib.redirect_stdout(sys.stderr))
+        yield
+
+
+def summarize(values, scale: float) -> dict:
+    return {"p50": percentile(values, 50) * scale, "p95": percentile(values, 95) * scale,
+            "max": max(values) * scale, "mean": statistics.mean(values) * scale}
+
+
+def bench_pipeline(corpus, repeat: int, network_latency: float, use_cache: bool,
+                   output, profile) -> None:
+    """Drive process_command headlessly and report per-intent costs as JSON"""
+    queries = [q for q in SAMPLE_QUERIES if q]
+    if corpus:
+        queries = [line.strip() for line in Path(corpus).read_text().splitlines() if line.strip()]
+
+    with stubbed_side_effects(), stubbed_jarvis(network_latency, use_cache) as jarvis:
+        routed = [(query, jarvis.match_intent(query)) for query in queries]
+        # Farewell exits the process, so it can't be replayed
+        routed = [(q, m) for q, m in routed if m is None or m.intent != "farewell"]
+
+        samples = {}
+        profiler = cProfile.Profile() if profile else None
+        if profiler:
+            profiler.enable()
+        for _ in range(repeat):
+            for query, match in routed:
+                intent = match.intent if match else "fallback"
+                stats = samples.setdefault(intent, {"dispatch": [], "handler": [], "end_to_end": []})
+
+                start = time.perf_counter()
+                jarvis.match_intent(query)
+                stats["dispatch"].append(time.perf_counter() - start)
+
+                if match is not None:
+                    start = time.perf_counter()
+                    jarvis.handlers[match.intent](query)
+                    stats["handler"].append(time.perf_counter() - start)
+
+                start = time.perf_counter()
+                jarvis.process_command(query).result()
+                stats["end_to_end"].append(time.perf_counter() - start)
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(profile)
+
+        # Allocation pass, kept separate so tracing doesn't skew the timings
+        tracemalloc.start()
+        allocations = {}
+        for query, match in routed:
+            intent = match.intent if match else "fallback"
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            jarvis.process_command(query).result()
+            peak = tracemalloc.get_traced_memory()[1] - before
+            allocations[intent] = max(allocations.get(intent, 0), peak)
+        tracemalloc.stop()
+
+    report = {
+        "benchmark": "pipeline",
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "queries": len(routed),
+        "repeat": repeat,
+        "network_latency_ms": network_latency * 1000,
+        "response_cache": use_cache,
+        "stages": METRICS.snapshot(),
+        "intents": {
+            intent: {
+                "count": len(stats["dispatch"]),
+                "dispatch_us": summarize(stats["dispatch"], 1e6),
+                "handler_ms": summarize(stats["handler"], 1e3) if stats["handler"] else None,
+                "end_to_end_ms": summarize(stats["end_to_end"], 1e3),
+                "peak_alloc_kb": allocations.get(intent, 0) / 1024
+            }
+            for intent, stats in sorted(samples.items())
+        }
+    }
+    write_report(report, output)
+    if profile:
+        print(f"cProfile data written to {profile} "
+              f"(view with snakeviz, or render a flame graph with flameprof)", file=sys.stderr)
+
+
+class StubMicrophone:
+    """Synthetic voice-like signal for the GUI benchmark"""
+
+    def __init__(self, sample_rate: int = 16000):
+        self.sample_rate = sample_rate
+        self.started = time.perf_counter()
+
+    def latest_samples(self, count: int):
+        t = time.perf_counter() - self.started + np.arange(count) / self.sample_rate
+        envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 0.7 * t)
+        return (envelope * 0.3 * np.sin(2 * np.pi * 180 * t)).astype(np.float32)
+
+
+def bench_gui(seconds: float, output) -> None:
+    """Time JarvisGUI frame rendering (run under Xvfb on headless machines)"""
+    import tkinter as tk
+
+    with stubbed_side_effects(), scratch_directory(), \
+            mock.patch.object(Jarvis, "listen", lambda self, raise_errors=False: time.sleep(0.5)):
+        jarvis = Jarvis(voice=False)
+        jarvis.microphone = StubMicrophone()
+        root = tk.Tk()
+        gui = jarvis_module.JarvisGUI(root, jarvis)
+
+        samples = []
+
+        def sample():
+            clock = gui.frame_clock
+            samples.append((clock.fps, clock.cpu_percent, clock.frame_ms))
+            root.after(1000, sample)
+
+        root.after(1000, sample)
+        root.after(int(seconds * 1000), root.destroy)
+        root.mainloop()
+
+    # The first second includes window creation
+    steady = samples[1:] or samples
+    report = {
+        "benchmark": "gui",
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "seconds": seconds,
+        "fps": statistics.mean(s[0] for s in steady) if steady else 0.0,
+        "cpu_percent": statistics.mean(s[1] for s in steady) if steady else 0.0,
+        "frame_ms": statistics.mean(s[2] for s in steady) if steady else 0.0,
+        "waveform": gui.visualizer.frame_stats()
+    }
+    write_report(report, output)
+
+
+STARTUP_PROBE = """
+import time
+started = time.perf_counter()
+import jarvis
+imported = time.perf_counter()
+jarvis.Jarvis()
+print(imported - started, time.perf_counter() - imported)
+"""
+
+
+def parse_importtime(stderr: str) -> dict:
+    """Cumulative microseconds per module from -X importtime output"""
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        times[name] = max(times.get(name, 0), int(cumulative))
+    return times
+
+
+def bench_startup(runs: int, output) -> None:
+    """Cold import and construction time of Jarvis in fresh interpreters"""
+    imports, constructs = [], []
+    modules = {}
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", STARTUP_PROBE],
+                                capture_output=True, text=True, cwd=Path(__file__).parent)
+        if result.returncode != 0:
+            raise SystemExit(f"Startup probe failed:\n{result.stderr[-2000:]}")
+        imported, constructed = map(float, result.stdout.split()[-2:])
+        imports.append(imported)
+        constructs.append(constructed)
+        for name, micros in parse_importtime(result.stderr).items():
+            modules.setdefault(name, []).append(micros)
+
+    # Top-level packages only, so each cost is counted once
+    heaviest = sorted(((name, statistics.median(m) / 1000) for name, m in modules.items()
+                       if "." not in name and name != "jarvis"), key=lambda item: -item[1])[:15]
+    report = {
+        "benchmark": "startup",
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "runs": runs,
+        "import_ms": statistics.median(imports) * 1000,
+        "construct_ms": statistics.median(constructs) * 1000,
+        "heaviest_imports_ms": dict(heaviest)
+    }
+    write_report(report, output)
+
+
+def load_client(connect, queries, count: int, window: int, latencies: list, errors: list) -> None:
+    """One pipelining client: keeps up to window requests in flight"""
+    sock = connect()
+    in_flight = threading.BoundedSemaphore(window)
+    sent = {}
+
+    def read_replies():
+        with sock.makefile("r", encoding="utf-8") as replies:
+            for _ in range(count):
+                line = replies.readline()
+                if not line:
+                    errors.append("connection closed")
+                    return
+                reply = json.loads(line)
+                latencies.append(time.perf_counter() - sent.pop(reply["id"]))
+                if "error" in reply:
+                    errors.append(reply["error"])
+                in_flight.release()
+
+    reader = threading.Thread(target=read_replies)
+    reader.start()
+    for i in range(count):
+        in_flight.acquire()
+        sent[i] = time.perf_counter()
+        request = {"id": i, "query": queries[i % len(queries)]}
+        sock.sendall((json.dumps(request) + "\n").encode("utf-8"))
+    reader.join()
+    sock.close()
+
+
+def bench_load(socket_path, tcp, clients: int, n_requests: int, window: int,
+               network_latency: float, output) -> None:
+    """Throughput of the headless command interface in commands per second"""
+    server = None
+    stack = contextlib.ExitStack()
+    if not socket_path and not tcp:
+        # No daemon given: serve a stubbed Jarvis in-process
+        stack.enter_context(stubbed_side_effects())
+        socket_path = str(Path(stack.enter_context(tempfile.TemporaryDirectory())) / "jarvis.sock")
+        jarvis = stack.enter_context(stubbed_jarvis(network_latency, use_cache=False))
+        server = CommandServer(jarvis, unix_path=socket_path)
+        server.start()
+
+    if socket_path:
+        def connect():
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.connect(socket_path)
+            return sock
+    else:
+        def connect():
+            return socket.create_connection(parse_tcp_address(tcp))
+
+    queries = LOAD_QUERIES
+    latencies, errors = [], []
+    with stack:
+        start = time.perf_counter()
+        threads = [threading.Thread(target=load_client,
+                                    args=(connect, queries, n_requests, window, latencies, errors))
+                   for _ in range(clients)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        if server:
+            server.shutdown()
+
+    report = {
+        "benchmark": "load",
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "target": tcp or ("in-process" if server else socket_path),
+        "clients": clients,
+        "window": window,
+        "commands": len(latencies),
+        "errors": len(errors),
+        "seconds": elapsed,
+        "commands_per_second": len(latencies) / elapsed if elapsed else 0.0,
+        "latency_ms": summarize(latencies, 1e3) if latencies else None
+    }
+    write_report(report, output)
+
+
+def write_report(report: dict, output) -> None:
+    text = json.dumps(report, indent=2)
+    if output:
+        Path(output).write_text(text)
+        print(f"Results written to {output}", file=sys.stderr)
+    else:
+        print(text)
+
+
+FILE_WORDS = ["tax", "return", "invoice", "holiday", "report", "budget", "notes", "letter", "contract",
+              "receipt", "summer", "family", "project", "draft", "final", "meeting", "photo", "scan"]
+FILE_EXTENSIONS = ["pdf", "docx", "txt", "xlsx", "jpg", "png", "mp3", "flac", "mp4"]
+FILE_QUERIES = ["find my tax pdf", "where is my invoice", "locate the holiday photos",
+                "find my budget spreadsheet", "play song summer", "find file meeting notes"]
+
+
+def bench_files(n_files: int, n_queries: int, output) -> None:
+    """Crawl, rescan and query cost of the file index over a synthetic tree"""
+    rng = random.Random(7)
+    with tempfile.TemporaryDirectory() as root:
+        for i in range(n_files):
+            folder = Path(root, f"folder{i % 50}", FILE_WORDS[i % 7])
+            folder.mkdir(parents=True, exist_ok=True)
+            name = "_".join(rng.sample(FILE_WORDS, 2)) + f"{i}.{rng.choice(FILE_EXTENSIONS)}"
+            (folder / name).touch()
+
+        index = FileIndex(str(Path(root, "index.sqlite")), [root])
+        start = time.perf_counter()
+        index.crawl(root)
+        crawl = time.perf_counter() - start
+        start = time.perf_counter()
+        index.crawl(root)
+        rescan = time.perf_counter() - start
+
+        Path(root, "added").mkdir()
+        Path(root, "added", "tax_return_latest.pdf").touch()
+        start = time.perf_counter()
+        index.crawl(root)
+        incremental = time.perf_counter() - start
+
+        latencies, hits = [], 0
+        parsed = [index.parse_query(query) for query in FILE_QUERIES]
+        for i in range(n_queries):
+            words, extensions = parsed[i % len(parsed)]
+            start = time.perf_counter()
+            hits += bool(index.search(words, extensions))
+            latencies.append(time.perf_counter() - start)
+
+        report = {
+            "benchmark": "files",
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "files": index.stats()["files"],
+            "crawl_s": crawl,
+            "rescan_unchanged_ms": rescan * 1000,
+            "rescan_one_change_ms": incremental * 1000,
+            "index_bytes": Path(root, "index.sqlite").stat().st_size,
+            "query_ms": summarize(latencies, 1000),
+            "hit_rate": hits / n_queries
+        }
+        index.db.close()
+    write_report(report, output)
+
+
+def translation_backend(name: str, url, dictionary_dir, network_latency: float, workdir: str):
+    """The backend to benchmark; 'stub' is a LibreTranslate server answering locally"""
+    if name == "stub":
+        return LibreTranslateBackend(StubHttp(network_latency), "http://translate.invalid")
+    if name == "libretranslate":
+        if not url:
+            raise SystemExit("--url is required for the libretranslate backend")
+        return LibreTranslateBackend(HttpClient(), url)
+    if name == "argos":
+        return ArgosBackend()
+    if not dictionary_dir:
+        # A dictionary covering every headline word, so every phrase is translatable
+        dictionary_dir = workdir
+        words = sorted({word.lower() for title in NEWS_HEADLINES for word in title.split()})
+        Path(workdir, "en-es.tsv").write_text("".join(f"{word}\t{word[::-1]}\n" for word in words),
+                                              encoding="utf-8")
+    return DictionaryBackend(dictionary_dir)
+
+
+def bench_translate(backend_name: str, url, dictionary_dir, target: str, repeat: int,
+                    network_latency: float, output) -> None:
+    """Batch-translate the news headlines cold, one by one and batched, then from the phrase cache"""
+    headlines = [article["title"] for article in StubHttp().get_json("newsapi")["articles"]]
+    with tempfile.TemporaryDirectory() as workdir:
+        backend = translation_backend(backend_name, url, dictionary_dir, network_latency, workdir)
+        if not backend.available():
+            raise SystemExit(f"Translation backend {backend_name} is not available")
+
+        def fresh() -> Translator:
+            return Translator([backend], ResponseCache({"translation": 86400}))
+
+        translator = fresh()
+        start = time.perf_counter()
+        for headline in headlines:
+            translator.translate(headline, "en", target)
+        one_by_one = time.perf_counter() - start
+
+        translator = fresh()
+        start = time.perf_counter()
+        translated = translator.translate_batch(headlines, "en", target)
+        batched = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            translator.translate_batch(headlines, "en", target)
+        cached = (time.perf_counter() - start) / repeat
+
+    report = {
+        "benchmark": "translate",
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "backend": backend_name,
+        "target": target,
+        "headlines": len(headlines),
+        "network_latency_ms": network_latency * 1000,
+        "cold_one_by_one_per_s": len(headlines) / one_by_one,
+        "cold_batched_per_s": len(headlines) / batched,
+        "cached_per_s": len(headlines) / cached,
+        "cache": translator.cache.stats().get("translation"),
+        "sample": dict(zip(headlines[:3], translated[:3]))
+    }
+    write_report(report, output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JARVIS benchmarks")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    intents = subparsers.add_parser("intents", help="Intent matching throughput")
+    intents.add_argument("--queries", type=int, default=5000)
+
+    wakeword = subparsers.add_parser("wakeword", help="Wake word gate accuracy on WAV fixtures")
+    # Defaults to the synthetic fixtures from tests/fixtures/generate.py
+    wake_fixtures = Path(__file__).resolve().parent / "tests" / "fixtures" / "wake_word"
+    wakeword.add_argument("--templates", default=str(wake_fixtures / "templates"))
+    wakeword.add_argument("--positives", default=str(wake_fixtures / "positives"))
+    wakeword.add_argument("--negatives", default=str(wake_fixtures / "negatives"))
+    wakeword.add_argument("--threshold", type=float, default=0.25)
+
+    recognizers = subparsers.add_parser("recognizers", help="Speech recognition backend latency and accuracy")
+    recognizers.add_argument("--corpus", required=True, help="Directory of .wav files with .txt transcripts")
+    recognizers.add_argument("--backends", nargs="+", default=["google", "vosk", "sphinx"])
+    recognizers.add_argument("--language", default="en")
+    recognizers.add_argument("--vosk-model", default="models/vosk")
+
+    http = subparsers.add_parser("http", help="HTTP client against a local stub upstream")
+    http.add_argument("--requests", type=int, default=50)
+
+    pipeline = subparsers.add_parser("pipeline", help="Headless command pipeline latency and allocations")
+    pipeline.add_argument("--corpus", help="Text file with one query per line")
+    pipeline.add_argument("--repeat", type=int, default=20)
+    pipeline.add_argument("--network-latency", type=float, default=0.0, help="Simulated upstream latency in ms")
+    pipeline.add_argument("--cache", action="store_true", help="Keep the response cache enabled")
+    pipeline.add_argument("--output", help="Write JSON results to this file")
+    pipeline.add_argument("--profile", help="Write cProfile data to this file")
+
+    gui = subparsers.add_parser("gui", help="GUI frame rendering cost (needs a display or Xvfb)")
+    gui.add_argument("--seconds", type=float, default=10.0)
+    gui.add_argument("--output", help="Write JSON results to this file")
+
+    startup = subparsers.add_parser("startup", help="Cold import and construction time")
+    startup.add_argument("--runs", type=int, default=5)
+    startup.add_argument("--output", help="Write JSON results to this file")
+
+    load = subparsers.add_parser("load", help="Load-test the headless command interface")
+    load.add_argument("--socket", help="UNIX socket of a running 'jarvis.py --headless' (default: in-process)")
+    load.add_argument("--tcp", help="[HOST:]PORT of a running 'jarvis.py --headless'")
+    load.add_argument("--clients", type=int, default=8)
+    load.add_argument("--requests", type=int, default=500, help="Requests per client")
+    load.add_argument("--window", type=int, default=16, help="Requests each client keeps in flight")
+    load.add_argument("--network-latency", type=float, default=0.0,
+                      help="Simulated upstream latency in ms for the in-process server")
+    load.add_argument("--output", help="Write JSON results to this file")
+
+    files = subparsers.add_parser("files", help="File index crawl and query cost on a synthetic tree")
+    files.add_argument("--files", type=int, default=50000)
+    files.add_argument("--queries", type=int, default=1000)
+    files.add_argument("--output", help="Write JSON results to this file")
+
+    translate = subparsers.add_parser("translate", help="Batch translation throughput on news headlines")
+    translate.add_argument("--backend", default="stub", choices=["stub", "dictionary", "argos", "libretranslate"])
+    translate.add_argument("--url", help="LibreTranslate server for --backend libretranslate")
+    translate.add_argument("--dictionary-dir", help="Dictionary folder (default: a generated one)")
+    translate.add_argument("--target", default="es")
+    translate.add_argument("--repeat", type=int, default=20)
+    translate.add_argument("--network-latency", type=float, default=50.0,
+                           help="Simulated round trip in ms for the stub backend")
+    translate.add_argument("--output", help="Write JSON results to this file")
+
+    args = parser.parse_args()
+    if args.benchmark == "intents":
+        bench_intents(args.queries)
+    elif args.benchmark == "wakeword":
+        bench_wakeword(args.templates, args.positives, args.negatives, args.threshold)
+    elif args.benchmark == "recognizers":
+        bench_recognizers(args.corpus, args.backends, args.language, args.vosk_model)
+    elif args.benchmark == "http":
+        bench_http(args.requests)
+    elif args.benchmark == "pipeline":
+        bench_pipeline(args.corpus, args.repeat, args.network_latency / 1000, args.cache,
+                       args.output, args.profile)
+    elif args.benchmark == "gui":
+        bench_gui(args.seconds, args.output)
+    elif args.benchmark == "startup":
+        bench_startup(args.runs, args.output)
+    elif args.benchmark == "load":
+        bench_load(args.socket, args.tcp, args.clients, args.requests, args.window,
+                   args.network_latency / 1000, args.output)
+    elif args.benchmark == "files":
+        bench_files(args.files, args.queries, args.output)
+    elif args.benchmark == "translate":
+        bench_translate(args.backend, args.url, args.dictionary_dir, args.target, args.repeat,
+                        args.network_latency / 1000, args.output)
+
+
+if __name__ == "__main__":
+    main()
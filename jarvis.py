@@ -3,104 +3,3557 @@ JARVIS - Just A Rather Very Intelligent System
 A professional voice assistant with advanced features and natural language processing.
 """
 
+from __future__ import annotations
+
 import sys
 import os
+import io
 import json
+import argparse
+import base64
+import copy
+import hashlib
+import importlib
+import sqlite3
+import socket
+import socketserver
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import heapq
+import re
 import time
 import datetime
 import logging
+import logging.handlers
+import atexit
+import bisect
+import contextlib
 import random
+import shlex
+import subprocess
+import difflib
 import webbrowser
-import requests
-import wikipedia
-import pyautogui
-import psutil
-import speedtest
-import wolframalpha
 from pathlib import Path
-from typing import Optional, Dict, Any
-from gtts import gTTS
-import pygame
-import speech_recognition as sr
-import tempfile
-import tkinter as tk
-from tkinter import ttk
-from PIL import Image, ImageTk
+from typing import Optional, Dict, Any, List, Tuple, Callable, NamedTuple
+import queue
+import wave
 import math
 import threading
-from tkinter import font as tkfont
-import numpy as np
-from matplotlib.figure import Figure
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import cv2
-from scipy import signal
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('jarvis.log'),
-        logging.StreamHandler()
-    ]
-)
-
-# Initialize pygame mixer
-pygame.mixer.init()
+import itertools
+from concurrent.futures import Future, ThreadPoolExecutor
+from collections import OrderedDict, deque
+
+# Fields that callers attach with extra={...} and that end up as JSON keys
+LOG_FIELDS = ("intent", "latency_ms", "backend", "query", "repeated", "metrics")
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with long messages truncated"""
+
+    def __init__(self, max_message: int = 500):
+        super().__init__()
+        self.max_message = max_message
+
+    def format(self, record: logging.LogRecord) -> str:
+        message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            message = f"{message}\n{record.exc_text}"
+        if len(message) > self.max_message:
+            message = f"{message[:self.max_message]}... ({len(message) - self.max_message} more chars)"
+        entry = {
+            "time": datetime.datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "thread": record.threadName,
+            "message": message
+        }
+        for field in LOG_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class DedupFilter(logging.Filter):
+    """Drops warnings and errors that repeat within a window.
+
+    Messages that differ only in numbers count as the same. The first one
+    passes; the next one after the window passes with a count of how many
+    were dropped in between.
+    """
+
+    def __init__(self, window: float = 60.0, level: int = logging.WARNING, max_keys: int = 1000):
+        super().__init__()
+        self.window = window
+        self.level = level
+        self.max_keys = max_keys
+        self.seen: OrderedDict = OrderedDict()
+        self.lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < self.level or self.window <= 0:
+            return True
+        key = (record.levelno, re.sub(r"\d+", "#", record.getMessage()[:200]))
+        now = time.monotonic()
+        with self.lock:
+            last, dropped = self.seen.get(key, (0.0, 0))
+            if now - last < self.window:
+                self.seen[key] = (last, dropped + 1)
+                return False
+            self.seen[key] = (now, 0)
+            self.seen.move_to_end(key)
+            while len(self.seen) > self.max_keys:
+                self.seen.popitem(last=False)
+        if dropped:
+            record.repeated = dropped
+            record.msg = f"{record.msg} (repeated {dropped} more times)"
+        return True
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_log_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def setup_logging(file: str = "jarvis.log", max_bytes: int = 5 * 1024 * 1024, backups: int = 3,
+                  json_format: bool = True, dedup_seconds: float = 60.0, level: str = "INFO",
+                  queue_size: int = 10000) -> None:
+    """Route logging through a queue to a rotating file and the console.
+
+    Callers only enqueue records; a listener thread does all formatting and
+    I/O, so logging never stalls command handling. Calling this again
+    replaces the previous setup.
+    """
+    global _log_listener
+    # delay: the file is only created once something is logged
+    file_handler = logging.handlers.RotatingFileHandler(file, maxBytes=max_bytes, backupCount=backups,
+                                                        encoding="utf-8", delay=True)
+    file_handler.setFormatter(JsonFormatter() if json_format else
+                              logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+    console = logging.StreamHandler()
+    console.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+
+    log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    queue_handler = DroppingQueueHandler(log_queue)
+    queue_handler.addFilter(DedupFilter(dedup_seconds))
+
+    listener = logging.handlers.QueueListener(log_queue, file_handler, console,
+                                              respect_handler_level=True)
+    listener.start()
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    # Retire the previous pipeline only after the new one is taking records
+    previous, _log_listener = _log_listener, listener
+    if previous is not None:
+        previous.stop()
+        for handler in previous.handlers:
+            handler.close()
+
+
+def stop_logging() -> None:
+    """Flush queued records; registered to run at exit"""
+    global _log_listener
+    if _log_listener is not None:
+        _log_listener.stop()
+        _log_listener = None
+
+
+setup_logging()
+atexit.register(stop_logging)
+
+STARTED = time.perf_counter()
+IMPORT_TIMES: Dict[str, float] = {}
+
+
+class LazyModule:
+    """Stand-in for a heavy dependency that imports it on first use.
+
+    Startup only pays for what it touches: speedtest loads on the first speed
+    test, pyautogui on the first screenshot, and so on. How long each import
+    took is kept in IMPORT_TIMES for the startup report.
+    """
+
+    def __init__(self, name: str):
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_module", None)
+
+    def _load(self):
+        module = self._module
+        if module is None:
+            started = time.perf_counter()
+            module = importlib.import_module(self._name)
+            if self._module is None:
+                IMPORT_TIMES[self._name] = time.perf_counter() - started
+                logging.debug(f"Loaded {self._name} in {IMPORT_TIMES[self._name] * 1000:.0f} ms")
+                object.__setattr__(self, "_module", module)
+        return module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr: str, value: Any) -> None:
+        setattr(self._load(), attr, value)
+
+    def __delattr__(self, attr: str) -> None:
+        delattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module '{self._name}' ({state})>"
+
+
+np = LazyModule("numpy")
+sr = LazyModule("speech_recognition")
+requests = LazyModule("requests")
+pygame = LazyModule("pygame")
+gtts = LazyModule("gtts")
+pyautogui = LazyModule("pyautogui")
+psutil = LazyModule("psutil")
+speedtest = LazyModule("speedtest")
+tk = LazyModule("tkinter")
+ttk = LazyModule("tkinter.ttk")
+tkfont = LazyModule("tkinter.font")
+dateutil_parser = LazyModule("dateutil.parser")
+
+# Mixer channels reserved for speech and for music
+SPEECH_CHANNEL = 0
+MUSIC_CHANNEL = 1
+_mixer_lock = threading.Lock()
+
+
+def init_mixer() -> None:
+    """Initialize the pygame mixer the first time audio is needed"""
+    with _mixer_lock:
+        if not pygame.mixer.get_init():
+            pygame.mixer.init()
+            pygame.mixer.set_reserved(2)
+
+
+def startup_report(target_ms: float) -> str:
+    """Time to first listen and lazy import costs, importtime style"""
+    elapsed = (time.perf_counter() - STARTED) * 1000
+    try:
+        elapsed_total = (time.time() - psutil.Process().create_time()) * 1000
+    except Exception:
+        elapsed_total = elapsed
+    lines = [f"Time to first listen: {elapsed_total:.0f} ms since process start, "
+             f"{elapsed:.0f} ms since import (target {target_ms:.0f} ms)",
+             "import time: ms | module"]
+    for name, seconds in sorted(IMPORT_TIMES.items(), key=lambda item: -item[1]):
+        lines.append(f"import time: {seconds * 1000:8.1f} | {name}")
+    return "\n".join(lines)
+
+
+class LatencyHistogram:
+    """Cumulative bucket counts plus a rolling window of recent samples"""
+
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+    def __init__(self, window: int = 1024):
+        self.buckets = [0] * (len(self.BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.recent: deque = deque(maxlen=window)
+
+    def observe(self, seconds: float) -> None:
+        self.buckets[bisect.bisect_left(self.BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.recent.append(seconds)
+
+    def percentiles(self, quantiles: Tuple[float, ...]) -> Dict[float, float]:
+        """Percentiles over the rolling window"""
+        ordered = sorted(self.recent)
+        if not ordered:
+            return {q: 0.0 for q in quantiles}
+        return {q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] for q in quantiles}
+
+
+class Metrics:
+    """Latency spans for every stage of a voice turn.
+
+    Each stage, keyed by name plus labels such as intent or backend, feeds a
+    LatencyHistogram. prometheus() renders all of them in the Prometheus
+    text format, with the rolling p50/p95/p99 alongside the buckets.
+    """
+
+    QUANTILES = (0.5, 0.95, 0.99)
+
+    def __init__(self, window: int = 1024):
+        self.window = window
+        self.histograms: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], LatencyHistogram] = {}
+        self.lock = threading.Lock()
+
+    def observe(self, stage: str, seconds: float, **labels: str) -> None:
+        key = (stage, tuple(sorted(labels.items())))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = LatencyHistogram(self.window)
+            histogram.observe(seconds)
+
+    @contextlib.contextmanager
+    def span(self, stage: str, **labels: str):
+        """Time the body of a with block as one span of stage"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started, **labels)
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Counts and rolling percentiles in milliseconds, one entry per series"""
+        with self.lock:
+            series = []
+            for (stage, labels), histogram in sorted(self.histograms.items()):
+                percentiles = histogram.percentiles(self.QUANTILES)
+                entry = {"stage": stage, **dict(labels), "count": histogram.count}
+                for q, value in percentiles.items():
+                    entry[f"p{int(q * 100)}_ms"] = round(value * 1000, 2)
+                series.append(entry)
+            return series
+
+    def prometheus(self) -> str:
+        """All series in the Prometheus text exposition format"""
+        def label_text(labels, **extra) -> str:
+            pairs = list(labels) + list(extra.items())
+            escaped = []
+            for key, value in pairs:
+                value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+                escaped.append(f'{key}="{value}"')
+            return "{" + ",".join(escaped) + "}"
+
+        lines = ["# HELP jarvis_stage_seconds Latency of each stage of a voice turn",
+                 "# TYPE jarvis_stage_seconds histogram"]
+        recent = ["# HELP jarvis_stage_recent_seconds Percentiles over recent spans",
+                  "# TYPE jarvis_stage_recent_seconds gauge"]
+        with self.lock:
+            for (stage, labels), histogram in sorted(self.histograms.items()):
+                labels = (("stage", stage),) + labels
+                cumulative = 0
+                for bound, count in zip(LatencyHistogram.BUCKETS + (float("inf"),), histogram.buckets):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f"jarvis_stage_seconds_bucket{label_text(labels, le=le)} {cumulative}")
+                lines.append(f"jarvis_stage_seconds_sum{label_text(labels)} {histogram.sum:.6f}")
+                lines.append(f"jarvis_stage_seconds_count{label_text(labels)} {histogram.count}")
+                for q, value in histogram.percentiles(self.QUANTILES).items():
+                    recent.append(f"jarvis_stage_recent_seconds{label_text(labels, quantile=q)} {value:.6f}")
+        return "\n".join(lines + recent) + "\n"
+
+
+METRICS = Metrics()
+
+
+class MetricsServer:
+    """Serves METRICS at /metrics for Prometheus to scrape"""
+
+    def __init__(self, metrics: Metrics, port: int, host: str = "127.0.0.1"):
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, name="metrics", daemon=True)
+
+    def start(self) -> None:
+        self.thread.start()
+        host, port = self.server.server_address[:2]
+        logging.info(f"Serving metrics on http://{host}:{port}/metrics")
+
+    def shutdown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+# Default settings, overridden by config.json
+DEFAULT_CONFIG = {
+    "user": {
+        "name": "Sir",
+        "email": "",
+        "password": ""
+    },
+    "paths": {
+        "music": "",
+        "documents": "",
+        "downloads": ""
+    },
+    "apis": {
+        "wolframalpha": "",
+        "openweathermap": "",
+        "newsapi": ""
+    },
+    "preferences": {
+        "voice_speed": 1.0,
+        "language": "en",
+        "temperature_unit": "celsius",
+        "speech_cache_mb": 50,
+        "barge_in": False,
+        "recognizers": ["google", "vosk", "sphinx"],
+        "vosk_model": "models/vosk"
+    },
+    "network": {
+        "timeout": 10,
+        "retries": 2,
+        "max_concurrency": 8
+    },
+    "cache": {
+        "ttl": {
+            "weather": 600,
+            "news": 1800,
+            "wikipedia": 86400,
+            "wolfram": 604800,
+            "translation": 2592000
+        },
+        "max_entries": 512,
+        "persist": True,
+        "stale_factor": 3
+    },
+    "prefetch": {
+        "enabled": True,
+        "home_city": "",
+        "jobs": {
+            "weather": 600,
+            "news": 1800
+        },
+        "render_speech": True,
+        "metered": False,
+        "pause_on_battery": False
+    },
+    "executor": {
+        "workers": 4,
+        "acknowledge_after": 0.7,
+        "timeouts": {
+            "default": 20,
+            "speedtest": 90
+        },
+        "concurrency": {
+            "speedtest": 1,
+            "screenshot": 1
+        }
+    },
+    "wake_word": {
+        "enabled": True,
+        "templates": "cache/wake_word",
+        "threshold": 0.25,
+        "follow_up_seconds": 8
+    },
+    "startup": {
+        "target_ms": 1500
+    },
+    "logging": {
+        "file": "jarvis.log",
+        "level": "INFO",
+        "max_bytes": 5242880,
+        "backups": 3,
+        "json": True,
+        "dedup_seconds": 60
+    },
+    "metrics": {
+        "port": 0,
+        "dump_seconds": 0,
+        "dump_file": "cache/metrics.prom"
+    },
+    "telemetry": {
+        "interval": 2,
+        "history_minutes": 15,
+        "gui_gauge": False
+    },
+    "launcher": {
+        "include_path": True,
+        "refresh_seconds": 60,
+        "apps": {}
+    },
+    "files": {
+        "index": True,
+        "rescan_seconds": 600
+    },
+    "music": {
+        "volume": 0.8,
+        "duck_volume": 0.2,
+        "shuffle": False
+    },
+    "translation": {
+        "backends": ["libretranslate", "argos", "dictionary"],
+        "libretranslate_url": "",
+        "api_key": "",
+        "dictionary_dir": "dictionaries"
+    }
+}
+
+
+def merge_config(defaults: Dict[str, Any], overrides: Dict[str, Any]) -> Dict[str, Any]:
+    """Recursively fill missing keys in overrides from defaults"""
+    merged = copy.deepcopy(defaults)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge_config(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def split_sentences(text: str, max_chars: int = 200) -> List[str]:
+    """Split text into sentence-sized chunks for incremental synthesis"""
+    chunks = []
+    for sentence in re.split(r'(?<=[.!?;])\s+', text.strip()):
+        while len(sentence) > max_chars:
+            # Break overlong sentences at the last comma or space that fits
+            cut = max(sentence.rfind(', ', 0, max_chars), sentence.rfind(' ', 0, max_chars))
+            if cut <= 0:
+                cut = max_chars
+            chunks.append(sentence[:cut + 1].strip())
+            sentence = sentence[cut + 1:].strip()
+        if sentence:
+            chunks.append(sentence)
+    return chunks
+
+
+class SpeechCache:
+    """Content-addressed, size-bounded LRU store of synthesized speech on disk"""
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        # Renders interrupted by a crash are never finished; drop them
+        for partial in self.directory.glob('*.part'):
+            try:
+                partial.unlink()
+            except OSError as e:
+                logging.warning(f"Could not remove partial speech file {partial}: {e}")
+
+        # Oldest entries first, so eviction pops from the front
+        self.entries: "OrderedDict[str, int]" = OrderedDict()
+        for path in sorted(self.directory.glob('*.mp3'), key=lambda p: p.stat().st_mtime):
+            self.entries[path.stem] = path.stat().st_size
+        self.total_bytes = sum(self.entries.values())
+
+    @staticmethod
+    def key(text: str, language: str, voice_speed: float) -> str:
+        """Hash the inputs that change the rendered audio"""
+        return hashlib.sha256(f"{language}|{voice_speed}|{text}".encode('utf-8')).hexdigest()
+
+    def path(self, key: str) -> Path:
+        return self.directory / f"{key}.mp3"
+
+    def get(self, text: str, language: str, voice_speed: float,
+            render: Callable[[str], None]) -> Path:
+        """Return the cached audio file, rendering it on a miss"""
+        key = self.key(text, language, voice_speed)
+        path = self.path(key)
+
+        with self.lock:
+            if key in self.entries and path.exists():
+                self.entries.move_to_end(key)
+                self.hits += 1
+                os.utime(path)
+                return path
+            self.misses += 1
+
+        partial = self.directory / f"{key}.{threading.get_ident()}.part"
+        try:
+            render(str(partial))
+            os.replace(partial, path)
+        except BaseException:
+            # A failed render (e.g. a gTTS network error) must not leave files outside the byte limit
+            partial.unlink(missing_ok=True)
+            raise
+
+        with self.lock:
+            size = path.stat().st_size
+            self.total_bytes += size - self.entries.get(key, 0)
+            self.entries[key] = size
+            self.entries.move_to_end(key)
+            self._evict(keep=key)
+        return path
+
+    def _evict(self, keep: str) -> None:
+        """Drop least recently used entries until the store fits"""
+        while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+            key, size = next(iter(self.entries.items()))
+            if key == keep:
+                break
+            del self.entries[key]
+            self.total_bytes -= size
+            try:
+                os.unlink(self.path(key))
+            except OSError as e:
+                logging.warning(f"Could not evict cached speech {key}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and store size"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self.entries),
+                "bytes": self.total_bytes
+            }
+
+
+class Utterance:
+    """A queued piece of speech and the future reporting its completion"""
+
+    def __init__(self, text: str, turn_started: Optional[float] = None, language: Optional[str] = None):
+        self.text = text
+        self.turn_started = turn_started
+        self.language = language
+        self.future: Future = Future()
+        self.stopped = threading.Event()
+
+
+class AudioOutput:
+    """Speech playback on a dedicated thread fed by a priority queue.
+
+    Callers get a Future per utterance and are never blocked by playback.
+    Text is split into sentences; a producer synthesizes and decodes chunk N+1
+    while chunk N plays, and chunks are queued on the reserved speech channel
+    so playback is gapless.
+    """
+
+    URGENT = 0
+    NORMAL = 5
+    LOW = 9
+
+    def __init__(self, synthesize: Callable[[str, Optional[str]], Path], preload: bool = True):
+        self.synthesize = synthesize
+        self.preload = preload
+        self.pending: "queue.PriorityQueue[Tuple[int, int, Optional[Utterance]]]" = queue.PriorityQueue()
+        self.sequence = itertools.count()
+        self.current: Optional[Utterance] = None
+        self.outstanding = 0
+        self.idle = threading.Condition()
+        self.latencies: deque = deque(maxlen=100)
+        # Called with True when speech starts and False once nothing is left to say
+        self.on_speaking: Optional[Callable[[bool], None]] = None
+        self.thread = threading.Thread(target=self._run, name="audio-output", daemon=True)
+        self.thread.start()
+
+    def speak(self, text: str, priority: int = NORMAL, turn_started: Optional[float] = None,
+              language: Optional[str] = None) -> Future:
+        """Queue text for playback; lower priority values play first.
+
+        turn_started is when the user stopped speaking, if this answers them.
+        language overrides the configured speech language.
+        """
+        utterance = Utterance(text, turn_started, language)
+        # Cancelling a queued future just skips it; cancelling the playing one stops it
+        utterance.future.add_done_callback(lambda f: f.cancelled() and utterance.stopped.set())
+        with self.idle:
+            self.outstanding += 1
+        self.pending.put((priority, next(self.sequence), utterance))
+        return utterance.future
+
+    def cancel(self, future: Future) -> None:
+        """Cancel a queued or playing utterance"""
+        future.cancel()
+        current = self.current
+        if current is not None and current.future is future:
+            current.stopped.set()
+
+    def interrupt(self) -> None:
+        """Barge-in: stop the current utterance and drop everything queued"""
+        while True:
+            try:
+                _, _, utterance = self.pending.get_nowait()
+            except queue.Empty:
+                break
+            if utterance is not None:
+                utterance.future.cancel()
+                self._done()
+        current = self.current
+        if current is not None:
+            current.stopped.set()
+
+    def is_speaking(self) -> bool:
+        """True while anything is playing or queued"""
+        with self.idle:
+            return self.outstanding > 0
+
+    def wait_until_idle(self, timeout: Optional[float] = None) -> bool:
+        """Block until all queued speech has finished"""
+        with self.idle:
+            return self.idle.wait_for(lambda: self.outstanding == 0, timeout)
+
+    def _done(self) -> None:
+        with self.idle:
+            self.outstanding -= 1
+            finished = self.outstanding == 0
+            if finished:
+                self.idle.notify_all()
+        if finished:
+            self._notify_speaking(False)
+
+    def _notify_speaking(self, speaking: bool) -> None:
+        if self.on_speaking is not None:
+            try:
+                self.on_speaking(speaking)
+            except Exception as e:
+                logging.error(f"Error in speaking callback: {e}")
+
+    def shutdown(self) -> None:
+        """Stop playback and end the worker thread"""
+        self.interrupt()
+        self.pending.put((-1, next(self.sequence), None))
+
+    def _run(self) -> None:
+        # Bring the mixer up on this thread so startup doesn't wait for it
+        try:
+            if self.preload:
+                init_mixer()
+        except Exception as e:
+            logging.error(f"Error initializing audio: {e}")
+        while True:
+            _, _, utterance = self.pending.get()
+            if utterance is None:
+                return
+            if not utterance.future.set_running_or_notify_cancel():
+                self._done()
+                continue
+            self.current = utterance
+            try:
+                self._play(utterance)
+                utterance.future.set_result(not utterance.stopped.is_set())
+            except Exception as e:
+                logging.error(f"Error in speech synthesis: {e}")
+                utterance.future.set_exception(e)
+            finally:
+                self.current = None
+                self._done()
+
+    def _play(self, utterance: Utterance) -> None:
+        init_mixer()
+        self._notify_speaking(True)
+        started = time.perf_counter()
+        chunks = split_sentences(utterance.text)
+        rendered: "queue.Queue[Any]" = queue.Queue(maxsize=2)
+
+        def produce():
+            try:
+                for chunk in chunks:
+                    if utterance.stopped.is_set():
+                        break
+                    rendered.put(pygame.mixer.Sound(str(self.synthesize(chunk, utterance.language))))
+            except Exception as e:
+                rendered.put(e)
+                return
+            rendered.put(None)
+
+        threading.Thread(target=produce, daemon=True).start()
+
+        channel = pygame.mixer.Channel(SPEECH_CHANNEL)
+        first_audio = None
+        while not utterance.stopped.is_set():
+            try:
+                sound = rendered.get(timeout=0.05)
+            except queue.Empty:
+                continue
+            if sound is None:
+                break
+            if isinstance(sound, Exception):
+                raise sound
+            if first_audio is None:
+                channel.play(sound)
+                first_audio = time.perf_counter() - started
+                METRICS.observe("first_audio", first_audio)
+                if utterance.turn_started is not None:
+                    METRICS.observe("turn", time.perf_counter() - utterance.turn_started)
+            else:
+                # Only one sound can wait behind the playing one
+                while channel.get_queue() is not None and not utterance.stopped.wait(0.01):
+                    pass
+                channel.queue(sound)
+
+        while channel.get_busy() and not utterance.stopped.wait(0.02):
+            pass
+
+        if utterance.stopped.is_set():
+            channel.stop()
+            # Unblock the producer if it is waiting on a full queue
+            while not rendered.empty():
+                rendered.get_nowait()
+        elif first_audio is not None:
+            self.record_latency(first_audio, time.perf_counter() - started, len(chunks))
+
+    def record_latency(self, first_audio: float, total: float, chunks: int) -> None:
+        """Keep time-to-first-audio and total latency of recent utterances"""
+        self.latencies.append((first_audio, total))
+        METRICS.observe("playback", total)
+        logging.info(f"Speech latency: first audio {first_audio * 1000:.0f} ms, "
+                     f"total {total * 1000:.0f} ms over {chunks} chunks",
+                     extra={"backend": "gtts", "latency_ms": round(first_audio * 1000, 2)})
+
+    def stats(self) -> Dict[str, float]:
+        """Average speech latencies over recent utterances"""
+        if not self.latencies:
+            return {"utterances": 0, "avg_first_audio_ms": 0.0, "avg_total_ms": 0.0}
+        count = len(self.latencies)
+        return {
+            "utterances": count,
+            "avg_first_audio_ms": sum(f for f, _ in self.latencies) / count * 1000,
+            "avg_total_ms": sum(t for _, t in self.latencies) / count * 1000
+        }
+
+
+class MicrophoneStream:
+    """Long-lived microphone capture feeding a ring buffer of audio frames.
+
+    The device is opened once. A reader thread tracks the ambient noise floor
+    as a low percentile of recent frame energy and only recalibrates the
+    speech threshold when that floor drifts, so capturing a phrase costs no
+    device or calibration setup.
+    """
+
+    # Frames between noise floor checks, and the percentile taken as the floor
+    DRIFT_CHECK_FRAMES = 50
+    FLOOR_PERCENTILE = 10
+
+    def __init__(self, buffer_seconds: float = 10.0, threshold_ratio: float = 2.5,
+                 min_threshold: float = 150.0, drift_tolerance: float = 0.5,
+                 floor_window: float = 10.0):
+        self.microphone = sr.Microphone()
+        self.source = None
+        self.sample_rate = self.microphone.SAMPLE_RATE
+        self.sample_width = self.microphone.SAMPLE_WIDTH
+        self.chunk = self.microphone.CHUNK
+        self.frame_seconds = self.chunk / self.sample_rate
+
+        # Ring buffer of (index, pcm bytes, rms); index counts frames since start
+        self.frames: deque = deque(maxlen=int(buffer_seconds / self.frame_seconds))
+        self.frame_index = 0
+        self.available = threading.Condition()
+
+        self.threshold_ratio = threshold_ratio
+        self.min_threshold = min_threshold
+        self.drift_tolerance = drift_tolerance
+        self.noise_floor: Optional[float] = None
+        self.energy_threshold = min_threshold
+        self.calibration: List[float] = []
+        self.calibration_frames = max(1, int(0.5 / self.frame_seconds))
+        self.calibration_started = time.perf_counter()
+        self.recent_energy: deque = deque(maxlen=int(floor_window / self.frame_seconds))
+        self.until_drift_check = self.DRIFT_CHECK_FRAMES
+        self.calibrations = 0
+
+        self.running = False
+        self.thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Open the device and start the reader thread"""
+        if self.running:
+            return
+        with METRICS.span("mic_open"):
+            self.source = self.microphone.__enter__()
+        self.running = True
+        self.calibration_started = time.perf_counter()
+        self.thread = threading.Thread(target=self._run, name="microphone", daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(timeout=1)
+        if self.source is not None:
+            self.microphone.__exit__(None, None, None)
+            self.source = None
+
+    @staticmethod
+    def rms(data: bytes) -> float:
+        samples = np.frombuffer(data, dtype=np.int16).astype(np.float32)
+        return float(np.sqrt(np.mean(samples * samples))) if samples.size else 0.0
+
+    def _run(self) -> None:
+        while self.running:
+            try:
+                data = self.source.stream.read(self.chunk)
+            except Exception as e:
+                logging.error(f"Error reading microphone: {e}")
+                time.sleep(0.1)
+                continue
+
+            energy = self.rms(data)
+            self.track_noise(energy)
+            with self.available:
+                self.frames.append((self.frame_index, data, energy))
+                self.frame_index += 1
+                self.available.notify_all()
+
+    def track_noise(self, energy: float) -> None:
+        """Calibrate on the first half second of audio, then follow the noise floor"""
+        if self.noise_floor is None:
+            self.calibration.append(energy)
+            if len(self.calibration) >= self.calibration_frames:
+                self._calibrate(float(np.mean(self.calibration)))
+                METRICS.observe("calibration", time.perf_counter() - self.calibration_started)
+            return
+        # Every frame counts, not only quiet ones: noise that rises above the old
+        # threshold would otherwise never look quiet and never be recalibrated
+        self.recent_energy.append(energy)
+        self.until_drift_check -= 1
+        if self.until_drift_check <= 0 and len(self.recent_energy) == self.recent_energy.maxlen:
+            self.until_drift_check = self.DRIFT_CHECK_FRAMES
+            self._check_drift()
+
+    def _calibrate(self, noise_floor: float) -> None:
+        self.noise_floor = noise_floor
+        self.energy_threshold = max(self.min_threshold, noise_floor * self.threshold_ratio)
+        self.recent_energy.clear()
+        self.calibrations += 1
+        logging.info(f"Microphone calibrated: noise floor {noise_floor:.0f}, "
+                     f"threshold {self.energy_threshold:.0f}")
+
+    def _check_drift(self) -> None:
+        """Recalibrate only when the background level has moved noticeably.
+
+        Pauses between words keep a low percentile of the window at the
+        ambient level even while someone is talking.
+        """
+        current = float(np.percentile(self.recent_energy, self.FLOOR_PERCENTILE))
+        if abs(current - self.noise_floor) > self.drift_tolerance * max(self.noise_floor, 1.0):
+            self._calibrate(current)
+
+    def latest_samples(self, count: int) -> np.ndarray:
+        """The newest count samples as floats in [-1, 1]"""
+        needed = -(-count // self.chunk)
+        with self.available:
+            recent = [self.frames[-i][1] for i in range(min(needed, len(self.frames)), 0, -1)]
+        return pcm_to_float(b"".join(recent))[-count:]
+
+    def frames_since(self, index: int, timeout: float) -> List[Tuple[int, bytes, float]]:
+        """Return buffered frames with an index >= index, waiting for new ones"""
+        with self.available:
+            if self.frame_index <= index:
+                self.available.wait(timeout)
+            return [frame for frame in self.frames if frame[0] >= index]
+
+    def frames_between(self, start: int, end: int) -> List[bytes]:
+        """Audio of the buffered frames with start <= index < end"""
+        with self.available:
+            return [frame[1] for frame in self.frames if start <= frame[0] < end]
+
+    def capture_phrase(self, timeout: float = 5, phrase_time_limit: float = 5,
+                       pause_threshold: float = 0.8, pre_roll: float = 0.3,
+                       on_speech_start: Optional[Callable[[], None]] = None,
+                       ignore_while: Optional[Callable[[], bool]] = None) -> "sr.AudioData":
+        """Wait for speech and return it once a pause ends the phrase"""
+        self.start()
+        with self.available:
+            cursor = self.frame_index
+        deadline = time.monotonic() + timeout
+        pre_roll_frames = int(pre_roll / self.frame_seconds)
+        pause_frames = int(pause_threshold / self.frame_seconds)
+        limit_frames = int(phrase_time_limit / self.frame_seconds)
+
+        phrase: List[bytes] = []
+        silent = 0
+        while True:
+            frames = self.frames_since(cursor, timeout=0.1)
+            if not phrase and time.monotonic() > deadline:
+                raise sr.WaitTimeoutError("listening timed out while waiting for phrase to start")
+            for index, data, energy in frames:
+                cursor = index + 1
+                if not phrase:
+                    if energy < self.energy_threshold:
+                        continue
+                    if ignore_while is not None and ignore_while():
+                        continue
+                    # Include a little audio from before the onset
+                    phrase = self.frames_between(index - pre_roll_frames, index)
+                    onset = time.perf_counter()
+                    if on_speech_start is not None:
+                        on_speech_start()
+                phrase.append(data)
+                silent = silent + 1 if energy < self.energy_threshold else 0
+                if silent >= pause_frames or len(phrase) >= limit_frames:
+                    METRICS.observe("capture", time.perf_counter() - onset)
+                    return sr.AudioData(b"".join(phrase), self.sample_rate, self.sample_width)
+
+
+def pcm_to_float(data: bytes) -> np.ndarray:
+    """Convert 16-bit little-endian PCM to floats in [-1, 1]"""
+    return np.frombuffer(data, dtype='<i2').astype(np.float32) / 32768.0
+
+
+def savgol_kernel(window: int, order: int) -> np.ndarray:
+    """Savitzky-Golay smoothing kernel: least-squares polynomial fit at the centre"""
+    offsets = np.arange(window) - window // 2
+    return np.linalg.pinv(np.vander(offsets, order + 1, increasing=True))[0]
+
+
+def frame_signal(samples: np.ndarray, sample_rate: int,
+                 frame_ms: float = 25.0, hop_ms: float = 10.0) -> np.ndarray:
+    """Slice samples into overlapping, Hamming-windowed frames"""
+    frame_len = int(sample_rate * frame_ms / 1000)
+    hop = int(sample_rate * hop_ms / 1000)
+    if len(samples) < frame_len:
+        samples = np.pad(samples, (0, frame_len - len(samples)))
+    count = 1 + (len(samples) - frame_len) // hop
+    index = np.arange(frame_len)[None, :] + hop * np.arange(count)[:, None]
+    return samples[index] * np.hamming(frame_len)
+
+
+class VoiceActivityDetector:
+    """Energy and speech-band voice activity detection on raw samples"""
+
+    def __init__(self, min_energy: float = 0.004, band_ratio: float = 0.45,
+                 min_voiced_seconds: float = 0.15):
+        self.min_energy = min_energy
+        self.band_ratio = band_ratio
+        self.min_voiced_seconds = min_voiced_seconds
+
+    def voiced_frames(self, samples: np.ndarray, sample_rate: int) -> np.ndarray:
+        """Boolean mask of 10 ms hops that look like speech"""
+        frames = frame_signal(samples, sample_rate)
+        energy = np.sqrt(np.mean(frames ** 2, axis=1))
+        # Adapt to the segment's own background level
+        threshold = max(self.min_energy, 3.0 * float(np.percentile(energy, 10)))
+        spectrum = np.abs(np.fft.rfft(frames, axis=1)) ** 2
+        freqs = np.fft.rfftfreq(frames.shape[1], 1.0 / sample_rate)
+        band = spectrum[:, (freqs >= 300) & (freqs <= 3400)].sum(axis=1)
+        ratio = band / np.maximum(spectrum.sum(axis=1), 1e-12)
+        return (energy > threshold) & (ratio > self.band_ratio)
+
+    def is_speech(self, samples: np.ndarray, sample_rate: int) -> bool:
+        if samples.size == 0:
+            return False
+        return self.voiced_frames(samples, sample_rate).sum() * 0.01 >= self.min_voiced_seconds
+
+
+class WakeWordGate:
+    """Only lets audio through to the recognizer after the wake word.
+
+    Phrases are first screened by voice activity detection. The spotter then
+    compares MFCCs of the start of each phrase against recorded templates of
+    the wake word with open-end dynamic time warping. A detection arms the gate
+    for a follow-up window, and any speech after the wake word in the same
+    phrase is forwarded straight away. Without templates only the VAD applies.
+    """
+
+    def __init__(self, template_dir: str = "", threshold: float = 0.25,
+                 follow_up_seconds: float = 8.0, clock: Callable[[], float] = time.monotonic):
+        self.vad = VoiceActivityDetector()
+        self.threshold = threshold
+        self.follow_up_seconds = follow_up_seconds
+        self.clock = clock
+        self.armed_until = 0.0
+        self.on_wake: Optional[Callable[[], None]] = None
+        self.filterbanks: Dict[Tuple[int, int], np.ndarray] = {}
+        self.counters = {"segments": 0, "silence": 0, "no_wake_word": 0, "forwarded": 0}
+        self.templates = self.load_templates(template_dir) if template_dir else []
+        if template_dir and not self.templates:
+            logging.warning(f"No wake word templates found in {template_dir}, so every phrase with speech "
+                            f"goes to the recognizer. Record some with: python jarvis.py --record-wake-word")
+
+    @staticmethod
+    def read_wav(path: str) -> Tuple[np.ndarray, int]:
+        """Read a 16-bit mono or stereo WAV file as float samples"""
+        with wave.open(path, 'rb') as wav:
+            if wav.getsampwidth() != 2:
+                raise ValueError(f"{path}: only 16-bit WAV files are supported")
+            samples = pcm_to_float(wav.readframes(wav.getnframes()))
+            if wav.getnchannels() > 1:
+                samples = samples.reshape(-1, wav.getnchannels()).mean(axis=1)
+            return samples, wav.getframerate()
+
+    def load_templates(self, template_dir: str) -> List[np.ndarray]:
+        templates = []
+        for path in sorted(Path(template_dir).glob('*.wav')):
+            try:
+                samples, rate = self.read_wav(str(path))
+                voiced = self.vad.voiced_frames(samples, rate)
+                if voiced.any():
+                    # Trim leading and trailing silence from the recording
+                    hop = rate // 100
+                    first, last = np.flatnonzero(voiced)[[0, -1]]
+                    samples = samples[first * hop:(last + 3) * hop]
+                templates.append(self.mfcc(samples, rate))
+            except Exception as e:
+                logging.warning(f"Could not load wake word template {path}: {e}")
+        return templates
+
+    def _filterbank(self, sample_rate: int, n_fft: int, n_mels: int = 26) -> np.ndarray:
+        key = (sample_rate, n_fft)
+        if key not in self.filterbanks:
+            def to_mel(hz):
+                return 2595 * np.log10(1 + hz / 700.0)
+
+            def to_hz(mel):
+                return 700 * (10 ** (mel / 2595.0) - 1)
+
+            points = to_hz(np.linspace(to_mel(80), to_mel(min(7600, sample_rate / 2)), n_mels + 2))
+            bins = np.floor((n_fft + 1) * points / sample_rate).astype(int)
+            bank = np.zeros((n_mels, n_fft // 2 + 1))
+            for m in range(1, n_mels + 1):
+                left, centre, right = bins[m - 1], bins[m], bins[m + 1]
+                bank[m - 1, left:centre] = (np.arange(left, centre) - left) / max(centre - left, 1)
+                bank[m - 1, centre:right] = (right - np.arange(centre, right)) / max(right - centre, 1)
+            self.filterbanks[key] = bank
+        return self.filterbanks[key]
+
+    def mfcc(self, samples: np.ndarray, sample_rate: int, n_ceps: int = 13) -> np.ndarray:
+        """Mean-normalised MFCCs, one row per 10 ms hop"""
+        frames = frame_signal(samples, sample_rate)
+        n_fft = 1 << (frames.shape[1] - 1).bit_length()
+        power = np.abs(np.fft.rfft(frames, n=n_fft, axis=1)) ** 2
+        log_mel = np.log(power @ self._filterbank(sample_rate, n_fft).T + 1e-10)
+        n_mels = log_mel.shape[1]
+        dct = np.cos(np.pi / n_mels * (np.arange(n_mels) + 0.5)[None, :] * np.arange(1, n_ceps + 1)[:, None])
+        ceps = log_mel @ dct.T
+        return ceps - ceps.mean(axis=0)
+
+    @staticmethod
+    def open_end_dtw(template: np.ndarray, features: np.ndarray) -> Tuple[float, int]:
+        """Align template with a prefix of features; returns (cost, prefix length)"""
+        a = template / np.maximum(np.linalg.norm(template, axis=1, keepdims=True), 1e-10)
+        b = features / np.maximum(np.linalg.norm(features, axis=1, keepdims=True), 1e-10)
+        cost = 1.0 - a @ b.T
+        n, m = cost.shape
+        acc = np.full((n, m), np.inf)
+        acc[0] = np.cumsum(cost[0])
+        for i in range(1, n):
+            acc[i, 0] = acc[i - 1, 0] + cost[i, 0]
+            diagonal = np.minimum(acc[i - 1, 1:], acc[i - 1, :-1]) + cost[i, 1:]
+            row = acc[i]
+            row[1:] = diagonal
+            for j in range(1, m):
+                if row[j - 1] + cost[i, j] < row[j]:
+                    row[j] = row[j - 1] + cost[i, j]
+        normalised = acc[-1] / (n + np.arange(1, m + 1))
+        # The matched prefix may not be squeezed below half the template length
+        normalised[:max(1, n // 2) - 1] = np.inf
+        end = int(np.argmin(normalised))
+        return float(normalised[end]), end + 1
+
+    def detect(self, samples: np.ndarray, sample_rate: int) -> Optional[int]:
+        """Return the sample offset just after a leading wake word, if any"""
+        voiced = np.flatnonzero(self.vad.voiced_frames(samples, sample_rate))
+        if voiced.size == 0:
+            return None
+        hop = sample_rate // 100
+        start = max(0, voiced[0] - 3) * hop
+        best: Optional[Tuple[float, int]] = None
+        for template in self.templates:
+            window = samples[start:start + int(len(template) * 1.5 + 3) * hop]
+            score, length = self.open_end_dtw(template, self.mfcc(window, sample_rate))
+            if best is None or score < best[0]:
+                best = (score, length)
+        if best is None or best[0] > self.threshold:
+            return None
+        return start + best[1] * hop
+
+    def filter(self, audio: "sr.AudioData") -> Optional["sr.AudioData"]:
+        """Return the audio the recognizer should see, or None to skip it"""
+        self.counters["segments"] += 1
+        raw = audio.get_raw_data(convert_width=2)
+        samples = pcm_to_float(raw)
+        rate = audio.sample_rate
+        if not self.vad.is_speech(samples, rate):
+            self.counters["silence"] += 1
+            return None
+
+        now = self.clock()
+        if not self.templates or now < self.armed_until:
+            if self.templates:
+                self.armed_until = now + self.follow_up_seconds
+            self.counters["forwarded"] += 1
+            return sr.AudioData(raw, rate, 2)
+
+        end = self.detect(samples, rate)
+        if end is None:
+            self.counters["no_wake_word"] += 1
+            return None
+
+        self.armed_until = now + self.follow_up_seconds
+        if self.vad.is_speech(samples[end:], rate):
+            self.counters["forwarded"] += 1
+            return sr.AudioData(raw[end * 2:], rate, 2)
+        if self.on_wake is not None:
+            self.on_wake()
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        """Segment counters and the share of segments sent to the recognizer"""
+        stats = dict(self.counters)
+        stats["forwarded_ratio"] = self.counters["forwarded"] / max(self.counters["segments"], 1)
+        return stats
+
+
+class RecognizerBackend:
+    """Base class for speech-to-text engines used by Jarvis.listen"""
+
+    name = "base"
+
+    def available(self) -> bool:
+        """Whether the engine's dependencies are installed"""
+        return True
+
+    def recognize(self, audio: "sr.AudioData", language: str) -> str:
+        raise NotImplementedError
+
+
+class GoogleBackend(RecognizerBackend):
+    """Google Web Speech API (needs network)"""
+
+    name = "google"
+
+    def __init__(self, recognizer: "sr.Recognizer"):
+        self.recognizer = recognizer
+
+    def recognize(self, audio: "sr.AudioData", language: str) -> str:
+        return self.recognizer.recognize_google(audio, language=language)
+
+
+class SphinxBackend(RecognizerBackend):
+    """CMU PocketSphinx, fully offline"""
+
+    name = "sphinx"
+
+    def __init__(self, recognizer: "sr.Recognizer"):
+        self.recognizer = recognizer
+
+    def available(self) -> bool:
+        try:
+            import pocketsphinx  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def recognize(self, audio: "sr.AudioData", language: str) -> str:
+        # PocketSphinx ships with US English only
+        return self.recognizer.recognize_sphinx(audio, language="en-US")
+
+
+class VoskBackend(RecognizerBackend):
+    """Vosk/Kaldi offline recognizer using a model directory on disk"""
+
+    name = "vosk"
+    SAMPLE_RATE = 16000
+
+    def __init__(self, model_path: str):
+        self.model_path = model_path
+        self.model = None
+        self.lock = threading.Lock()
+
+    def available(self) -> bool:
+        try:
+            import vosk  # noqa: F401
+        except ImportError:
+            return False
+        return bool(self.model_path) and os.path.isdir(self.model_path)
+
+    def recognize(self, audio: "sr.AudioData", language: str) -> str:
+        import vosk
+        with self.lock:
+            if self.model is None:
+                vosk.SetLogLevel(-1)
+                self.model = vosk.Model(self.model_path)
+        recognizer = vosk.KaldiRecognizer(self.model, self.SAMPLE_RATE)
+        recognizer.AcceptWaveform(audio.get_raw_data(convert_rate=self.SAMPLE_RATE, convert_width=2))
+        text = json.loads(recognizer.FinalResult()).get("text", "")
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+
+class RecognizerChain:
+    """Tries each configured backend in turn until one returns text.
+
+    A backend that fails with a request error (e.g. no network) is skipped for
+    a cooldown period so later turns go straight to the next engine.
+    """
+
+    def __init__(self, backends: List[RecognizerBackend], cooldown: float = 30.0):
+        self.backends = [backend for backend in backends if backend.available()]
+        self.cooldown = cooldown
+        self.skip_until: Dict[str, float] = {}
+        self.last_backend: Optional[str] = None
+        if not self.backends:
+            logging.warning("No speech recognition backend available")
+
+    def recognize(self, audio: "sr.AudioData", language: str) -> str:
+        not_understood = False
+        last_error: Optional[Exception] = None
+        now = time.monotonic()
+        for backend in self.backends:
+            if self.skip_until.get(backend.name, 0) > now:
+                continue
+            started = time.perf_counter()
+            try:
+                text = backend.recognize(audio, language)
+                elapsed = time.perf_counter() - started
+                METRICS.observe("recognize", elapsed, backend=backend.name)
+                self.last_backend = backend.name
+                logging.info(f"Recognized speech with {backend.name}",
+                             extra={"backend": backend.name, "latency_ms": round(elapsed * 1000, 2)})
+                return text
+            except sr.UnknownValueError:
+                METRICS.observe("recognize", time.perf_counter() - started, backend=backend.name)
+                not_understood = True
+            except Exception as e:
+                logging.warning(f"Recognizer {backend.name} failed, trying next: {e}",
+                                extra={"backend": backend.name})
+                self.skip_until[backend.name] = now + self.cooldown
+                last_error = e
+        if not_understood:
+            raise sr.UnknownValueError()
+        raise sr.RequestError(f"All recognizers failed: {last_error}")
+
+
+def completed(value: Any) -> Future:
+    """Return a future that already holds value"""
+    future: Future = Future()
+    future.set_result(value)
+    return future
+
+
+class Deadline:
+    """A callback scheduled on a DeadlineTimer"""
+
+    __slots__ = ("callback", "cancelled")
+
+    def __init__(self, callback: Callable[[], None]):
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+
+class DeadlineTimer:
+    """Runs callbacks at their deadlines from a single thread.
+
+    Deadlines sit in a min-heap, as in ReminderScheduler, so scheduling one is
+    O(log n) and the thread only sleeps until the earliest. Cancelled ones are
+    skipped when they come up. Callbacks run on the timer thread and should
+    be quick.
+    """
+
+    def __init__(self, name: str = "deadlines", clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.clock = clock
+        self.heap: List[Tuple[float, int, Deadline]] = []
+        self.counter = itertools.count()
+        self.condition = threading.Condition()
+        self.thread: Optional[threading.Thread] = None
+        self.stopping = False
+
+    def call_later(self, delay: float, callback: Callable[[], None]) -> Deadline:
+        deadline = Deadline(callback)
+        with self.condition:
+            heapq.heappush(self.heap, (self.clock() + delay, next(self.counter), deadline))
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self.thread.start()
+            # Only an earlier deadline changes how long the thread should sleep
+            if self.heap[0][2] is deadline:
+                self.condition.notify()
+        return deadline
+
+    def stop(self) -> None:
+        with self.condition:
+            self.stopping = True
+            self.condition.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self.condition:
+                while not self.stopping:
+                    now = self.clock()
+                    if self.heap and self.heap[0][0] <= now:
+                        break
+                    self.condition.wait(self.heap[0][0] - now if self.heap else None)
+                if self.stopping:
+                    return
+                due = []
+                while self.heap and self.heap[0][0] <= now:
+                    deadline = heapq.heappop(self.heap)[2]
+                    if not deadline.cancelled:
+                        due.append(deadline)
+            for deadline in due:
+                try:
+                    deadline.callback()
+                except Exception as e:
+                    logging.error(f"Error in {self.name} callback: {e}")
+
+
+class CommandExecutor:
+    """Runs intent handlers on a bounded worker pool.
+
+    Every command gets a response future. Per-intent semaphores cap how many
+    requests of one intent may run at once, an acknowledgement is spoken when
+    a handler is slow, and a timeout resolves the future with an apology if
+    the handler overruns (the worker itself finishes in the background).
+    Both deadlines of every request share one DeadlineTimer thread.
+    """
+
+    def __init__(self, workers: int = 4, timeouts: Optional[Dict[str, float]] = None,
+                 concurrency: Optional[Dict[str, int]] = None, acknowledge_after: float = 0.7,
+                 on_acknowledge: Optional[Callable[[str], None]] = None):
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="command")
+        self.timeouts = dict(timeouts or {})
+        self.default_timeout = self.timeouts.pop('default', 20.0)
+        self.slots = {intent: threading.BoundedSemaphore(limit)
+                      for intent, limit in (concurrency or {}).items()}
+        self.acknowledge_after = acknowledge_after
+        self.on_acknowledge = on_acknowledge
+        self.lock = threading.Lock()
+        self.deadlines = DeadlineTimer("command-deadlines")
+
+    def submit(self, intent: str, handler: Callable[[str], Optional[str]], query: str) -> Future:
+        """Run handler(query) on the pool; returns a future of the response text"""
+        response: Future = Future()
+        response.set_running_or_notify_cancel()
+
+        slot = self.slots.get(intent)
+        if slot is not None and not slot.acquire(blocking=False):
+            response.set_result(f"I'm still working on the previous {intent} request")
+            return response
+
+        def settle(result: Optional[str]) -> None:
+            with self.lock:
+                if not response.done():
+                    response.set_result(result)
+
+        def run() -> None:
+            try:
+                with METRICS.span("handler", intent=intent):
+                    result = handler(query)
+            except Exception as e:
+                logging.error(f"Error handling {intent} command: {e}", extra={"intent": intent})
+                result = "Sorry, something went wrong with that request"
+            finally:
+                if slot is not None:
+                    slot.release()
+            settle(result)
+
+        timeout = self.timeouts.get(intent, self.default_timeout)
+
+        def time_out() -> None:
+            logging.warning(f"{intent} command timed out after {timeout}s",
+                            extra={"intent": intent, "latency_ms": timeout * 1000})
+            settle(f"Sorry, the {intent} request is taking too long")
+
+        deadlines = [self.deadlines.call_later(timeout, time_out)]
+        if self.on_acknowledge is not None:
+            deadlines.append(self.deadlines.call_later(
+                self.acknowledge_after, lambda: response.done() or self.on_acknowledge(intent)))
+        response.add_done_callback(lambda _: [deadline.cancel() for deadline in deadlines])
+
+        self.pool.submit(run)
+        return response
+
+    def shutdown(self) -> None:
+        self.deadlines.stop()
+        self.pool.shutdown(wait=False)
+
+
+class HttpClient:
+    """Shared HTTP layer for the web APIs.
+
+    One pooled requests.Session keeps connections alive between calls. Every
+    request has a timeout, transient failures are retried with jittered
+    exponential backoff, and a semaphore caps concurrent upstream requests.
+    """
+
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+    def __init__(self, timeout: float = 10.0, connect_timeout: float = 3.05, retries: int = 2,
+                 backoff: float = 0.3, max_concurrency: int = 8):
+        self.timeout = (connect_timeout, timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.slots = threading.BoundedSemaphore(max_concurrency)
+        self.max_concurrency = max_concurrency
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    @property
+    def session(self) -> "requests.Session":
+        """The pooled session, created (and requests imported) on first use"""
+        with self._session_lock:
+            if self._session is None:
+                session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(pool_connections=self.max_concurrency,
+                                                        pool_maxsize=self.max_concurrency)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                session.headers['User-Agent'] = 'JARVIS/0.2 (voice assistant)'
+                self._session = session
+            return self._session
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None,
+            timeout: Optional[float] = None) -> "requests.Response":
+        """GET with retries; raises on network failure after the last attempt"""
+        return self.request("GET", url, timeout, params=params)
+
+    def post_json(self, url: str, payload: Dict[str, Any], timeout: Optional[float] = None) -> Any:
+        return self.request("POST", url, timeout, json=payload).json()
+
+    def request(self, method: str, url: str, timeout: Optional[float] = None, **kwargs) -> "requests.Response":
+        timeout = (self.timeout[0], timeout) if timeout else self.timeout
+        for attempt in range(self.retries + 1):
+            try:
+                with self.slots:
+                    response = self.session.request(method, url, timeout=timeout, **kwargs)
+                if response.status_code not in self.RETRY_STATUSES or attempt == self.retries:
+                    return response
+                logging.warning(f"HTTP {response.status_code} from {url}, retrying")
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.retries:
+                    raise
+                logging.warning(f"Request to {url} failed, retrying: {e}")
+            time.sleep(self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5))
+        raise RuntimeError("unreachable")
+
+    def get_json(self, url: str, params: Optional[Dict[str, Any]] = None,
+                 timeout: Optional[float] = None) -> Any:
+        return self.get(url, params=params, timeout=timeout).json()
+
+    def close(self) -> None:
+        if self._session is not None:
+            self._session.close()
+
+
+class ResponseCache:
+    """TTL cache for upstream lookups with stale-while-revalidate.
+
+    Entries live in a bounded in-memory LRU and, optionally, in a SQLite file
+    so they survive restarts. A fresh entry is returned directly. An expired
+    one is still returned for up to stale_factor times its TTL while a
+    background refresh fetches a new value. Anything older is fetched
+    synchronously. Fetchers return None (or raise) for results that must not
+    be cached.
+    """
+
+    def __init__(self, ttls: Dict[str, float], max_entries: int = 512,
+                 path: Optional[str] = None, stale_factor: float = 3.0,
+                 clock: Callable[[], float] = time.time):
+        self.ttls = ttls
+        self.max_entries = max_entries
+        self.stale_factor = stale_factor
+        self.clock = clock
+        self.lock = threading.RLock()
+        self.memory: "OrderedDict[Tuple[str, str], Tuple[str, float]]" = OrderedDict()
+        self.refreshing: set = set()
+        self.counters: Dict[str, Dict[str, int]] = {}
+        self.db = None
+        if path:
+            try:
+                Path(path).parent.mkdir(parents=True, exist_ok=True)
+                self.db = sqlite3.connect(path, check_same_thread=False)
+                self.db.execute("CREATE TABLE IF NOT EXISTS responses ("
+                                "source TEXT, key TEXT, value TEXT, fetched_at REAL, "
+                                "PRIMARY KEY (source, key))")
+                self.db.commit()
+            except sqlite3.Error as e:
+                logging.warning(f"Response cache will not persist: {e}")
+                self.db = None
+
+    def _count(self, source: str, outcome: str) -> None:
+        counters = self.counters.setdefault(source, {"hits": 0, "stale": 0, "misses": 0})
+        counters[outcome] += 1
+
+    def _lookup(self, source: str, key: str) -> Optional[Tuple[str, float]]:
+        entry = self.memory.get((source, key))
+        if entry is not None:
+            self.memory.move_to_end((source, key))
+            return entry
+        if self.db is not None:
+            row = self.db.execute("SELECT value, fetched_at FROM responses WHERE source = ? AND key = ?",
+                                  (source, key)).fetchone()
+            if row is not None:
+                self._remember(source, key, row[0], row[1])
+                return row[0], row[1]
+        return None
+
+    def _remember(self, source: str, key: str, value: str, fetched_at: float) -> None:
+        self.memory[(source, key)] = (value, fetched_at)
+        self.memory.move_to_end((source, key))
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+
+    def put(self, source: str, key: str, value: str) -> None:
+        """Store a freshly fetched value"""
+        now = self.clock()
+        with self.lock:
+            self._remember(source, key, value, now)
+            if self.db is not None:
+                try:
+                    self.db.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                                    (source, key, value, now))
+                    self.db.commit()
+                except sqlite3.Error as e:
+                    logging.warning(f"Could not persist cached response: {e}")
+
+    def put_many(self, source: str, items: Dict[str, str]) -> None:
+        """Store several freshly fetched values in one transaction"""
+        now = self.clock()
+        with self.lock:
+            for key, value in items.items():
+                self._remember(source, key, value, now)
+            if self.db is not None:
+                try:
+                    self.db.executemany("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                                        [(source, key, value, now) for key, value in items.items()])
+                    self.db.commit()
+                except sqlite3.Error as e:
+                    logging.warning(f"Could not persist cached responses: {e}")
+
+    def lookup(self, source: str, key: str) -> Optional[str]:
+        """A fresh cached value for (source, key), without fetching on a miss"""
+        ttl = self.ttls.get(source, 0)
+        with self.lock:
+            entry = self._lookup(source, key)
+            if entry is not None and self.clock() - entry[1] < ttl:
+                self._count(source, "hits")
+                return entry[0]
+            self._count(source, "misses")
+            return None
+
+    def get(self, source: str, key: str, fetch: Callable[[], Optional[str]]) -> Optional[str]:
+        """Return a cached value for (source, key), fetching it when needed"""
+        ttl = self.ttls.get(source, 0)
+        with self.lock:
+            entry = self._lookup(source, key)
+            age = self.clock() - entry[1] if entry is not None else None
+            if entry is not None and age < ttl:
+                self._count(source, "hits")
+                return entry[0]
+            if entry is not None and age < ttl * self.stale_factor:
+                self._count(source, "stale")
+                self._refresh(source, key, fetch)
+                return entry[0]
+            self._count(source, "misses")
+
+        value = fetch()
+        if value is not None and ttl > 0:
+            self.put(source, key, value)
+        return value
+
+    def _refresh(self, source: str, key: str, fetch: Callable[[], Optional[str]]) -> None:
+        """Revalidate an entry in the background, once per key at a time"""
+        if (source, key) in self.refreshing:
+            return
+        self.refreshing.add((source, key))
+
+        def refresh():
+            try:
+                value = fetch()
+                if value is not None:
+                    self.put(source, key, value)
+            except Exception as e:
+                logging.warning(f"Background refresh of {source} '{key}' failed: {e}")
+            finally:
+                with self.lock:
+                    self.refreshing.discard((source, key))
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-source hit, stale-hit and miss counters with hit rate"""
+        with self.lock:
+            stats = {}
+            for source, counters in self.counters.items():
+                lookups = sum(counters.values())
+                stats[source] = dict(counters, hit_rate=(counters["hits"] + counters["stale"]) / lookups)
+            return stats
+
+
+def is_online(host: str = "8.8.8.8", port: int = 53, timeout: float = 1.5) -> bool:
+    """Cheap connectivity probe: can we open a TCP connection to a public DNS server?"""
+    try:
+        socket.create_connection((host, port), timeout=timeout).close()
+        return True
+    except OSError:
+        return False
+
+
+class PrefetchJob:
+    """A periodic refresh registered with the PrefetchScheduler"""
+
+    def __init__(self, name: str, interval: float, run: Callable[[], None]):
+        self.name = name
+        self.interval = interval
+        self.run = run
+        self.failures = 0
+        self.runs = 0
+
+
+class PrefetchScheduler:
+    """Single background thread that keeps hot data warm.
+
+    Jobs sit in a heap ordered by their next due time. Before running a job the
+    scheduler asks pause_reason() whether refreshing is allowed right now
+    (offline, metered connection, on battery); paused jobs are retried later.
+    Failing jobs back off exponentially with jitter, capped at their interval.
+    """
+
+    PAUSE_RETRY = 60.0
+
+    def __init__(self, pause_reason: Callable[[], Optional[str]] = lambda: None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.pause_reason = pause_reason
+        self.clock = clock
+        self.heap: List[Tuple[float, int, PrefetchJob]] = []
+        self.sequence = itertools.count()
+        self.wakeup = threading.Condition()
+        self.running = False
+        self.thread: Optional[threading.Thread] = None
+
+    def add(self, name: str, interval: float, run: Callable[[], None], delay: float = 0.0) -> PrefetchJob:
+        job = PrefetchJob(name, interval, run)
+        self._schedule(job, delay)
+        return job
+
+    def _schedule(self, job: PrefetchJob, delay: float) -> None:
+        with self.wakeup:
+            heapq.heappush(self.heap, (self.clock() + delay, next(self.sequence), job))
+            self.wakeup.notify()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="prefetch", daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        with self.wakeup:
+            self.running = False
+            self.wakeup.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self.wakeup:
+                while self.running and (not self.heap or self.heap[0][0] > self.clock()):
+                    self.wakeup.wait(self.heap[0][0] - self.clock() if self.heap else None)
+                if not self.running:
+                    return
+                _, _, job = heapq.heappop(self.heap)
+            self._schedule(job, self.run_job(job))
+
+    def run_job(self, job: PrefetchJob) -> float:
+        """Run one job and return the delay until it should run again"""
+        reason = self.pause_reason()
+        if reason:
+            logging.info(f"Prefetch of {job.name} paused: {reason}")
+            return min(job.interval, self.PAUSE_RETRY)
+        try:
+            job.run()
+            job.failures = 0
+            job.runs += 1
+            return job.interval
+        except Exception as e:
+            job.failures += 1
+            delay = min(job.interval, 5.0 * 2 ** job.failures) * random.uniform(0.8, 1.2)
+            logging.warning(f"Prefetch of {job.name} failed, retrying in {delay:.0f}s: {e}")
+            return delay
+
+
+class TelemetrySampler:
+    """Background sampler of system load into a fixed-size NumPy ring buffer.
+
+    One thread polls psutil at a fixed cadence; readers such as
+    get_system_info and the GUI gauge only look at the buffer. Rows hold a
+    timestamp, overall CPU, memory, disk usage, disk and network throughput,
+    battery and per-core CPU. Battery is polled less often because it is slow
+    to read on some systems.
+    """
+
+    COLUMNS = ("time", "cpu", "memory", "disk", "disk_read", "disk_write",
+               "net_recv", "net_sent", "battery", "plugged")
+
+    def __init__(self, interval: float = 2.0, history: float = 900.0,
+                 battery_interval: float = 30.0, disk_path: Optional[str] = None):
+        self.interval = interval
+        self.battery_every = max(1, int(battery_interval / interval))
+        self.disk_path = disk_path or os.path.abspath(os.sep)
+        self.cores = psutil.cpu_count() or 1
+        self.column = {name: i for i, name in enumerate(self.COLUMNS)}
+        self.buffer = np.full((max(2, int(history / interval)), len(self.COLUMNS) + self.cores), np.nan)
+        self.index = 0
+        self.count = 0
+        self.lock = threading.Lock()
+        self.sampled = threading.Event()
+        self.stopping = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+        self.previous_io: Optional[Tuple[float, Any, Any]] = None
+        self.battery: Tuple[float, float] = (np.nan, np.nan)
+
+    def start(self) -> None:
+        if self.thread is not None:
+            return
+        # cpu_percent measures since the previous call, so prime it first
+        psutil.cpu_percent(percpu=True)
+        self.thread = threading.Thread(target=self._run, name="telemetry", daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.stopping.set()
+
+    def _run(self) -> None:
+        delay = min(0.5, self.interval)
+        ticks = 0
+        while not self.stopping.wait(delay):
+            try:
+                self.sample(read_battery=ticks % self.battery_every == 0)
+            except Exception as e:
+                logging.error(f"Error sampling telemetry: {e}")
+            ticks += 1
+            delay = self.interval
+
+    def sample(self, read_battery: bool = True) -> None:
+        """Take one reading and append it to the ring buffer"""
+        now = time.time()
+        cores = psutil.cpu_percent(percpu=True)
+        memory = psutil.virtual_memory().percent
+        disk = psutil.disk_usage(self.disk_path).percent
+        disk_io = psutil.disk_io_counters()
+        net_io = psutil.net_io_counters()
+        rates = [np.nan] * 4
+        if self.previous_io is not None:
+            then, previous_disk, previous_net = self.previous_io
+            elapsed = max(now - then, 1e-6)
+            if disk_io is not None and previous_disk is not None:
+                rates[0] = (disk_io.read_bytes - previous_disk.read_bytes) / elapsed
+                rates[1] = (disk_io.write_bytes - previous_disk.write_bytes) / elapsed
+            rates[2] = (net_io.bytes_recv - previous_net.bytes_recv) / elapsed
+            rates[3] = (net_io.bytes_sent - previous_net.bytes_sent) / elapsed
+        self.previous_io = (now, disk_io, net_io)
+        if read_battery:
+            battery = psutil.sensors_battery()
+            self.battery = (battery.percent, float(battery.power_plugged)) if battery else (np.nan, np.nan)
+
+        row = [now, sum(cores) / len(cores), memory, disk, *rates, *self.battery]
+        row += (list(cores) + [np.nan] * self.cores)[:self.cores]
+        with self.lock:
+            self.buffer[self.index] = row
+            self.index = (self.index + 1) % len(self.buffer)
+            self.count = min(self.count + 1, len(self.buffer))
+        self.sampled.set()
+
+    def wait_for_sample(self, timeout: float) -> bool:
+        return self.sampled.wait(timeout)
+
+    def history(self, seconds: Optional[float] = None) -> np.ndarray:
+        """Rows in time order, optionally only the last seconds of them"""
+        with self.lock:
+            rows = np.roll(self.buffer, -self.index, axis=0)[-self.count:] if self.count else self.buffer[:0]
+            rows = rows.copy()
+        if seconds is not None and len(rows):
+            rows = rows[rows[:, 0] >= rows[-1, 0] - seconds]
+        return rows
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        """The newest reading as a dict, with per-core CPU under "cores" """
+        with self.lock:
+            if not self.count:
+                return None
+            row = self.buffer[(self.index - 1) % len(self.buffer)].copy()
+        reading = {name: float(row[i]) for i, name in enumerate(self.COLUMNS)}
+        reading["cores"] = row[len(self.COLUMNS):].tolist()
+        return reading
+
+    def average(self, name: str, seconds: float) -> Tuple[float, float]:
+        """Mean of one column over the last seconds, and the span actually covered"""
+        rows = self.history(seconds)
+        values = rows[:, self.column[name]] if len(rows) else rows[:0, 0]
+        values = values[~np.isnan(values)]
+        if not values.size:
+            return float("nan"), 0.0
+        return float(values.mean()), float(rows[-1, 0] - rows[0, 0])
+
+
+# Shell targets for Windows, launched through "start"
+WINDOWS_APPS = {
+    'notepad': 'notepad',
+    'calculator': 'calc',
+    'paint': 'mspaint',
+    'word': 'winword',
+    'excel': 'excel',
+    'powerpoint': 'powerpnt',
+    'outlook': 'outlook',
+    'cmd': 'cmd',
+    'powershell': 'powershell',
+    'task manager': 'taskmgr',
+    'control panel': 'control',
+    'settings': 'ms-settings:',
+    'file explorer': 'explorer',
+    'browser': 'microsoft-edge:',
+    'edge': 'microsoft-edge:',
+    'chrome': 'chrome',
+    'firefox': 'firefox',
+    'opera': 'opera',
+    'brave': 'brave',
+    'vscode': 'code',
+    'visual studio code': 'code',
+    'terminal': 'wt',
+    'windows terminal': 'wt',
+    'photos': 'ms-photos:',
+    'camera': 'microsoft.windows.camera:',
+    'store': 'ms-windows-store:',
+    'mail': 'outlookmail:',
+    'calendar': 'outlookcal:',
+    'maps': 'bingmaps:',
+    'weather': 'msnweather:',
+    'news': 'msnnews:',
+    'sports': 'msnsports:',
+    'money': 'msnmoney:',
+    'music': 'explorer shell:MusicLibrary',
+    'movies': 'mswindowsvideo:',
+    'photoshop': 'photoshop',
+    'illustrator': 'illustrator',
+    'premiere': 'premiere',
+    'after effects': 'afterfx',
+    'audition': 'audition',
+    'lightroom': 'lightroom',
+    'bridge': 'bridge',
+    'acrobat': 'acrobat',
+    'reader': 'acrord32',
+    'teams': 'teams',
+    'zoom': 'zoom',
+    'skype': 'skype',
+    'discord': 'discord',
+    'spotify': 'spotify',
+    'vlc': 'vlc',
+    'media player': 'wmplayer',
+    'windows media player': 'wmplayer',
+    'groove music': 'mswindowsmusic:',
+    'movies & tv': 'mswindowsvideo:',
+    'alarms': 'ms-clock:',
+    'clock': 'ms-clock:',
+    'this pc': 'explorer',
+    'my computer': 'explorer shell:MyComputerFolder',
+    'documents': 'explorer shell:DocumentsLibrary',
+    'downloads': 'explorer shell:Downloads',
+    'pictures': 'explorer shell:PicturesLibrary',
+    'videos': 'explorer shell:VideosLibrary',
+    'desktop': 'explorer shell:Desktop',
+    'recycle bin': 'explorer shell:RecycleBinFolder',
+    'network': 'explorer shell:NetworkPlacesFolder',
+    'printers': 'explorer shell:PrintersFolder',
+    'fonts': 'explorer shell:Fonts',
+    'start menu': 'explorer shell:StartMenu',
+    'run': 'shell:AppsFolder',
+    'apps': 'shell:AppsFolder',
+    'programs': 'shell:ProgramFiles',
+    'program files': 'shell:ProgramFiles',
+    'program files (x86)': 'shell:ProgramFilesX86',
+    'system32': 'explorer shell:System',
+    'system': 'explorer shell:System',
+    'windows': 'explorer shell:Windows',
+    'users': 'explorer shell:UsersFilesFolder',
+    'user': 'explorer shell:UsersFilesFolder',
+    'public': 'explorer shell:CommonDocuments',
+    'shared': 'explorer shell:CommonDocuments',
+    'temp': 'explorer shell:Temp',
+    'temporary': 'explorer shell:Temp',
+    'recent': 'explorer shell:Recent',
+    'favorites': 'explorer shell:Favorites',
+    'links': 'explorer shell:Links',
+    'search': 'explorer shell:SearchHomeFolder',
+    'home': 'explorer shell:HomeFolder',
+    'personal': 'explorer shell:Personal',
+    'my documents': 'explorer shell:Personal',
+    'my pictures': 'explorer shell:My Pictures',
+    'my music': 'explorer shell:My Music',
+    'my videos': 'explorer shell:My Video',
+    'computer': 'explorer shell:MyComputerFolder'
+}
+
+# Application names for macOS, launched through "open -a"
+MAC_APPS = {
+    'terminal': 'Terminal',
+    'finder': 'Finder',
+    'safari': 'Safari',
+    'settings': 'System Settings',
+    'system settings': 'System Settings',
+    'activity monitor': 'Activity Monitor',
+    'calculator': 'Calculator',
+    'notes': 'Notes',
+    'mail': 'Mail',
+    'calendar': 'Calendar',
+    'music': 'Music',
+    'photos': 'Photos',
+    'app store': 'App Store'
+}
+
+# Never launched from PATH by voice, however well they match
+PATH_DENYLIST = {'shutdown', 'reboot', 'halt', 'poweroff', 'init', 'telinit', 'systemctl',
+                 'rm', 'rmdir', 'dd', 'mkfs', 'kill', 'killall', 'pkill', 'sudo', 'su', 'doas'}
+
+
+class AppEntry(NamedTuple):
+    name: str
+    command: Tuple[str, ...]
+    source: str
+    aliases: Tuple[str, ...]
+
+
+def name_tokens(text: str) -> List[str]:
+    return re.findall(r"[a-z0-9]+", text.lower())
+
+
+class AppLauncher:
+    """Index of launchable applications with fuzzy, multi-word lookup.
+
+    On Linux the index comes from .desktop files in the XDG data dirs and
+    from executables on PATH; on macOS from .app bundles; on Windows from
+    Start Menu shortcuts. A built-in table per platform plus the user's
+    launcher.apps are added on top. Scanned directories are cached in a JSON
+    file with their mtimes, so a refresh only rescans directories that
+    changed, e.g. after an application is installed. Matching is token based:
+    every spoken word has to match a word of a name or alias, exactly, by
+    prefix or by close spelling. PATH executables only match exactly.
+    """
+
+    FIELD_CODES = re.compile(r"%[fFuUdDnNickvm]")
+
+    def __init__(self, cache_path: str, table: Optional[Dict[str, str]] = None,
+                 include_path: bool = True, refresh_interval: float = 60.0,
+                 platform: str = sys.platform):
+        self.cache_path = cache_path
+        self.platform = platform
+        self.include_path = include_path
+        self.refresh_interval = refresh_interval
+        self.table = dict(WINDOWS_APPS if platform == 'win32' else MAC_APPS if platform == 'darwin' else {})
+        self.table.update(table or {})
+        self.dirs: Dict[str, Dict[str, Any]] = {}
+        self.entries: List[AppEntry] = []
+        self.tokens: Dict[str, set] = {}
+        self.last_refresh = 0.0
+        self.lock = threading.Lock()
+        self.load_cache()
+
+    def source_dirs(self) -> List[Tuple[str, str]]:
+        """(directory, kind) pairs to scan on this platform"""
+        home = os.path.expanduser("~")
+        if self.platform == 'win32':
+            roots = [os.environ.get('ProgramData', r'C:\ProgramData'), os.environ.get('APPDATA', '')]
+            return [(os.path.join(root, 'Microsoft', 'Windows', 'Start Menu', 'Programs'), 'shortcut')
+                    for root in roots if root]
+        if self.platform == 'darwin':
+            return [('/Applications', 'bundle'), ('/System/Applications', 'bundle'),
+                    (os.path.join(home, 'Applications'), 'bundle')]
+        data_home = os.environ.get('XDG_DATA_HOME', os.path.join(home, '.local', 'share'))
+        data_dirs = os.environ.get('XDG_DATA_DIRS', '/usr/local/share:/usr/share').split(':')
+        dirs = [(os.path.join(base, 'applications'), 'desktop')
+                for base in [data_home, *data_dirs,
+                             '/var/lib/flatpak/exports/share',
+                             os.path.join(data_home, 'flatpak', 'exports', 'share')] if base]
+        if self.include_path:
+            dirs += [(path, 'path') for path in os.environ.get('PATH', '').split(os.pathsep) if path]
+        # Keep the first occurrence, which has the highest XDG precedence
+        return list(OrderedDict.fromkeys(dirs))
+
+    def load_cache(self) -> None:
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            self.dirs = {directory: {"kind": info["kind"], "mtime": info["mtime"],
+                                     "entries": [AppEntry(e[0], tuple(e[1]), e[2], tuple(e[3]))
+                                                 for e in info["entries"]]}
+                         for directory, info in cached.get("dirs", {}).items()}
+            self.rebuild()
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logging.warning(f"Ignoring unreadable application cache: {e}")
+
+    def save_cache(self) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+            temporary = f"{self.cache_path}.tmp"
+            with open(temporary, 'w', encoding='utf-8') as f:
+                json.dump({"dirs": {d: {"kind": info["kind"], "mtime": info["mtime"],
+                                        "entries": [list(e) for e in info["entries"]]}
+                                    for d, info in self.dirs.items()}}, f)
+            os.replace(temporary, self.cache_path)
+        except OSError as e:
+            logging.warning(f"Could not save application cache: {e}")
+
+    def refresh(self) -> int:
+        """Rescan directories whose mtime changed; returns how many were rescanned"""
+        with self.lock:
+            self.last_refresh = time.monotonic()
+            wanted = self.source_dirs()
+            changed = 0
+            dirs = {}
+            for directory, kind in wanted:
+                try:
+                    mtime = os.stat(directory).st_mtime
+                except OSError:
+                    continue
+                cached = self.dirs.get(directory)
+                if cached is not None and cached["mtime"] == mtime and cached["kind"] == kind:
+                    dirs[directory] = cached
+                    continue
+                dirs[directory] = {"kind": kind, "mtime": mtime, "entries": self.scan(directory, kind)}
+                changed += 1
+            if changed or set(dirs) != set(self.dirs) or not self.entries:
+                self.dirs = dirs
+                self.rebuild()
+                self.save_cache()
+                logging.info(f"Application index: {len(self.entries)} entries, {changed} directories rescanned")
+            return changed
+
+    def refresh_async(self) -> threading.Thread:
+        thread = threading.Thread(target=self.refresh, name="app-index", daemon=True)
+        thread.start()
+        return thread
+
+    def scan(self, directory: str, kind: str) -> List[AppEntry]:
+        entries = []
+        try:
+            names = sorted(os.listdir(directory))
+        except OSError:
+            return entries
+        for filename in names:
+            path = os.path.join(directory, filename)
+            try:
+                if kind == 'desktop' and filename.endswith('.desktop'):
+                    entry = self.parse_desktop_file(path)
+                elif kind == 'path' and filename.lower() not in PATH_DENYLIST \
+                        and os.path.isfile(path) and os.access(path, os.X_OK):
+                    entry = AppEntry(filename, (path,), 'path', ())
+                elif kind == 'bundle' and filename.endswith('.app'):
+                    entry = AppEntry(filename[:-4], ('open', '-a', path), 'bundle', ())
+                elif kind == 'shortcut' and filename.lower().endswith('.lnk'):
+                    entry = AppEntry(filename[:-4], ('cmd', '/c', 'start', '', path), 'shortcut', ())
+                elif kind == 'shortcut' and os.path.isdir(path):
+                    entries.extend(self.scan(path, kind))
+                    continue
+                else:
+                    entry = None
+            except OSError:
+                entry = None
+            if entry is not None:
+                entries.append(entry)
+        return entries
+
+    @classmethod
+    def parse_desktop_file(cls, path: str) -> Optional[AppEntry]:
+        """Name, aliases and argv from a freedesktop .desktop file"""
+        fields: Dict[str, str] = {}
+        section = None
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                line = line.strip()
+                if line.startswith('['):
+                    section = line
+                elif section == '[Desktop Entry]' and '=' in line:
+                    key, value = line.split('=', 1)
+                    fields.setdefault(key.strip(), value.strip())
+        if fields.get('Type', 'Application') != 'Application' or 'Exec' not in fields:
+            return None
+        if fields.get('NoDisplay', '').lower() == 'true' or fields.get('Hidden', '').lower() == 'true':
+            return None
+        try:
+            argv = [arg for arg in shlex.split(fields['Exec']) if not cls.FIELD_CODES.fullmatch(arg)]
+        except ValueError:
+            return None
+        if not argv:
+            return None
+        argv = [cls.FIELD_CODES.sub('', arg).replace('%%', '%') for arg in argv]
+        name = fields.get('Name', os.path.basename(path)[:-len('.desktop')])
+        aliases = [fields.get('GenericName', ''), os.path.basename(argv[0]),
+                   *fields.get('Keywords', '').split(';')]
+        return AppEntry(name, tuple(argv), 'desktop', tuple(a for a in aliases if a))
+
+    def rebuild(self) -> None:
+        """Recompute entries and the token index from the scanned directories and the table"""
+        entries: List[AppEntry] = []
+        for name, target in self.table.items():
+            if self.platform == 'win32':
+                command = ('cmd', '/c', 'start', '', *target.split(' ', 1))
+            elif self.platform == 'darwin':
+                command = ('open', '-a', target)
+            else:
+                command = tuple(shlex.split(target))
+            entries.append(AppEntry(name, command, 'table', ()))
+        # Earlier entries win ties, so the table overrides scanned names
+        seen = {entry.name.lower() for entry in entries}
+        for info in self.dirs.values():
+            for entry in info["entries"]:
+                key = entry.name.lower()
+                if key not in seen:
+                    seen.add(key)
+                    entries.append(entry)
+        tokens: Dict[str, set] = {}
+        for index, entry in enumerate(entries):
+            for alias in (entry.name, *entry.aliases):
+                for token in name_tokens(alias):
+                    tokens.setdefault(token, set()).add(index)
+        self.entries, self.tokens = entries, tokens
+
+    def maybe_refresh(self) -> None:
+        """Pick up newly installed applications, at most once per refresh_interval"""
+        if not self.entries:
+            self.refresh()
+        elif time.monotonic() - self.last_refresh > self.refresh_interval and not self.lock.locked():
+            self.refresh_async()
+
+    @staticmethod
+    def token_similarity(spoken: str, token: str) -> float:
+        if spoken == token:
+            return 1.0
+        if len(spoken) >= 3 and token.startswith(spoken):
+            return 0.9
+        ratio = difflib.SequenceMatcher(None, spoken, token).ratio()
+        return ratio if ratio >= 0.8 else 0.0
+
+    def score(self, spoken: List[str], entry: AppEntry) -> float:
+        best = 0.0
+        for alias in (entry.name, *entry.aliases):
+            words = name_tokens(alias)
+            if not words:
+                continue
+            if entry.source == 'path' and words != spoken:
+                continue
+            # Split or run-together words: "task manager" vs "taskmanager"
+            if "".join(words) == "".join(spoken):
+                best = max(best, 0.95)
+            similarities = [max(self.token_similarity(s, w) for w in words) for s in spoken]
+            if min(similarities) == 0.0:
+                continue
+            coverage = sum(similarities) / len(similarities)
+            # Prefer names without extra words: "code" over "code insiders"
+            precision = min(1.0, len(spoken) / len(words))
+            best = max(best, 0.8 * coverage + 0.2 * precision)
+        return best
+
+    def find(self, name: str, threshold: float = 0.75) -> Optional[Tuple[AppEntry, float]]:
+        """Best entry for a spoken name, with its score, or None"""
+        self.maybe_refresh()
+        spoken = name_tokens(name)
+        if not spoken:
+            return None
+        entries, tokens = self.entries, self.tokens
+        candidates = set()
+        for word in spoken:
+            matches = [word] + difflib.get_close_matches(word, tokens.keys(), n=5, cutoff=0.8)
+            if len(word) >= 3:
+                matches += [token for token in tokens
+                            if token.startswith(word) or (len(token) >= 3 and word.startswith(token))]
+            for token in matches:
+                candidates |= tokens.get(token, set())
+        scored = [(self.score(spoken, entries[i]), i) for i in candidates]
+        scored = [(score, i) for score, i in scored if score >= threshold]
+        if not scored:
+            return None
+        score, index = max(scored, key=lambda item: (item[0], -item[1]))
+        return entries[index], score
+
+    def launch(self, entry: AppEntry) -> subprocess.Popen:
+        """Start the application without waiting for it"""
+        options: Dict[str, Any] = {"stdin": subprocess.DEVNULL, "stdout": subprocess.DEVNULL,
+                                   "stderr": subprocess.DEVNULL, "close_fds": True}
+        if self.platform == 'win32':
+            options["creationflags"] = getattr(subprocess, 'DETACHED_PROCESS', 0)
+        else:
+            options["start_new_session"] = True
+        return subprocess.Popen(list(entry.command), **options)
+
+
+def file_tokens(name: str) -> List[str]:
+    """Lowercase words of a file name, splitting camelCase and digit runs"""
+    return [t.lower() for t in re.findall(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])|\d+", name)]
+
+
+class FileIndex:
+    """On-disk index of the files under the configured folders.
+
+    Each file is stored once with its name tokens, extension, mtime and size
+    in SQLite. Directories keep their mtime, so a crawl only re-lists the
+    files of directories that changed. With the optional watchdog package,
+    inotify/FSEvents notifications trigger those crawls as soon as something
+    changes; without it the folders are re-crawled every rescan_seconds.
+    Searches are index lookups on token prefixes and never touch the disk.
+    """
+
+    CATEGORIES = {
+        'audio': {'mp3', 'flac', 'ogg', 'wav', 'm4a', 'aac', 'opus', 'wma'},
+        'image': {'jpg', 'jpeg', 'png', 'gif', 'heic', 'webp', 'bmp', 'tiff'},
+        'video': {'mp4', 'mkv', 'avi', 'mov', 'webm', 'wmv'},
+        'document': {'pdf', 'doc', 'docx', 'odt', 'txt', 'rtf', 'md'},
+        'spreadsheet': {'xls', 'xlsx', 'ods', 'csv'},
+        'presentation': {'ppt', 'pptx', 'odp', 'key'}
+    }
+    CATEGORY_WORDS = {
+        'song': 'audio', 'songs': 'audio', 'music': 'audio', 'track': 'audio', 'tune': 'audio',
+        'photo': 'image', 'photos': 'image', 'picture': 'image', 'pictures': 'image', 'image': 'image',
+        'video': 'video', 'videos': 'video', 'movie': 'video', 'film': 'video',
+        'document': 'document', 'documents': 'document',
+        'spreadsheet': 'spreadsheet', 'presentation': 'presentation', 'slides': 'presentation'
+    }
+    STOPWORDS = {'find', 'my', 'the', 'a', 'an', 'file', 'files', 'where', 'is', 'are', 'locate',
+                 'search', 'for', 'me', 'please', 'called', 'named', 'play', 'some', 'by', 'of', 'jarvis'}
+
+    def __init__(self, path: str, roots: List[str], rescan_seconds: float = 600.0):
+        self.roots = [os.path.abspath(os.path.expanduser(root)) for root in roots if root]
+        self.rescan_seconds = rescan_seconds
+        self.lock = threading.Lock()
+        self.stopping = threading.Event()
+        self.dirty: set = set()
+        self.dirty_event = threading.Event()
+        self.observer = None
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        # The index can always be rebuilt from disk, so skip the fsync per commit
+        self.db.executescript("""
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            CREATE TABLE IF NOT EXISTS dirs (id INTEGER PRIMARY KEY, path TEXT UNIQUE,
+                                             parent INTEGER, mtime REAL);
+            CREATE INDEX IF NOT EXISTS dirs_parent ON dirs (parent);
+            CREATE TABLE IF NOT EXISTS files (id INTEGER PRIMARY KEY, dir INTEGER, name TEXT,
+                                              ext TEXT, mtime REAL, size INTEGER, UNIQUE (dir, name));
+            CREATE TABLE IF NOT EXISTS tokens (token TEXT, file INTEGER, PRIMARY KEY (token, file))
+                WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS tokens_file ON tokens (file);
+        """)
+        self.db.commit()
+
+    def start(self) -> None:
+        """Crawl in the background, then keep the index current"""
+        threading.Thread(target=self._run, name="file-index", daemon=True).start()
+
+    def stop(self) -> None:
+        self.stopping.set()
+        self.dirty_event.set()
+        if self.observer is not None:
+            self.observer.stop()
+
+    def _run(self) -> None:
+        started = time.perf_counter()
+        for root in self.roots:
+            self.crawl(root)
+        logging.info(f"File index ready in {time.perf_counter() - started:.1f}s: {self.stats()}")
+        watching = self.watch()
+        last_crawl = time.monotonic()
+        while not self.stopping.is_set():
+            self.dirty_event.wait(timeout=5 if watching else self.rescan_seconds)
+            if self.stopping.is_set():
+                return
+            # Let bursts of events (a copy, an extraction) settle first
+            time.sleep(1.0)
+            self.dirty_event.clear()
+            with self.lock:
+                dirty, self.dirty = self.dirty, set()
+            for directory in dirty:
+                self.crawl(directory)
+            if time.monotonic() - last_crawl >= self.rescan_seconds:
+                for root in self.roots:
+                    self.crawl(root)
+                last_crawl = time.monotonic()
+
+    def watch(self) -> bool:
+        """Subscribe to change notifications if watchdog is installed"""
+        try:
+            from watchdog.observers import Observer
+            from watchdog.events import FileSystemEventHandler
+        except ImportError:
+            logging.info("watchdog not installed, file index will rescan periodically")
+            return False
+        index = self
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                paths = [event.src_path, getattr(event, 'dest_path', '')]
+                with index.lock:
+                    for path in filter(None, paths):
+                        index.dirty.add(path if event.is_directory else os.path.dirname(path))
+                        index.dirty.add(os.path.dirname(path))
+                index.dirty_event.set()
+
+        self.observer = Observer()
+        for root in self.roots:
+            if os.path.isdir(root):
+                self.observer.schedule(Handler(), root, recursive=True)
+        self.observer.daemon = True
+        self.observer.start()
+        return True
+
+    def crawl(self, top: str) -> None:
+        """Bring the index up to date for top and everything below it"""
+        stack = [top]
+        committed = time.monotonic()
+        while stack and not self.stopping.is_set():
+            directory = stack.pop()
+            try:
+                mtime = os.stat(directory).st_mtime
+                with os.scandir(directory) as scan:
+                    entries = [e for e in scan if not e.name.startswith('.')]
+            except OSError:
+                self.forget(directory)
+                continue
+            subdirs = [e.path for e in entries if e.is_dir(follow_symlinks=False)]
+            stack.extend(subdirs)
+            with self.lock:
+                row = self.db.execute("SELECT mtime FROM dirs WHERE path = ?", (directory,)).fetchone()
+            if row is not None and row[0] == mtime:
+                continue
+            files = [e for e in entries if e.is_file(follow_symlinks=False)]
+            try:
+                self.sync(directory, mtime, files, subdirs)
+            except (OSError, sqlite3.Error) as e:
+                logging.warning(f"Could not index {directory}: {e}")
+            if time.monotonic() - committed > 1.0:
+                with self.lock:
+                    self.db.commit()
+                committed = time.monotonic()
+        with self.lock:
+            self.db.commit()
+
+    def sync(self, directory: str, mtime: float, files: List[os.DirEntry], subdirs: List[str]) -> None:
+        """Replace the index entries of one changed directory"""
+        stats = {}
+        for entry in files:
+            try:
+                stat = entry.stat(follow_symlinks=False)
+                stats[entry.name] = (stat.st_mtime, stat.st_size)
+            except OSError:
+                continue
+        with self.lock:
+            db = self.db
+            parent = db.execute("SELECT id FROM dirs WHERE path = ?",
+                                (os.path.dirname(directory),)).fetchone()
+            db.execute("INSERT INTO dirs (path, parent, mtime) VALUES (?, ?, NULL) "
+                       "ON CONFLICT (path) DO NOTHING", (directory, parent[0] if parent else None))
+            dir_id = db.execute("SELECT id FROM dirs WHERE path = ?", (directory,)).fetchone()[0]
+
+            # Artist/album style folder names describe the files inside them
+            folder_tokens = set(file_tokens(os.path.basename(directory)))
+            folder_tokens |= set(file_tokens(os.path.basename(os.path.dirname(directory))))
+            existing = {name: (file_id, old_mtime, old_size) for file_id, name, old_mtime, old_size in
+                        db.execute("SELECT id, name, mtime, size FROM files WHERE dir = ?", (dir_id,))}
+            gone = [existing[name][0] for name in existing.keys() - stats.keys()]
+            for name, (file_mtime, size) in stats.items():
+                old = existing.get(name)
+                if old is not None:
+                    if (old[1], old[2]) == (file_mtime, size):
+                        continue
+                    gone.append(old[0])
+                stem, ext = os.path.splitext(name)
+                ext = ext[1:].lower()
+                file_id = db.execute("INSERT OR REPLACE INTO files (dir, name, ext, mtime, size) "
+                                     "VALUES (?, ?, ?, ?, ?)", (dir_id, name, ext, file_mtime, size)).lastrowid
+                tokens = set(file_tokens(stem)) | folder_tokens | ({ext} if ext else set())
+                db.executemany("INSERT OR IGNORE INTO tokens VALUES (?, ?)", [(t, file_id) for t in tokens])
+            self._delete_files(gone)
+
+            # Subdirectories that disappeared take their whole subtree with them
+            current = set(subdirs)
+            for (path,) in db.execute("SELECT path FROM dirs WHERE parent = ?", (dir_id,)).fetchall():
+                if path not in current:
+                    self._forget_tree(path)
+            db.execute("UPDATE dirs SET mtime = ? WHERE id = ?", (mtime, dir_id))
+
+    def _delete_files(self, file_ids: List[int]) -> None:
+        self.db.executemany("DELETE FROM tokens WHERE file = ?", [(i,) for i in file_ids])
+        self.db.executemany("DELETE FROM files WHERE id = ?", [(i,) for i in file_ids])
+
+    def _forget_tree(self, path: str) -> None:
+        prefix = path.rstrip(os.sep) + os.sep
+        upper = prefix[:-1] + chr(ord(os.sep) + 1)
+        dir_ids = [row[0] for row in self.db.execute(
+            "SELECT id FROM dirs WHERE path = ? OR (path >= ? AND path < ?)", (path, prefix, upper))]
+        for dir_id in dir_ids:
+            self._delete_files([row[0] for row in self.db.execute("SELECT id FROM files WHERE dir = ?",
+                                                                  (dir_id,))])
+        self.db.executemany("DELETE FROM dirs WHERE id = ?", [(i,) for i in dir_ids])
+
+    def forget(self, path: str) -> None:
+        """Drop a directory that no longer exists"""
+        with self.lock:
+            self._forget_tree(path)
+            self.db.commit()
+
+    def parse_query(self, text: str, ignore: Optional[set] = None) -> Tuple[List[str], Optional[set]]:
+        """Split a spoken request into name words and an optional extension filter"""
+        words, extensions = [], None
+        for word in re.findall(r"[a-z0-9]+", text.lower()):
+            if word in self.STOPWORDS or (ignore and word in ignore):
+                continue
+            category = self.CATEGORY_WORDS.get(word)
+            if category is not None:
+                extensions = self.CATEGORIES[category]
+            else:
+                words.append(word)
+        return words, extensions
+
+    def search(self, words: List[str], extensions: Optional[set] = None,
+               limit: int = 10) -> List[Tuple[str, float, int]]:
+        """(path, mtime, size) of files matching every word by prefix, newest first"""
+        clauses, params = [], []
+        for word in words:
+            clauses.append("SELECT file FROM tokens WHERE token >= ? AND token < ?")
+            params += [word, word + "\uffff"]
+        sql = ("SELECT d.path, f.name, f.mtime, f.size FROM files f JOIN dirs d ON d.id = f.dir")
+        conditions = []
+        if clauses:
+            conditions.append(f"f.id IN ({' INTERSECT '.join(clauses)})")
+        if extensions:
+            conditions.append(f"f.ext IN ({', '.join('?' * len(extensions))})")
+            params += sorted(extensions)
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY f.mtime DESC LIMIT ?"
+        params.append(limit)
+        with self.lock:
+            rows = self.db.execute(sql, params).fetchall()
+        return [(os.path.join(directory, name), mtime, size) for directory, name, mtime, size in rows]
+
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            files = self.db.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+            dirs = self.db.execute("SELECT COUNT(*) FROM dirs").fetchone()[0]
+        return {"files": files, "dirs": dirs}
+
+
+class Track(NamedTuple):
+    path: str
+    title: str
+    artist: str
+    album: str
+    duration: Optional[float]
+
+
+def read_tags(path: str, root: str) -> Track:
+    """Title, artist, album and duration of an audio file.
+
+    Tags come from mutagen when it is installed. Otherwise they are guessed
+    from an "Artist - Title" file name or an Artist/Album/track layout.
+    """
+    stem = os.path.splitext(os.path.basename(path))[0]
+    folders = os.path.relpath(os.path.dirname(path), root).split(os.sep)
+    folders = [folder for folder in folders if folder not in ('', '.')]
+    artist = folders[-2] if len(folders) >= 2 else ""
+    album = folders[-1] if folders else ""
+    title = stem
+    if " - " in stem:
+        artist, title = (part.strip() for part in stem.split(" - ", 1))
+    duration = None
+    try:
+        import mutagen
+        audio = mutagen.File(path, easy=True)
+        if audio is not None:
+            title = (audio.get('title') or [title])[0]
+            artist = (audio.get('artist') or [artist])[0]
+            album = (audio.get('album') or [album])[0]
+            duration = getattr(audio.info, 'length', None)
+    except ImportError:
+        if path.lower().endswith('.wav'):
+            with contextlib.suppress(wave.Error, OSError), wave.open(path, 'rb') as w:
+                duration = w.getnframes() / w.getframerate()
+    except Exception as e:
+        logging.debug(f"Could not read tags of {path}: {e}")
+    return Track(path, title, artist, album, duration)
+
+
+def describe_track(track: Track) -> str:
+    return f"{track.title} by {track.artist}" if track.artist else track.title
+
+
+class MusicLibrary:
+    """Tagged tracks under the music folder, cached in cache/music.json.
+
+    Tags are read once per file; a rescan only re-reads files whose size or
+    mtime changed, so later startups load the library from the cache.
+    """
+
+    STOPWORDS = {'play', 'some', 'song', 'songs', 'music', 'track', 'tracks', 'by', 'the', 'a', 'an', 'my',
+                 'me', 'please', 'jarvis', 'queue', 'add', 'to', 'album', 'artist', 'something', 'from'}
+
+    def __init__(self, cache_path: str, root: Optional[str]):
+        self.cache_path = cache_path
+        self.root = os.path.abspath(os.path.expanduser(root)) if root else None
+        self.lock = threading.Lock()
+        self.entries: Dict[str, Tuple[float, int, Track]] = {}
+        self.tracks: List[Track] = []
+        self.tokens: List[set] = []
+        self.load_cache()
+
+    def load_cache(self) -> None:
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            if cached.get("root") == self.root:
+                self.entries = {path: (mtime, size, Track(*track))
+                                for path, (mtime, size, track) in cached.get("tracks", {}).items()}
+                self.rebuild()
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logging.warning(f"Ignoring unreadable music library cache: {e}")
+
+    def save_cache(self) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+            temporary = f"{self.cache_path}.tmp"
+            with open(temporary, 'w', encoding='utf-8') as f:
+                json.dump({"root": self.root,
+                           "tracks": {path: [mtime, size, list(track)]
+                                      for path, (mtime, size, track) in self.entries.items()}}, f)
+            os.replace(temporary, self.cache_path)
+        except OSError as e:
+            logging.warning(f"Could not save music library cache: {e}")
+
+    def refresh(self) -> int:
+        """Rescan the music folder; returns how many files had their tags read"""
+        if not self.root:
+            return 0
+        audio = FileIndex.CATEGORIES['audio']
+        entries, read = {}, 0
+        for directory, subdirs, files in os.walk(self.root):
+            subdirs[:] = [d for d in subdirs if not d.startswith('.')]
+            for filename in files:
+                if filename.startswith('.') or os.path.splitext(filename)[1][1:].lower() not in audio:
+                    continue
+                path = os.path.join(directory, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                cached = self.entries.get(path)
+                if cached is not None and cached[:2] == (stat.st_mtime, stat.st_size):
+                    entries[path] = cached
+                else:
+                    entries[path] = (stat.st_mtime, stat.st_size, read_tags(path, self.root))
+                    read += 1
+        with self.lock:
+            changed = read or entries.keys() != self.entries.keys()
+            self.entries = entries
+            self.rebuild()
+        if changed:
+            self.save_cache()
+        logging.info(f"Music library: {len(entries)} tracks, read tags of {read}")
+        return read
+
+    def refresh_async(self) -> threading.Thread:
+        thread = threading.Thread(target=self.refresh, name="music-library", daemon=True)
+        thread.start()
+        return thread
+
+    def rebuild(self) -> None:
+        self.tracks = sorted((track for _, _, track in self.entries.values()),
+                             key=lambda t: (t.artist.lower(), t.album.lower(), t.path))
+        self.tokens = [set(file_tokens(f"{t.title} {t.artist} {t.album}")) for t in self.tracks]
+
+    def find(self, words: List[str]) -> List[Track]:
+        """Tracks whose title, artist or album words start with every query word"""
+        with self.lock:
+            tracks, tokens = self.tracks, self.tokens
+        if not words:
+            return list(tracks)
+        found = [track for track, names in zip(tracks, tokens)
+                 if all(any(name.startswith(word) for name in names) for word in words)]
+        if not found:
+            # Misheard titles: closest whole title instead
+            titles = {track.title.lower(): track for track in tracks}
+            close = difflib.get_close_matches(" ".join(words), list(titles), n=1, cutoff=0.6)
+            found = [titles[close[0]]] if close else []
+        return found
+
+
+class MusicPlayer:
+    """Play queue on the reserved music channel.
+
+    Tracks are decoded into Sounds ahead of time: while one plays, the next is
+    decoded on the player thread and queued on the channel, so playback is
+    gapless. Speech plays on its own channel; while JARVIS talks the music is
+    ducked to duck_volume and faded back afterwards.
+    """
+
+    TICK = 0.05
+    FADE_STEP = 0.1
+
+    def __init__(self, volume: float = 0.8, duck_volume: float = 0.2):
+        self.volume = volume
+        self.duck_volume = duck_volume
+        self.level = volume
+        self.ducked = False
+        self.lock = threading.RLock()
+        self.wake = threading.Event()
+        self.queue: List[Track] = []
+        self.order: List[int] = []
+        self.position = -1
+        self.shuffled = False
+        self.paused = False
+        self.playing = False
+        self.queued: Optional[int] = None
+        self.decoding = False
+        self.generation = 0
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def channel(self):
+        init_mixer()
+        return pygame.mixer.Channel(MUSIC_CHANNEL)
+
+    def current(self) -> Optional[Track]:
+        with self.lock:
+            if self.playing and 0 <= self.position < len(self.order):
+                return self.queue[self.order[self.position]]
+        return None
+
+    def play(self, tracks: List[Track], shuffle: Optional[bool] = None) -> Optional[Track]:
+        """Replace the queue with tracks and start the first; shuffle overrides the setting for them"""
+        with self.lock:
+            self.queue = list(tracks)
+            self.order = list(range(len(tracks)))
+            if self.shuffled if shuffle is None else shuffle:
+                random.shuffle(self.order)
+            return self._start(0)
+
+    def enqueue(self, tracks: List[Track]) -> Optional[Track]:
+        """Add tracks after the queue; starts playing if nothing is"""
+        with self.lock:
+            if not self.playing:
+                return self.play(tracks)
+            start = len(self.queue)
+            self.queue.extend(tracks)
+            added = list(range(start, len(self.queue)))
+            if self.shuffled:
+                random.shuffle(added)
+            self.order.extend(added)
+            self.wake.set()
+            return tracks[0] if tracks else None
+
+    def next(self) -> Optional[Track]:
+        with self.lock:
+            return self._start(self.position + 1)
+
+    def previous(self) -> Optional[Track]:
+        with self.lock:
+            return self._start(max(self.position - 1, 0))
+
+    def pause(self) -> bool:
+        with self.lock:
+            if not self.playing or self.paused:
+                return False
+            self.paused = True
+            self.channel.pause()
+            return True
+
+    def resume(self) -> bool:
+        with self.lock:
+            if not self.playing or not self.paused:
+                return False
+            self.paused = False
+            self.channel.unpause()
+            self.wake.set()
+            return True
+
+    def stop(self) -> None:
+        with self.lock:
+            if self.playing:
+                self._halt()
+            self.generation += 1
+            self.playing = self.paused = False
+            self.queued = None
+
+    def set_shuffle(self, on: bool) -> None:
+        """Shuffle or restore the order of the tracks still to come"""
+        with self.lock:
+            self.shuffled = on
+            # A decoded next track is already queued on the channel, keep it next
+            keep = self.position + (2 if self.queued is not None else 1)
+            upcoming = self.order[keep:]
+            if on:
+                random.shuffle(upcoming)
+            else:
+                upcoming.sort()
+            self.order[keep:] = upcoming
+
+    def duck(self, on: bool) -> None:
+        """Lower the music under speech, or bring it back"""
+        self.ducked = on
+        self.wake.set()
+
+    def _halt(self) -> None:
+        channel = self.channel
+        channel.stop()
+        # Stopping a channel starts whatever was queued on it, so stop that too
+        if channel.get_busy():
+            channel.stop()
+
+    def _start(self, position: int) -> Optional[Track]:
+        """Decode and play the track at position in the play order"""
+        self.generation += 1
+        self.queued = None
+        if not 0 <= position < len(self.order):
+            if self.playing:
+                self._halt()
+            self.playing = self.paused = False
+            return None
+        track = self.queue[self.order[position]]
+        init_mixer()
+        sound = pygame.mixer.Sound(track.path)
+        channel = self.channel
+        # play() replaces the current sound and drops anything queued
+        channel.play(sound)
+        channel.set_volume(self.level)
+        self.position = position
+        self.playing, self.paused = True, False
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name="music-player", daemon=True)
+            self.thread.start()
+        self.wake.set()
+        return track
+
+    def _run(self) -> None:
+        while True:
+            self.wake.wait(timeout=None if not self.playing else self.TICK)
+            self.wake.clear()
+            try:
+                self._tick()
+            except Exception as e:
+                logging.error(f"Error in music playback: {e}")
+                with self.lock:
+                    self.playing = False
+
+    def _tick(self) -> None:
+        with self.lock:
+            if not self.playing:
+                return
+            channel = self.channel
+            target = self.duck_volume if self.ducked else self.volume
+            if self.level != target:
+                step = min(self.FADE_STEP, abs(target - self.level))
+                self.level += step if target > self.level else -step
+                channel.set_volume(self.level)
+            if self.paused:
+                return
+            if self.queued is not None and channel.get_queue() is None:
+                # The decoded next track has taken over
+                self.position, self.queued = self.queued, None
+                logging.info(f"Now playing {self.current().title}")
+            elif not channel.get_busy():
+                # Decoding didn't finish in time or the queue ran out
+                self._start(self.position + 1)
+                return
+            upcoming = self.position + 1
+            if self.queued is None and not self.decoding and upcoming < len(self.order):
+                self.decoding = True
+                threading.Thread(target=self._prefetch, args=(self.generation, upcoming),
+                                 name="music-decode", daemon=True).start()
+
+    def _prefetch(self, generation: int, upcoming: int) -> None:
+        """Decode the next track and queue it behind the playing one"""
+        try:
+            with self.lock:
+                path = self.queue[self.order[upcoming]].path
+            sound = pygame.mixer.Sound(path)
+            with self.lock:
+                if generation == self.generation and self.queued is None and self.playing:
+                    self.channel.queue(sound)
+                    self.queued = upcoming
+        except Exception as e:
+            logging.error(f"Error decoding next track: {e}")
+            with self.lock:
+                if generation == self.generation:
+                    del self.order[upcoming]
+        finally:
+            self.decoding = False
+
+
+NUMBER_WORDS = {
+    'a': 1, 'an': 1, 'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5, 'six': 6, 'seven': 7,
+    'eight': 8, 'nine': 9, 'ten': 10, 'fifteen': 15, 'twenty': 20, 'thirty': 30, 'forty': 40,
+    'forty five': 45, 'fifty': 50, 'ninety': 90
+}
+UNIT_SECONDS = {'second': 1, 'sec': 1, 'minute': 60, 'min': 60, 'hour': 3600, 'hr': 3600, 'day': 86400, 'week': 604800}
+WEEKDAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+MONTHS = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*"
+
+REMINDER_RELATIVE = re.compile(
+    r"\b(?:in|after)\s+(half an?|" + "|".join(sorted(NUMBER_WORDS, key=len, reverse=True)) +
+    r"|\d+(?:\.\d+)?)\s+(" + "|".join(UNIT_SECONDS) + r")s?\b(\s+and\s+a\s+half)?")
+REMINDER_DAY = re.compile(
+    r"\b(?:today|tonight|(?:tomorrow|this)(?:\s+(?:morning|afternoon|evening|night))?"
+    r"|(?:on\s+)?(?:next\s+)?(?:" + "|".join(WEEKDAYS) + r")(?:\s+(?:morning|afternoon|evening|night))?"
+    r"|on\s+(?:the\s+)?\d{1,2}(?:st|nd|rd|th)?(?:\s+of)?\s+" + MONTHS +
+    r"|on\s+" + MONTHS + r"\s+\d{1,2}(?:st|nd|rd|th)?)\b")
+REMINDER_TIME = re.compile(
+    r"(?:\bat\s+)?\b(\d{1,2})(?::(\d{2}))?\s*([ap])\.?\s?m\b\.?"
+    r"|\bat\s+(\d{1,2})(?::(\d{2}))?\b|(?:\bat\s+)?\b(noon|midnight)\b")
+REMINDER_FILLER = re.compile(r"\b(?:remind me|set (?:a )?reminder|reminders?|jarvis|please)\b")
+
+
+def parse_reminder(query: str, now: datetime.datetime) -> Tuple[Optional[datetime.datetime], str]:
+    """Due time and task of a spoken reminder, e.g. "remind me at 5 pm to call mom".
+
+    Understands "in 10 minutes", "in half an hour", "at 5:30", "tomorrow at
+    9 am", "on friday evening" and "on march 3rd". The due time is None when
+    the request names no time.
+    """
+    text = query.lower()
+    due = None
+    relative = REMINDER_RELATIVE.search(text)
+    if relative:
+        amount, unit, half = relative.groups()
+        amount = 0.5 if amount.startswith('half') else NUMBER_WORDS.get(amount) or float(amount)
+        due = now + datetime.timedelta(seconds=(amount + (0.5 if half else 0)) * UNIT_SECONDS[unit])
+        text = text[:relative.start()] + text[relative.end():]
+    else:
+        day, clock = REMINDER_DAY.search(text), REMINDER_TIME.search(text)
+        if day is None and clock is None:
+            return None, reminder_task(text)
+        base, hour, minute, meridiem = now, 9, 0, None
+        if day is not None:
+            phrase = day.group(0)
+            if 'tomorrow' in phrase:
+                base += datetime.timedelta(days=1)
+            for weekday, name in enumerate(WEEKDAYS):
+                if name in phrase:
+                    base += datetime.timedelta(days=(weekday - now.weekday()) % 7)
+            if re.search(r"\d", phrase):
+                date = dateutil_parser.parse(re.sub(r"\b(?:on|the|of)\b", " ", phrase), default=now)
+                base = date if date.date() >= now.date() else date.replace(year=now.year + 1)
+            if re.search(r"afternoon", phrase):
+                hour, meridiem = 15, 'p'
+            elif re.search(r"evening|night|tonight", phrase):
+                hour, meridiem = 20, 'p'
+            text = text[:day.start()] + text[day.end():]
+            clock = REMINDER_TIME.search(text)
+        if clock is not None:
+            groups = clock.groups()
+            if groups[5]:
+                hour, minute, meridiem = (12, 0, 'p') if groups[5] == 'noon' else (0, 0, 'a')
+            else:
+                hour, minute = int(groups[0] or groups[3]), int(groups[1] or groups[4] or 0)
+                meridiem = groups[2] or (meridiem if hour < 12 else None)
+                if meridiem == 'p' and hour < 12:
+                    hour += 12
+                elif meridiem == 'a' and hour == 12:
+                    hour = 0
+            text = text[:clock.start()] + text[clock.end():]
+        due = base.replace(hour=hour % 24, minute=minute, second=0, microsecond=0)
+        # A time that already passed means the next one: tonight, tomorrow, next week or next year
+        if due <= now:
+            phrase = day.group(0) if day is not None else ""
+            if not phrase and meridiem is None and hour < 12 and due + datetime.timedelta(hours=12) > now:
+                due += datetime.timedelta(hours=12)
+            elif any(name in phrase for name in WEEKDAYS):
+                due += datetime.timedelta(days=7)
+            elif re.search(r"\d", phrase):
+                due = due.replace(year=due.year + 1)
+            else:
+                due += datetime.timedelta(days=1)
+    return due, reminder_task(text)
+
+
+def reminder_task(text: str) -> str:
+    """What to remind about: the request without its trigger and time words"""
+    text = re.sub(r"\s+", " ", REMINDER_FILLER.sub(" ", text)).strip(" ,.")
+    return re.sub(r"^(?:(?:for|to|that|about|of)\b\s*)+", "", text)
+
+
+def describe_due(due: datetime.datetime, now: datetime.datetime) -> str:
+    """Spoken form of a due time relative to now"""
+    seconds = (due - now).total_seconds()
+    if seconds < 3600:
+        minutes = max(1, round(seconds / 60))
+        return f"in {minutes} minute{'s' if minutes != 1 else ''}"
+    clock = due.strftime("%I:%M %p").lstrip("0")
+    if due.date() == now.date():
+        return f"at {clock}"
+    if due.date() == now.date() + datetime.timedelta(days=1):
+        return f"tomorrow at {clock}"
+    if seconds < 6 * 86400:
+        return f"on {due.strftime('%A')} at {clock}"
+    return f"on {due.strftime('%A, %B')} {due.day} at {clock}"
+
+
+class Reminder(NamedTuple):
+    id: int
+    due: float
+    text: str
+
+
+class ReminderScheduler:
+    """Reminders kept in SQLite and fired from a single timer thread.
+
+    Pending reminders sit in a min-heap ordered by due time, so adding one
+    is O(log n) and the thread only ever sleeps until the earliest. Rows
+    are marked fired once announced; pending ones are re-armed on restart,
+    and any that came due while JARVIS was off fire straight away. The
+    clock is injectable and run_due() fires whatever is due without the
+    thread, so tests can drive it deterministically from a fake clock.
+
+    on_due returns False when there was nobody to tell, e.g. headless with
+    no client connected; the reminder then stays pending and is retried.
+    """
+
+    # Re-check at least this often, in case the wall clock jumps
+    MAX_WAIT = 30.0
+    # How long an undelivered reminder waits before the next attempt
+    RETRY_SECONDS = 60.0
+
+    def __init__(self, path: str, on_due: Callable[[Reminder], bool],
+                 clock: Callable[[], float] = time.time):
+        self.on_due = on_due
+        self.clock = clock
+        self.condition = threading.Condition()
+        self.cancelled: set = set()
+        # Original due times of reminders queued again for another attempt
+        self.retrying: Dict[int, float] = {}
+        self.thread: Optional[threading.Thread] = None
+        self.stopping = False
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.executescript("""
+            PRAGMA journal_mode = WAL;
+            CREATE TABLE IF NOT EXISTS reminders (id INTEGER PRIMARY KEY, due REAL NOT NULL, text TEXT NOT NULL,
+                                                  created REAL NOT NULL, fired REAL);
+            CREATE INDEX IF NOT EXISTS reminders_pending ON reminders (due) WHERE fired IS NULL;
+        """)
+        self.db.commit()
+        self.heap: List[Tuple[float, int, str]] = [
+            tuple(row) for row in self.db.execute("SELECT due, id, text FROM reminders WHERE fired IS NULL")]
+        heapq.heapify(self.heap)
+
+    def add(self, due: float, text: str) -> Reminder:
+        with self.condition:
+            cursor = self.db.execute("INSERT INTO reminders (due, text, created) VALUES (?, ?, ?)",
+                                     (due, text, self.clock()))
+            self.db.commit()
+            reminder = Reminder(cursor.lastrowid, due, text)
+            heapq.heappush(self.heap, (due, reminder.id, text))
+            # Only an earlier deadline changes how long the thread should sleep
+            if self.heap[0][1] == reminder.id:
+                self.condition.notify()
+        return reminder
+
+    def cancel(self, reminder_id: int) -> bool:
+        """Drop a pending reminder; its heap entry is skipped when it comes up"""
+        with self.condition:
+            deleted = self.db.execute("DELETE FROM reminders WHERE id = ? AND fired IS NULL",
+                                      (reminder_id,)).rowcount
+            self.db.commit()
+            if deleted:
+                self.cancelled.add(reminder_id)
+            return bool(deleted)
+
+    def pending(self) -> List[Reminder]:
+        with self.condition:
+            return [Reminder(i, due, text) for due, i, text in sorted(self.heap) if i not in self.cancelled]
+
+    def run_due(self) -> List[Reminder]:
+        """Fire every reminder due by now; returns the ones delivered"""
+        now = self.clock()
+        due = []
+        with self.condition:
+            while self.heap and self.heap[0][0] <= now:
+                when, reminder_id, text = heapq.heappop(self.heap)
+                when = self.retrying.pop(reminder_id, when)
+                if reminder_id in self.cancelled:
+                    self.cancelled.discard(reminder_id)
+                    continue
+                due.append(Reminder(reminder_id, when, text))
+        fired, undelivered = [], []
+        for reminder in due:
+            try:
+                delivered = self.on_due(reminder) is not False
+            except Exception as e:
+                # Don't retry a reminder that fails to announce every time
+                logging.error(f"Error announcing reminder {reminder.id}: {e}")
+                delivered = True
+            (fired if delivered else undelivered).append(reminder)
+        with self.condition:
+            if fired:
+                self.db.executemany("UPDATE reminders SET fired = ? WHERE id = ?", [(now, r.id) for r in fired])
+                self.db.commit()
+            for reminder in undelivered:
+                self.retrying[reminder.id] = reminder.due
+                heapq.heappush(self.heap, (now + self.RETRY_SECONDS, reminder.id, reminder.text))
+        return fired
+
+    def start(self) -> None:
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name="reminders", daemon=True)
+            self.thread.start()
+
+    def stop(self) -> None:
+        with self.condition:
+            self.stopping = True
+            self.condition.notify()
+
+    def _run(self) -> None:
+        while True:
+            self.run_due()
+            with self.condition:
+                if self.stopping:
+                    return
+                wait = self.MAX_WAIT
+                if self.heap:
+                    wait = min(max(self.heap[0][0] - self.clock(), 0.0), self.MAX_WAIT)
+                self.condition.wait(wait)
+
+
+LANGUAGES = {
+    'english': 'en', 'spanish': 'es', 'french': 'fr', 'german': 'de', 'italian': 'it', 'portuguese': 'pt',
+    'dutch': 'nl', 'swedish': 'sv', 'polish': 'pl', 'russian': 'ru', 'ukrainian': 'uk', 'greek': 'el',
+    'turkish': 'tr', 'arabic': 'ar', 'hindi': 'hi', 'japanese': 'ja', 'korean': 'ko', 'chinese': 'zh',
+    'mandarin': 'zh'
+}
+TRANSLATE_TARGET = re.compile(r"\b(?:to|into|in)\s+(" + "|".join(LANGUAGES) + r")\b")
+TRANSLATE_FILLER = re.compile(r"\b(?:how do (?:you|i) say|translate|translation|jarvis|please|"
+                              r"the (?:word|phrase|sentence))\b")
+
+
+def parse_translation(query: str) -> Tuple[str, Optional[str]]:
+    """Text and target language code of e.g. "translate good morning to spanish" """
+    text = query.lower()
+    target = TRANSLATE_TARGET.search(text)
+    if target is not None:
+        text = text[:target.start()] + text[target.end():]
+    text = re.sub(r"\s+", " ", TRANSLATE_FILLER.sub(" ", text)).strip(" ,.:?!\"'")
+    return text, LANGUAGES[target.group(1)] if target is not None else None
+
+
+class LocalizedText(str):
+    """Response text that should be spoken in another language than the default"""
+
+    def __new__(cls, text: str, language: str):
+        localized = super().__new__(cls, text)
+        localized.language = language
+        return localized
+
+
+class TranslationBackend:
+    """Base class for translation engines used by Translator"""
+
+    name = "base"
+
+    def available(self) -> bool:
+        """Whether the engine is installed and configured"""
+        return True
+
+    def translate(self, texts: List[str], source: str, target: str) -> List[str]:
+        raise NotImplementedError
+
+
+class LibreTranslateBackend(TranslationBackend):
+    """LibreTranslate server, public or self-hosted (needs network)"""
+
+    name = "libretranslate"
+
+    def __init__(self, http: "HttpClient", url: str, api_key: str = ""):
+        self.http = http
+        self.url = url.rstrip('/')
+        self.api_key = api_key
+
+    def available(self) -> bool:
+        return bool(self.url)
+
+    def translate(self, texts: List[str], source: str, target: str) -> List[str]:
+        # The whole batch goes in one request
+        payload = {"q": texts, "source": source, "target": target, "format": "text"}
+        if self.api_key:
+            payload["api_key"] = self.api_key
+        result = self.http.post_json(f"{self.url}/translate", payload)
+        if "error" in result:
+            raise RuntimeError(result["error"])
+        return list(result["translatedText"])
+
+
+class ArgosBackend(TranslationBackend):
+    """Argos Translate models installed locally, fully offline"""
+
+    name = "argos"
+
+    def available(self) -> bool:
+        try:
+            import argostranslate.translate  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def translate(self, texts: List[str], source: str, target: str) -> List[str]:
+        import argostranslate.translate
+        languages = {language.code: language for language in argostranslate.translate.get_installed_languages()}
+        if source not in languages or target not in languages:
+            raise LookupError(f"No Argos model installed for {source} to {target}")
+        translation = languages[source].get_translation(languages[target])
+        if translation is None:
+            raise LookupError(f"No Argos model installed for {source} to {target}")
+        return [translation.translate(text) for text in texts]
+
+
+class DictionaryBackend(TranslationBackend):
+    """Word and phrase dictionaries on disk, fully offline.
+
+    dictionary_dir holds one tab-separated file per language pair, e.g.
+    en-es.tsv with "good morning<TAB>buenos días" lines. Text is translated
+    greedily by the longest known phrase; unknown words are kept as they are.
+    """
+
+    name = "dictionary"
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.pairs: Dict[Tuple[str, str], Tuple[Dict[Tuple[str, ...], str], int]] = {}
+        self.lock = threading.Lock()
+
+    def available(self) -> bool:
+        return os.path.isdir(self.directory)
+
+    def load(self, source: str, target: str) -> Tuple[Dict[Tuple[str, ...], str], int]:
+        with self.lock:
+            if (source, target) not in self.pairs:
+                path = os.path.join(self.directory, f"{source}-{target}.tsv")
+                entries = {}
+                if os.path.exists(path):
+                    with open(path, 'r', encoding='utf-8') as f:
+                        for line in f:
+                            phrase, _, translation = line.rstrip('\n').partition('\t')
+                            if translation and not phrase.startswith('#'):
+                                entries.setdefault(tuple(phrase.lower().split()), translation.strip())
+                self.pairs[(source, target)] = entries, max(map(len, entries), default=0)
+            return self.pairs[(source, target)]
+
+    def translate(self, texts: List[str], source: str, target: str) -> List[str]:
+        entries, longest = self.load(source, target)
+        if not entries:
+            raise LookupError(f"No dictionary for {source} to {target} in {self.directory}")
+        return [self.translate_text(text, entries, longest) for text in texts]
+
+    @staticmethod
+    def translate_text(text: str, entries: Dict[Tuple[str, ...], str], longest: int) -> str:
+        tokens = re.findall(r"[\w']+|[^\w\s]", text)
+        words = [token.lower() for token in tokens]
+        output, i, known = [], 0, 0
+        while i < len(tokens):
+            for length in range(min(longest, len(tokens) - i), 0, -1):
+                translation = entries.get(tuple(words[i:i + length]))
+                if translation is not None:
+                    output.append(translation)
+                    known += 1
+                    i += length
+                    break
+            else:
+                output.append(tokens[i])
+                i += 1
+        if not known:
+            raise LookupError(f"No dictionary entries for '{text}'")
+        translated = re.sub(r" ([^\w\s¿¡])", r"\1", " ".join(output))
+        return translated[:1].upper() + translated[1:] if text[:1].isupper() else translated
+
+
+class Translator:
+    """Tries each configured backend in turn, with a phrase-level cache.
+
+    Text is split into sentences and every sentence is cached on its own in
+    the response cache, so recurring phrases (a headline seen in every news
+    refresh, a stock reply) are never translated twice. The sentences still
+    missing from a batch go to the backend in one call. A backend that fails
+    is skipped for a cooldown period, like the recognizer chain.
+    """
+
+    def __init__(self, backends: List[TranslationBackend], cache: "ResponseCache", cooldown: float = 30.0):
+        self.backends = [backend for backend in backends if backend.available()]
+        self.cache = cache
+        self.cooldown = cooldown
+        self.skip_until: Dict[str, float] = {}
+
+    def translate(self, text: str, source: str, target: str) -> str:
+        return self.translate_batch([text], source, target)[0]
+
+    def translate_batch(self, texts: List[str], source: str, target: str) -> List[str]:
+        """Translate many texts, sending only uncached sentences to a backend"""
+        if source == target:
+            return list(texts)
+        phrases = [split_sentences(text) or [text] for text in texts]
+        known: Dict[str, str] = {}
+        missing: Dict[str, None] = {}
+        for phrase in itertools.chain.from_iterable(phrases):
+            if phrase in known or phrase in missing:
+                continue
+            cached = self.cache.lookup('translation', f"{source}>{target}|{phrase}")
+            if cached is None:
+                missing[phrase] = None
+            else:
+                known[phrase] = cached
+        if missing:
+            translated = dict(zip(missing, self.run_backends(list(missing), source, target)))
+            self.cache.put_many('translation', {f"{source}>{target}|{phrase}": translation
+                                                for phrase, translation in translated.items()})
+            known.update(translated)
+        return [" ".join(known[phrase] for phrase in sentences) for sentences in phrases]
+
+    def run_backends(self, texts: List[str], source: str, target: str) -> List[str]:
+        last_error: Optional[Exception] = None
+        now = time.monotonic()
+        for backend in self.backends:
+            if self.skip_until.get(backend.name, 0) > now:
+                continue
+            started = time.perf_counter()
+            try:
+                translated = backend.translate(texts, source, target)
+            except LookupError as e:
+                # The backend works but doesn't know this language pair or text
+                last_error = e
+                continue
+            except Exception as e:
+                logging.warning(f"Translator {backend.name} failed, trying next: {e}",
+                                extra={"backend": backend.name})
+                self.skip_until[backend.name] = now + self.cooldown
+                last_error = e
+                continue
+            elapsed = time.perf_counter() - started
+            METRICS.observe("translate", elapsed, backend=backend.name)
+            logging.info(f"Translated {len(texts)} phrases with {backend.name}",
+                         extra={"backend": backend.name, "latency_ms": round(elapsed * 1000, 2)})
+            return translated
+        raise RuntimeError(f"No translation backend could translate {source} to {target}: {last_error}")
+
+
+class IntentMatch(NamedTuple):
+    """A single intent hit returned by IntentMatcher.match"""
+    intent: str
+    keyword: str
+    score: float
+
+
+class IntentMatcher:
+    """Token trie over every intent keyword.
+
+    The trie is compiled once from the command table, so matching a query costs
+    one walk per query word regardless of how many intents are registered.
+    Keywords only match whole words, and a keyword that lies strictly inside a
+    longer hit (e.g. "what is" inside "what is my name") is discarded.
+    """
+
+    _END = ''
+
+    def __init__(self, commands: Dict[str, List[str]], priority: Optional[List[str]] = None):
+        priority = list(priority or [])
+        order = priority + [name for name in commands if name not in priority]
+        self.rank = {name: i for i, name in enumerate(order)}
+        self.trie: Dict[str, Any] = {}
+        for intent, keywords in commands.items():
+            for keyword in keywords:
+                node = self.trie
+                for token in self.tokenize(keyword):
+                    node = node.setdefault(token, {})
+                node.setdefault(self._END, []).append((intent, keyword))
+
+    @staticmethod
+    def tokenize(text: str) -> List[str]:
+        """Split text into lowercase word tokens"""
+        return re.findall(r"[a-z0-9']+", text.lower())
+
+    def _scan(self, tokens: List[str]) -> List[Tuple[int, int, str, str]]:
+        """Return (start, end, intent, keyword) for every keyword hit"""
+        hits = []
+        trie = self.trie
+        for start in range(len(tokens)):
+            node = trie.get(tokens[start])
+            end = start + 1
+            while node is not None:
+                for intent, keyword in node.get(self._END, ()):
+                    hits.append((start, end, intent, keyword))
+                if end == len(tokens):
+                    break
+                node = node.get(tokens[end])
+                end += 1
+        return hits
+
+    def match(self, query: str) -> List[IntentMatch]:
+        """Return every matching intent, best first"""
+        hits = self._scan(self.tokenize(query))
+        if len(hits) > 1:
+            # Drop hits nested strictly inside a longer hit
+            hits = [h for h in hits
+                    if not any(o[0] <= h[0] and h[1] <= o[1] and o[1] - o[0] > h[1] - h[0] for o in hits)]
+
+        best: Dict[str, IntentMatch] = {}
+        total = len(self.rank)
+        for start, end, intent, keyword in hits:
+            # Priority dominates, keyword length breaks ties within an intent
+            score = (total - self.rank.get(intent, total)) + len(keyword) / 100.0
+            if intent not in best or score > best[intent].score:
+                best[intent] = IntentMatch(intent, keyword, score)
+        return sorted(best.values(), key=lambda m: m.score, reverse=True)
+
 
 class Jarvis:
-    def __init__(self):
-        """Initialize Jarvis with configuration and settings"""
+    FALLBACK_RESPONSE = "I'm not sure how to help with that. Could you please rephrase?"
+    ACKNOWLEDGEMENT = "Working on it"
+    CITY_PROMPT = "Please specify a city"
+    # Answered on the calling thread; everything else goes to the executor
+    INLINE_INTENTS = {'identity', 'user_identity', 'greeting', 'farewell', 'time', 'date'}
+    WEATHER_URL = "https://api.openweathermap.org/data/2.5/weather"
+    NEWS_URL = "https://newsapi.org/v2/top-headlines"
+
+    def __init__(self, voice: bool = True):
+        """Initialize Jarvis with configuration and settings.
+
+        With voice off nothing is played; responses are only returned.
+        """
         self.name = "Jarvis"
+        self.voice = voice
         self.user = "Sir"
         self.recognizer = sr.Recognizer()
+        self.microphone: Optional[MicrophoneStream] = None
+        self.first_listen: Optional[float] = None
+        self.heard_at: Optional[float] = None
+        self.telemetry: Optional[TelemetrySampler] = None
+        self.telemetry_lock = threading.Lock()
+        self.exit_after_startup = False
+        # Connected headless sessions, told about reminders and other unprompted events
+        self.listeners: List[Callable[[Dict[str, Any]], None]] = []
         self.load_config()
+        self.setup_logging()
         self.setup_apis()
+        self.recognizers = self.setup_recognizers()
+        executor = self.config['executor']
+        self.executor = CommandExecutor(workers=executor['workers'],
+                                        timeouts=executor['timeouts'],
+                                        concurrency=executor['concurrency'],
+                                        acknowledge_after=executor['acknowledge_after'],
+                                        on_acknowledge=self.acknowledge)
+        self.speech_cache = SpeechCache(
+            os.path.join('cache', 'speech'),
+            int(self.config['preferences']['speech_cache_mb'] * 1024 * 1024)
+        )
+        self.audio = AudioOutput(self.synthesize, preload=voice)
+        wake_word = self.config['wake_word']
+        self.wake_gate = WakeWordGate(wake_word['templates'] if wake_word['enabled'] else "",
+                                      threshold=wake_word['threshold'],
+                                      follow_up_seconds=wake_word['follow_up_seconds'])
+        self.wake_gate.on_wake = lambda: self.speak(f"Yes, {self.user}?", priority=AudioOutput.URGENT)
+        launcher = self.config['launcher']
+        self.launcher = AppLauncher(os.path.join('cache', 'apps.json'), table=launcher['apps'],
+                                    include_path=launcher['include_path'],
+                                    refresh_interval=launcher['refresh_seconds'])
+        self.files = FileIndex(os.path.join('cache', 'files.sqlite'), self.file_roots(),
+                               rescan_seconds=self.config['files']['rescan_seconds'])
+        music = self.config['music']
+        self.library = MusicLibrary(os.path.join('cache', 'music.json'), self.user_folder('music'))
+        self.player = MusicPlayer(volume=music['volume'], duck_volume=music['duck_volume'])
+        self.player.shuffled = music['shuffle']
+        self.audio.on_speaking = self.player.duck
+        self.reminders = ReminderScheduler(os.path.join('cache', 'reminders.sqlite'), on_due=self.remind)
+        self.translator = self.setup_translator()
         self.commands = self.load_commands()
+        self.handlers = self.load_handlers()
+        self.intent_matcher = IntentMatcher(self.commands, priority=list(self.handlers))
         
     def load_config(self):
         """Load configuration from config.json"""
         try:
             with open('config.json', 'r') as f:
-                self.config = json.load(f)
+                self.config = merge_config(DEFAULT_CONFIG, json.load(f))
         except FileNotFoundError:
-            self.config = {
-                "user": {
-                    "name": "Sir",
-                    "email": "",
-                    "password": ""
-                },
-                "paths": {
-                    "music": "",
-                    "documents": "",
-                    "downloads": ""
-                },
-                "apis": {
-                    "wolframalpha": "",
-                    "openweathermap": "",
-                    "newsapi": ""
-                },
-                "preferences": {
-                    "voice_speed": 1.0,
-                    "language": "en",
-                    "temperature_unit": "celsius"
-                }
-            }
+            self.config = copy.deepcopy(DEFAULT_CONFIG)
             self.save_config()
-            print("Created default config.json. Please update it with your settings.")
+            logging.warning("Created default config.json. Please update it with your settings.")
     
     def save_config(self):
         """Save configuration to config.json"""
         with open('config.json', 'w') as f:
             json.dump(self.config, f, indent=4)
 
+    def setup_logging(self):
+        """Apply the logging section of the config"""
+        settings = self.config['logging']
+        setup_logging(file=settings['file'], level=settings['level'],
+                      max_bytes=settings['max_bytes'], backups=settings['backups'],
+                      json_format=settings['json'], dedup_seconds=settings['dedup_seconds'])
+
     def setup_apis(self):
         """Initialize API clients"""
-        try:
-            self.wolfram_client = wolframalpha.Client(self.config['apis']['wolframalpha'])
-        except:
-            self.wolfram_client = None
+        network = self.config['network']
+        self.http = HttpClient(timeout=network['timeout'],
+                               retries=network['retries'],
+                               max_concurrency=network['max_concurrency'])
+        if not self.config['apis']['wolframalpha']:
             logging.warning("WolframAlpha API not configured")
+        cache = self.config['cache']
+        self.responses = ResponseCache(cache['ttl'],
+                                       max_entries=cache['max_entries'],
+                                       path=os.path.join('cache', 'responses.sqlite') if cache['persist'] else None,
+                                       stale_factor=cache['stale_factor'])
+
+    def setup_translator(self) -> Translator:
+        """Build the translation fallback chain from config"""
+        settings = self.config['translation']
+        available = {
+            "libretranslate": lambda: LibreTranslateBackend(self.http, settings['libretranslate_url'],
+                                                            settings['api_key']),
+            "argos": ArgosBackend,
+            "dictionary": lambda: DictionaryBackend(settings['dictionary_dir'])
+        }
+        backends = []
+        for name in settings['backends']:
+            if name in available:
+                backends.append(available[name]())
+            else:
+                logging.warning(f"Unknown translation backend '{name}' ignored")
+        translator = Translator(backends, self.responses)
+        names = {backend.name for backend in translator.backends}
+        if not names:
+            logging.warning("No translation backend available: set translation.libretranslate_url or "
+                            "translation.dictionary_dir in config.json, or pip install argostranslate")
+        elif names == {"dictionary"}:
+            logging.warning(f"Translating with the phrase lists in {settings['dictionary_dir']} only: set "
+                            "translation.libretranslate_url in config.json or pip install argostranslate "
+                            "to translate full sentences")
+        return translator
+
+    def setup_recognizers(self) -> RecognizerChain:
+        """Build the speech recognition fallback chain from preferences"""
+        available = {
+            "google": lambda: GoogleBackend(self.recognizer),
+            "vosk": lambda: VoskBackend(self.config['preferences']['vosk_model']),
+            "sphinx": lambda: SphinxBackend(self.recognizer)
+        }
+        backends = []
+        for name in self.config['preferences']['recognizers']:
+            if name in available:
+                backends.append(available[name]())
+            else:
+                logging.warning(f"Unknown speech recognizer '{name}' in config.json")
+        return RecognizerChain(backends)
 
     def load_commands(self) -> Dict[str, Any]:
         """Load command definitions"""
@@ -113,65 +3566,248 @@ class Jarvis:
             'search': ['search', 'look up', 'find', 'google'],
             'wikipedia': ['wikipedia', 'wiki', 'who is', 'what is'],
             'system': ['cpu', 'memory', 'battery', 'system'],
-            'music': ['play music', 'play song', 'music'],
+            'files': ['find my', 'find file', 'where is my', 'locate'],
+            'playback': ['next song', 'next track', 'skip', 'previous song', 'previous track', 'last song',
+                         'pause', 'resume', 'continue music', 'stop music', 'stop the music', 'stop playing',
+                         'shuffle', 'stop shuffling', "what's playing", 'what is playing', 'what song is this'],
+            'music': ['play music', 'play song', 'play', 'music', 'queue'],
             'volume': ['volume up', 'volume down', 'mute'],
             'screenshot': ['screenshot', 'capture screen'],
-            'reminder': ['remind me', 'set reminder', 'reminder'],
+            'reminder': ['remind me', 'set reminder', 'reminder', 'reminders'],
             'joke': ['tell joke', 'joke', 'make me laugh'],
             'news': ['news', 'headlines', 'latest news'],
             'email': ['email', 'send email', 'check email'],
             'calculator': ['calculate', 'math', 'solve'],
-            'translate': ['translate', 'translation'],
+            'translate': ['translate', 'translation', 'how do you say', 'how do i say'],
             'speedtest': ['speed test', 'internet speed', 'connection speed'],
             'open': ['open', 'launch', 'start', 'run'],
             'identity': ['who are you', 'what is your name', 'tell me about yourself', 'what can you do'],
             'user_identity': ['what is my name', 'who am i', 'what do you call me']
         }
 
-    def speak(self, text: str) -> None:
-        """Convert text to speech using gTTS and play with pygame"""
-        try:
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as temp_file:
-                temp_filename = temp_file.name
-            
-            tts = gTTS(text=text, lang=self.config['preferences']['language'])
-            tts.save(temp_filename)
-            
-            # Play audio using pygame
-            pygame.mixer.music.load(temp_filename)
-            pygame.mixer.music.play()
-            while pygame.mixer.music.get_busy():
-                pygame.time.Clock().tick(10)
-            
-            # Clean up
-            pygame.mixer.music.unload()
-            os.unlink(temp_filename)
-            
-        except Exception as e:
-            logging.error(f"Error in speech synthesis: {e}")
-            print(f"Error in speech synthesis: {e}")
+    def synthesize(self, text: str, language: Optional[str] = None) -> Path:
+        """Return an mp3 of text, rendering it with gTTS only on a cache miss"""
+        language = language or self.config['preferences']['language']
+        voice_speed = self.config['preferences']['voice_speed']
+
+        def render(filename: str) -> None:
+            with METRICS.span("synthesis"):
+                gtts.gTTS(text=text, lang=language, slow=voice_speed < 1.0).save(filename)
+
+        return self.speech_cache.get(text, language, voice_speed, render)
+
+    def speak(self, text: str, priority: int = AudioOutput.NORMAL, wait: bool = False,
+              turn_started: Optional[float] = None) -> Future:
+        """Queue text for speech; returns a future completed after playback.
+
+        LocalizedText is spoken in its own language.
+        """
+        if not self.voice:
+            return completed(False)
+        future = self.audio.speak(text, priority, turn_started, getattr(text, 'language', None))
+        if wait:
+            try:
+                future.result()
+            except Exception:
+                pass
+        return future
+
+    def prefetch_paused(self) -> Optional[str]:
+        """Why background refreshes should wait, or None if they may run"""
+        prefetch = self.config['prefetch']
+        if prefetch['metered']:
+            return "connection is metered"
+        if prefetch['pause_on_battery']:
+            latest = self.telemetry.latest() if self.telemetry else None
+            if latest is not None:
+                if latest['plugged'] == 0.0:
+                    return "running on battery"
+            else:
+                battery = psutil.sensors_battery()
+                if battery is not None and not battery.power_plugged:
+                    return "running on battery"
+        if not is_online():
+            return "offline"
+        return None
+
+    def prefetch(self, source: str, key: str, fetch: Callable[[], Optional[str]]) -> None:
+        """Refresh one cached response and pre-render its speech"""
+        text = fetch()
+        if text is None:
+            raise ValueError(f"no {source} data returned")
+        self.responses.put(source, key, text)
+        if self.config['prefetch']['render_speech']:
+            for chunk in split_sentences(text):
+                self.synthesize(chunk)
+
+    def start_prefetch(self) -> PrefetchScheduler:
+        """Schedule the refresh jobs configured in config.json"""
+        prefetch = self.config['prefetch']
+        jobs = prefetch['jobs']
+        city = prefetch['home_city']
+        self.scheduler = PrefetchScheduler(self.prefetch_paused)
+        if not prefetch['enabled']:
+            return self.scheduler
+        if 'weather' in jobs and city and self.config['apis']['openweathermap']:
+            self.scheduler.add('weather', jobs['weather'],
+                               lambda: self.prefetch('weather', city.lower(), lambda: self.fetch_weather(city)))
+        if 'news' in jobs and self.config['apis']['newsapi']:
+            self.scheduler.add('news', jobs['news'],
+                               lambda: self.prefetch('news', 'top', self.fetch_news), delay=5)
+        self.scheduler.start()
+        return self.scheduler
+
+    def start_services(self) -> None:
+        """Start the background prefetch, metrics, telemetry, reminders, and the application, file and music indexes"""
+        self.start_prefetch()
+        self.start_metrics()
+        self.start_telemetry()
+        self.launcher.refresh_async()
+        self.library.refresh_async()
+        self.reminders.start()
+        if self.config['files']['index']:
+            self.files.start()
+
+    def user_folder(self, key: str) -> Optional[str]:
+        """A folder from paths, else the usual home folder, if it exists"""
+        defaults = {'music': 'Music', 'documents': 'Documents', 'downloads': 'Downloads'}
+        root = self.config['paths'].get(key) or os.path.join(Path.home(), defaults[key])
+        return root if os.path.isdir(os.path.expanduser(root)) else None
+
+    def file_roots(self) -> List[str]:
+        """Folders to index: the configured paths, else the usual home folders"""
+        return [root for root in map(self.user_folder, ('music', 'documents', 'downloads')) if root]
+
+    def start_telemetry(self) -> TelemetrySampler:
+        """Start the background system sampler, once"""
+        with self.telemetry_lock:
+            if self.telemetry is None:
+                settings = self.config['telemetry']
+                self.telemetry = TelemetrySampler(interval=settings['interval'],
+                                                  history=settings['history_minutes'] * 60)
+                self.telemetry.start()
+            return self.telemetry
+
+    def start_metrics(self) -> None:
+        """Serve latency metrics over HTTP and/or dump them to a file periodically"""
+        settings = self.config['metrics']
+        if settings['port']:
+            try:
+                self.metrics_server = MetricsServer(METRICS, settings['port'])
+                self.metrics_server.start()
+            except OSError as e:
+                logging.error(f"Could not serve metrics on port {settings['port']}: {e}")
+        if settings['dump_seconds'] > 0:
+            threading.Thread(target=self.dump_metrics, args=(settings['dump_file'], settings['dump_seconds']),
+                             name="metrics-dump", daemon=True).start()
+
+    def dump_metrics(self, path: str, interval: float) -> None:
+        """Rewrite path with the Prometheus text every interval seconds"""
+        while True:
+            time.sleep(interval)
+            try:
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                temporary = f"{path}.tmp"
+                with open(temporary, 'w') as f:
+                    f.write(METRICS.prometheus())
+                os.replace(temporary, path)
+                logging.info("Latency percentiles", extra={"metrics": METRICS.snapshot()})
+            except Exception as e:
+                logging.error(f"Error writing metrics: {e}")
+
+    def welcome_message(self) -> str:
+        """Greeting spoken at startup"""
+        return f"Hello {self.user}, I am {self.name}, your personal assistant. How may I help you?"
+
+    def stock_phrases(self) -> List[str]:
+        """Fixed responses worth rendering ahead of time"""
+        return [
+            self.welcome_message(),
+            self.handle_identity(""),
+            self.handle_user_identity(""),
+            self.handle_greeting(""),
+            self.CITY_PROMPT,
+            f"Yes, {self.user}?",
+            self.ACKNOWLEDGEMENT,
+            f"Goodbye {self.user}, have a great day!",
+            self.FALLBACK_RESPONSE
+        ]
+
+    def warm_up_speech(self) -> threading.Thread:
+        """Pre-render the stock phrases in the background"""
+        def warm_up():
+            for phrase in self.stock_phrases():
+                try:
+                    for chunk in split_sentences(phrase):
+                        self.synthesize(chunk)
+                except Exception as e:
+                    logging.warning(f"Could not pre-render speech: {e}")
+                    return
+            logging.info(f"Speech cache warmed up: {self.speech_cache.stats()}")
+
+        thread = threading.Thread(target=warm_up, daemon=True)
+        thread.start()
+        return thread
+
+    def report_startup(self) -> None:
+        """Log time to first listen once the microphone is live"""
+        self.first_listen = time.perf_counter()
+        target = self.config['startup']['target_ms']
+        report = startup_report(target)
+        if (self.first_listen - STARTED) * 1000 > target:
+            logging.warning(f"Startup missed its {target} ms target")
+        logging.info(report)
+        if self.exit_after_startup:
+            print(report)
+            sys.exit(0)
+
+    def listen(self, raise_errors: bool = False) -> Optional[str]:
+        """Listen for user input and convert to text.
+
+        Timeouts and unintelligible audio return None; other failures are
+        logged and return None unless raise_errors is set.
+        """
+        barge_in = self.config['preferences']['barge_in']
+
+        def ignore_while() -> bool:
+            # Don't transcribe our own voice unless barge-in is allowed
+            return not barge_in and self.audio.is_speaking()
+
+        def on_speech_start():
+            if barge_in and self.audio.is_speaking():
+                self.audio.interrupt()
 
-    def listen(self) -> Optional[str]:
-        """Listen for user input and convert to text"""
         try:
-            with sr.Microphone() as source:
-                print("Listening...")
-                self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
-                audio = self.recognizer.listen(source, timeout=5, phrase_time_limit=5)
+            if self.microphone is None:
+                self.microphone = MicrophoneStream()
+            if self.first_listen is None:
+                self.microphone.start()
+                self.report_startup()
+            logging.info("Listening...")
+            audio = self.microphone.capture_phrase(timeout=5, phrase_time_limit=5,
+                                                   on_speech_start=on_speech_start,
+                                                   ignore_while=ignore_while)
+            self.heard_at = time.perf_counter()
+            with METRICS.span("wake_word"):
+                audio = self.wake_gate.filter(audio)
+            if audio is None:
+                return None
                 
-            print("Recognizing...")
-            query = self.recognizer.recognize_google(audio, language=self.config['preferences']['language'])
-            print(f"User said: {query}")
+            logging.info("Recognizing...")
+            query = self.recognizers.recognize(audio, self.config['preferences']['language'])
+            logging.info(f"User said: {query}")
             return query.lower()
             
         except sr.WaitTimeoutError:
-            print("No speech detected")
+            logging.debug("No speech detected")
             return None
         except sr.UnknownValueError:
-            print("Could not understand audio")
+            logging.debug("Could not understand audio")
             return None
         except Exception as e:
             logging.error(f"Error in speech recognition: {e}")
+            if raise_errors:
+                raise
             return None
 
     def get_time(self) -> str:
@@ -187,39 +3823,48 @@ class Jarvis:
     def get_weather(self, city: str) -> str:
         """Get weather information for a city"""
         try:
-            api_key = self.config['apis']['openweathermap']
-            if not api_key:
+            if not self.config['apis']['openweathermap']:
                 return "Weather API not configured. Please update config.json"
-                
-            url = f"http://api.openweathermap.org/data/2.5/weather?q={city}&appid={api_key}&units=metric"
-            response = requests.get(url)
-            data = response.json()
-            
-            if data["cod"] == 200:
-                temp = data["main"]["temp"]
-                desc = data["weather"][0]["description"]
-                humidity = data["main"]["humidity"]
-                wind = data["wind"]["speed"]
-                
-                return f"The temperature in {city} is {temp}°C with {desc}. Humidity is {humidity}% and wind speed is {wind} m/s"
-            return "Sorry, I couldn't get the weather information."
+            weather = self.responses.get('weather', city.lower(), lambda: self.fetch_weather(city))
+            return weather or "Sorry, I couldn't get the weather information."
         except Exception as e:
             logging.error(f"Error getting weather: {e}")
             return "Sorry, I couldn't get the weather information."
 
+    def fetch_weather(self, city: str) -> Optional[str]:
+        """Ask OpenWeatherMap for the current weather in a city"""
+        data = self.http.get_json(self.WEATHER_URL,
+                                  params={"q": city, "appid": self.config['apis']['openweathermap'],
+                                          "units": "metric"})
+        
+        if data["cod"] == 200:
+            temp = data["main"]["temp"]
+            desc = data["weather"][0]["description"]
+            humidity = data["main"]["humidity"]
+            wind = data["wind"]["speed"]
+            
+            return f"The temperature in {city} is {temp}°C with {desc}. Humidity is {humidity}% and wind speed is {wind} m/s"
+        return None
+
     def get_system_info(self) -> str:
-        """Get system information"""
+        """Get system information from the latest telemetry sample"""
         try:
-            cpu_percent = psutil.cpu_percent()
-            memory = psutil.virtual_memory()
-            battery = psutil.sensors_battery()
-            
-            info = f"CPU usage is {cpu_percent}%. "
-            info += f"Memory usage is {memory.percent}%. "
-            
-            if battery:
-                info += f"Battery is at {battery.percent}%"
-                if battery.power_plugged:
+            telemetry = self.start_telemetry()
+            telemetry.wait_for_sample(timeout=2 * telemetry.interval)
+            latest = telemetry.latest()
+            if latest is None:
+                return "Sorry, I couldn't get the system information"
+
+            info = f"CPU usage is {latest['cpu']:.0f}%. "
+            average, covered = telemetry.average('cpu', 300)
+            if covered >= 60:
+                info += f"CPU averaged {average:.0f}% over the last {covered / 60:.0f} minutes. "
+            info += f"Memory usage is {latest['memory']:.0f}%. "
+            info += f"Disk is {latest['disk']:.0f}% full. "
+
+            if not math.isnan(latest['battery']):
+                info += f"Battery is at {latest['battery']:.0f}%"
+                if latest['plugged'] == 1.0:
                     info += " and charging"
             else:
                 info += "Battery information not available"
@@ -232,33 +3877,61 @@ class Jarvis:
     def get_news(self) -> str:
         """Get latest news headlines"""
         try:
-            api_key = self.config['apis']['newsapi']
-            if not api_key:
+            if not self.config['apis']['newsapi']:
                 return "News API not configured. Please update config.json"
-                
-            url = f"https://newsapi.org/v2/top-headlines?country=us&apiKey={api_key}"
-            response = requests.get(url)
-            news = response.json()
-            
-            if news["status"] == "ok":
-                headlines = [article["title"] for article in news["articles"][:5]]
-                return "Here are the top headlines: " + ". ".join(headlines)
-            return "Sorry, I couldn't get the news"
+            return self.responses.get('news', 'top', self.fetch_news) or "Sorry, I couldn't get the news"
         except Exception as e:
             logging.error(f"Error getting news: {e}")
             return "Sorry, I couldn't get the news"
 
+    def fetch_news(self) -> Optional[str]:
+        """Ask NewsAPI for the top headlines"""
+        news = self.http.get_json(self.NEWS_URL,
+                                  params={"country": "us", "apiKey": self.config['apis']['newsapi']})
+        
+        if news["status"] == "ok":
+            headlines = [article["title"] for article in news["articles"][:5]]
+            return "Here are the top headlines: " + ". ".join(headlines)
+        return None
+
+    def get_wikipedia_summary(self, topic: str, sentences: int = 2) -> Optional[str]:
+        """Search Wikipedia and return the intro of the best matching article"""
+        language = self.config['preferences']['language'].split('-')[0]
+        data = self.http.get_json(f"https://{language}.wikipedia.org/w/api.php", params={
+            "action": "query", "format": "json", "generator": "search", "gsrsearch": topic,
+            "gsrlimit": 3, "prop": "extracts", "exintro": 1, "explaintext": 1,
+            "exsentences": sentences, "redirects": 1
+        })
+        pages = sorted(data.get("query", {}).get("pages", {}).values(), key=lambda p: p.get("index", 0))
+        for page in pages:
+            extract = page.get("extract", "").strip()
+            # Skip disambiguation pages rather than reading out their option lists
+            if extract and not extract.rstrip(':').endswith("may refer to"):
+                return extract
+        return None
+
     def calculate(self, query: str) -> str:
         """Calculate mathematical expressions"""
         try:
-            if self.wolfram_client:
-                res = self.wolfram_client.query(query)
-                return next(res.results).text
-            return "Calculator API not configured"
+            if not self.config['apis']['wolframalpha']:
+                return "Calculator API not configured"
+            answer = self.responses.get('wolfram', query.strip().lower(), lambda: self.fetch_wolfram(query))
+            return answer or "Sorry, I couldn't perform that calculation"
         except Exception as e:
             logging.error(f"Error in calculation: {e}")
             return "Sorry, I couldn't perform that calculation"
 
+    def fetch_wolfram(self, query: str) -> Optional[str]:
+        """Ask WolframAlpha and return the primary result"""
+        data = self.http.get_json("https://api.wolframalpha.com/v2/query", params={
+            "input": query, "appid": self.config['apis']['wolframalpha'],
+            "format": "plaintext", "output": "json"
+        })
+        for pod in data["queryresult"].get("pods", []):
+            if pod.get("primary"):
+                return pod["subpods"][0]["plaintext"]
+        return None
+
     def take_screenshot(self) -> str:
         """Take a screenshot"""
         try:
@@ -281,263 +3954,521 @@ class Jarvis:
             logging.error(f"Error checking internet speed: {e}")
             return "Sorry, I couldn't check the internet speed"
 
-    def process_command(self, query: str) -> None:
-        """Process user commands"""
+    def load_handlers(self) -> Dict[str, Callable[[str], Optional[str]]]:
+        """Map intents to their handlers, in dispatch priority order"""
+        return {
+            # Reminders and translations carry free text that may contain any other keyword
+            'reminder': self.handle_reminder,
+            'translate': self.handle_translate,
+            'identity': self.handle_identity,
+            'user_identity': self.handle_user_identity,
+            'greeting': self.handle_greeting,
+            'farewell': self.handle_farewell,
+            # Song titles often contain other keywords ("one more time")
+            'playback': self.handle_playback,
+            'music': self.handle_music,
+            'time': self.handle_time,
+            'date': self.handle_date,
+            'weather': self.handle_weather,
+            'system': self.handle_system,
+            'news': self.handle_news,
+            'calculator': self.handle_calculator,
+            'screenshot': self.handle_screenshot,
+            'speedtest': self.handle_speedtest,
+            'files': self.handle_files,
+            'wikipedia': self.handle_wikipedia,
+            'search': self.handle_search,
+            'open': self.handle_open
+        }
+
+    def match_intent(self, query: str) -> Optional[IntentMatch]:
+        """Return the best matching intent that has a handler"""
+        for match in self.intent_matcher.match(query):
+            if match.intent in self.handlers:
+                return match
+        return None
+
+    def process_command(self, query: str, turn_started: Optional[float] = None) -> Future:
+        """Process user commands; returns a future of the response text.
+
+        Quick intents answer inline, everything else runs on the executor so
+        slow handlers never hold up listening or the GUI. The response is
+        spoken as soon as it is ready. turn_started, when the user stopped
+        speaking, lets the whole turn be timed up to the first audio.
+        """
         if not query:
-            return
+            return completed(None)
 
-        # Check for identity questions
-        if any(word in query for word in self.commands['identity']):
-            self.speak(f"I am {self.name}, your personal AI assistant. I can help you with various tasks like checking the weather, "
-                      f"opening applications, searching the web, getting system information, and much more. "
-                      f"I'm here to make your life easier and more efficient.")
-            return
+        started = time.perf_counter()
+        with METRICS.span("intent_match"):
+            match = self.match_intent(query)
+        intent = match.intent if match else "fallback"
+        if match is None:
+            response = completed(self.FALLBACK_RESPONSE)
+        elif match.intent in self.INLINE_INTENTS:
+            with METRICS.span("handler", intent=intent):
+                response = completed(self.handlers[match.intent](query))
+        else:
+            response = self.executor.submit(match.intent, self.handlers[match.intent], query)
 
-        # Check for user identity questions
-        if any(word in query for word in self.commands['user_identity']):
-            self.speak(f"You are {self.user}, my user and friend. I'm here to assist you with your daily tasks.")
-            return
+        def finished(_: Future) -> None:
+            elapsed = time.perf_counter() - started
+            METRICS.observe("command", elapsed, intent=intent)
+            logging.info(f"Handled {intent} command",
+                         extra={"intent": intent, "query": query, "latency_ms": round(elapsed * 1000, 2)})
 
-        # Check for greetings
-        if any(word in query for word in self.commands['greeting']):
-            self.speak(f"Hello {self.user}, how can I help you?")
-            return
+        response.add_done_callback(finished)
+        response.add_done_callback(lambda f: self.speak_response(f, turn_started))
+        return response
 
-        # Check for farewell
-        if any(word in query for word in self.commands['farewell']):
-            self.speak(f"Goodbye {self.user}, have a great day!")
-            sys.exit(0)
+    def speak_response(self, response: Future, turn_started: Optional[float] = None) -> None:
+        """Speak a finished command's response text"""
+        text = response.result()
+        if text:
+            self.speak(text, turn_started=turn_started)
 
-        # Time related
-        if any(word in query for word in self.commands['time']):
-            self.speak(self.get_time())
-            return
+    def acknowledge(self, intent: str) -> None:
+        """Let the user know a slow command is in progress"""
+        self.speak(self.ACKNOWLEDGEMENT, priority=AudioOutput.URGENT)
 
-        # Date related
-        if any(word in query for word in self.commands['date']):
-            self.speak(self.get_date())
-            return
+    def handle_identity(self, query: str) -> str:
+        """Answer identity questions"""
+        return (f"I am {self.name}, your personal AI assistant. I can help you with various tasks like checking the weather, "
+                f"opening applications, searching the web, getting system information, and much more. "
+                f"I'm here to make your life easier and more efficient.")
 
-        # Weather related
-        if any(word in query for word in self.commands['weather']):
-            city = query.replace("weather in", "").replace("weather", "").strip()
-            if city:
-                self.speak(self.get_weather(city))
-            else:
-                self.speak("Please specify a city")
-            return
+    def handle_user_identity(self, query: str) -> str:
+        """Answer user identity questions"""
+        return f"You are {self.user}, my user and friend. I'm here to assist you with your daily tasks."
 
-        # System information
-        if any(word in query for word in self.commands['system']):
-            self.speak(self.get_system_info())
-            return
+    def handle_greeting(self, query: str) -> str:
+        """Answer greetings"""
+        return f"Hello {self.user}, how can I help you?"
 
-        # News
-        if any(word in query for word in self.commands['news']):
-            self.speak(self.get_news())
-            return
+    def farewell_message(self) -> str:
+        """Goodbye spoken before exiting"""
+        return f"Goodbye {self.user}, have a great day!"
 
-        # Calculator
-        if any(word in query for word in self.commands['calculator']):
-            self.speak(self.calculate(query))
-            return
+    def handle_farewell(self, query: str) -> None:
+        """Say goodbye and exit"""
+        self.speak(self.farewell_message(), wait=True)
+        sys.exit(0)
 
-        # Screenshot
-        if any(word in query for word in self.commands['screenshot']):
-            self.speak(self.take_screenshot())
-            return
+    def handle_time(self, query: str) -> str:
+        """Time related"""
+        return self.get_time()
 
-        # Internet speed
-        if any(word in query for word in self.commands['speedtest']):
-            self.speak(self.check_internet_speed())
-            return
+    def handle_date(self, query: str) -> str:
+        """Date related"""
+        return self.get_date()
 
-        # Wikipedia search
-        if any(word in query for word in self.commands['wikipedia']):
-            try:
-                query = query.replace("wikipedia", "").replace("wiki", "").strip()
-                self.speak(f"Searching Wikipedia for {query}")
-                results = wikipedia.summary(query, sentences=2)
-                self.speak("According to Wikipedia")
-                print(results)
-                self.speak(results)
-            except Exception as e:
-                logging.error(f"Error searching Wikipedia: {e}")
-                self.speak("Sorry, I couldn't find that information")
-            return
+    def handle_weather(self, query: str) -> str:
+        """Weather related"""
+        city = query.replace("weather in", "").replace("weather", "").strip()
+        city = city or self.config['prefetch']['home_city']
+        if city:
+            return self.get_weather(city)
+        return self.CITY_PROMPT
 
-        # Web search
-        if any(word in query for word in self.commands['search']):
-            query = query.replace("search", "").replace("look up", "").strip()
-            url = f"https://www.google.com/search?q={query}"
-            webbrowser.open(url)
-            self.speak(f"Searching for {query}")
-            return
+    def handle_system(self, query: str) -> str:
+        """System information"""
+        return self.get_system_info()
 
-        # Application launching with enhanced support
-        if any(word in query for word in self.commands['open']):
-            app_name = query.split()[-1].strip().lower()
-            try:
-                # Common Windows applications
-                common_apps = {
-                    'notepad': 'notepad',
-                    'calculator': 'calc',
-                    'paint': 'mspaint',
-                    'word': 'winword',
-                    'excel': 'excel',
-                    'powerpoint': 'powerpnt',
-                    'outlook': 'outlook',
-                    'cmd': 'cmd',
-                    'powershell': 'powershell',
-                    'task manager': 'taskmgr',
-                    'control panel': 'control',
-                    'settings': 'ms-settings:',
-                    'file explorer': 'explorer',
-                    'browser': 'start microsoft-edge:',
-                    'edge': 'start  microsoft-edge:',
-                    'chrome': 'start chrome',
-                    'firefox': 'start firefox',
-                    'opera': 'start opera',
-                    'brave': 'start brave',
-                    'vscode': 'code',
-                    'visual studio code': 'code',
-                    'terminal': 'wt',
-                    'windows terminal': 'wt',
-                    'photos': 'ms-photos:',
-                    'camera': 'start microsoft.windows.camera:',
-                    'store': 'ms-windows-store:',
-                    'mail': 'start outlookmail:',
-                    'calendar': 'outlookcal:',
-                    'maps': 'bingmaps:',
-                    'weather': 'msnweather:',
-                    'news': 'msnnews:',
-                    'sports': 'msnsports:',
-                    'money': 'msnmoney:',
-                    'music': 'mswindowsmusic:',
-                    'movies': 'mswindowsvideo:',
-                    'photoshop': 'photoshop',
-                    'illustrator': 'illustrator',
-                    'premiere': 'premiere',
-                    'after effects': 'afterfx',
-                    'audition': 'audition',
-                    'lightroom': 'lightroom',
-                    'bridge': 'bridge',
-                    'acrobat': 'acrobat',
-                    'reader': 'acrord32',
-                    'teams': 'teams',
-                    'zoom': 'zoom',
-                    'skype': 'skype',
-                    'discord': 'discord',
-                    'spotify': 'spotify',
-                    'vlc': 'vlc',
-                    'media player': 'wmplayer',
-                    'windows media player': 'wmplayer',
-                    'groove music': 'mswindowsmusic:',
-                    'movies & tv': 'mswindowsvideo:',
-                    'photos': 'ms-photos:',
-                    'camera': 'start microsoft.windows.camera:',
-                    'alarms': 'ms-clock:',
-                    'clock': 'ms-clock:',
-                    'calendar': 'outlookcal:',
-                    'mail': 'start outlookmail:',
-                    'maps': 'bingmaps:',
-                    'weather': 'msnweather:',
-                    'news': 'msnnews:',
-                    'sports': 'msnsports:',
-                    'money': 'msnmoney:',
-                    'store': 'ms-windows-store:',
-                    'settings': 'ms-settings:',
-                    'control panel': 'control',
-                    'task manager': 'taskmgr',
-                    'file explorer': 'explorer',
-                    'this pc': 'explorer',
-                    'my computer': 'explorer',
-                    'documents': 'explorer shell:DocumentsLibrary',
-                    'downloads': 'explorer shell:Downloads',
-                    'pictures': 'explorer shell:PicturesLibrary',
-                    'music': 'explorer shell:MusicLibrary',
-                    'videos': 'explorer shell:VideosLibrary',
-                    'desktop': 'explorer shell:Desktop',
-                    'recycle bin': 'explorer shell:RecycleBinFolder',
-                    'network': 'explorer shell:NetworkPlacesFolder',
-                    'printers': 'explorer shell:PrintersFolder',
-                    'fonts': 'explorer shell:Fonts',
-                    'start menu': 'explorer shell:StartMenu',
-                    'run': 'shell:AppsFolder',
-                    'apps': 'shell:AppsFolder',
-                    'programs': 'shell:ProgramFiles',
-                    'program files': 'shell:ProgramFiles',
-                    'program files (x86)': 'shell:ProgramFilesX86',
-                    'system32': 'explorer shell:System',
-                    'system': 'explorer shell:System',
-                    'windows': 'explorer shell:Windows',
-                    'users': 'explorer shell:UsersFilesFolder',
-                    'user': 'explorer shell:UsersFilesFolder',
-                    'public': 'explorer shell:CommonDocuments',
-                    'shared': 'explorer shell:CommonDocuments',
-                    'temp': 'explorer shell:Temp',
-                    'temporary': 'explorer shell:Temp',
-                    'recent': 'explorer shell:Recent',
-                    'favorites': 'explorer shell:Favorites',
-                    'links': 'explorer shell:Links',
-                    'search': 'explorer shell:SearchHomeFolder',
-                    'home': 'explorer shell:HomeFolder',
-                    'personal': 'explorer shell:Personal',
-                    'my documents': 'explorer shell:Personal',
-                    'my pictures': 'explorer shell:My Pictures',
-                    'my music': 'explorer shell:My Music',
-                    'my videos': 'explorer shell:My Video',
-                    'my computer': 'explorer shell:MyComputerFolder',
-                    'computer': 'explorer shell:MyComputerFolder',
-                    'network': 'explorer shell:NetworkPlacesFolder',
-                    'printers': 'explorer shell:PrintersFolder',
-                    'fonts': 'explorer shell:Fonts',
-                    'start menu': 'explorer shell:StartMenu',
-                    'run': 'shell:AppsFolder',
-                    'apps': 'shell:AppsFolder',
-                    'programs': 'shell:ProgramFiles',
-                    'program files': 'shell:ProgramFiles',
-                    'program files (x86)': 'shell:ProgramFilesX86',
-                    'system32': 'explorer shell:System',
-                    'system': 'explorer shell:System',
-                    'windows': 'explorer shell:Windows',
-                    'users': 'explorer shell:UsersFilesFolder',
-                    'user': 'explorer shell:UsersFilesFolder',
-                    'public': 'explorer shell:CommonDocuments',
-                    'shared': 'explorer shell:CommonDocuments',
-                    'temp': 'explorer shell:Temp',
-                    'temporary': 'explorer shell:Temp',
-                    'recent': 'explorer shell:Recent',
-                    'favorites': 'explorer shell:Favorites',
-                    'links': 'explorer shell:Links',
-                    'search': 'explorer shell:SearchHomeFolder',
-                    'home': 'explorer shell:HomeFolder',
-                    'personal': 'explorer shell:Personal',
-                    'my documents': 'explorer shell:Personal',
-                    'my pictures': 'explorer shell:My Pictures',
-                    'my music': 'explorer shell:My Music',
-                    'my videos': 'explorer shell:My Video',
-                    'my computer': 'explorer shell:MyComputerFolder',
-                    'computer': 'explorer shell:MyComputerFolder'
-                }
-
-                if app_name in common_apps:
-                    os.system(f'start {common_apps[app_name]}')
-                    self.speak(f"Opening {app_name}")
-                else:
-                    # Try to open the application directly
-                    try:
-                        os.system(f'start {app_name}')
-                        self.speak(f"Attempting to open {app_name}")
-                    except:
-                        self.speak(f"Sorry, I couldn't open {app_name}. The application might not be installed or the command is not recognized.")
-            except Exception as e:
-                logging.error(f"Error opening application: {e}")
-                self.speak(f"Sorry, I couldn't open {app_name}")
+    def handle_news(self, query: str) -> str:
+        """News"""
+        return self.get_news()
+
+    def handle_calculator(self, query: str) -> str:
+        """Calculator"""
+        return self.calculate(query)
+
+    def handle_screenshot(self, query: str) -> str:
+        """Screenshot"""
+        return self.take_screenshot()
+
+    def handle_speedtest(self, query: str) -> str:
+        """Internet speed"""
+        return self.check_internet_speed()
+
+    def handle_wikipedia(self, query: str) -> str:
+        """Wikipedia search"""
+        try:
+            query = query.replace("wikipedia", "").replace("wiki", "").strip()
+            results = self.responses.get('wikipedia', query, lambda: self.get_wikipedia_summary(query))
+            if not results:
+                return "Sorry, I couldn't find that information"
+            return f"According to Wikipedia. {results}"
+        except Exception as e:
+            logging.error(f"Error searching Wikipedia: {e}")
+            return "Sorry, I couldn't find that information"
+
+    def handle_search(self, query: str) -> str:
+        """Web search"""
+        query = query.replace("search", "").replace("look up", "").strip()
+        url = f"https://www.google.com/search?q={query}"
+        webbrowser.open(url)
+        return f"Searching for {query}"
+
+    def launch_target(self, query: str) -> str:
+        """The application name in an open command: the words after the trigger"""
+        words = query.lower().split()
+        for index, word in enumerate(words):
+            if word in self.commands['open']:
+                words = words[index + 1:]
+                break
+        filler = {'the', 'a', 'an', 'app', 'application', 'program', 'please', 'for', 'me', 'up', 'jarvis'}
+        return " ".join(word for word in words if word not in filler)
+
+    def handle_open(self, query: str) -> str:
+        """Launch an application by name, tolerating multi-word and misheard names"""
+        app_name = self.launch_target(query)
+        if not app_name:
+            return "Which application should I open?"
+        try:
+            found = self.launcher.find(app_name)
+            if found is None:
+                return f"Sorry, I couldn't find an application called {app_name}"
+            entry, score = found
+            self.launcher.launch(entry)
+            logging.info(f"Launching {entry.name} for '{app_name}' (score {score:.2f})", extra={"intent": "open"})
+            return f"Opening {entry.name}"
+        except Exception as e:
+            logging.error(f"Error opening application: {e}")
+            return f"Sorry, I couldn't open {app_name}"
+
+    def handle_files(self, query: str) -> str:
+        """Find a file in the local index by name words and kind"""
+        words, extensions = self.files.parse_query(query)
+        if not words and not extensions:
+            return "Which file are you looking for?"
+        try:
+            results = self.files.search(words, extensions)
+            if not results:
+                return f"Sorry, I couldn't find a file matching {' '.join(words) or 'that'}"
+            path = results[0][0]
+            folder = os.path.basename(os.path.dirname(path))
+            response = f"I found {os.path.basename(path)} in {folder}"
+            if len(results) > 1:
+                more = f"{len(results) - 1}{'+' if len(results) == 10 else ''}"
+                response += f", and {more} other match{'es' if len(results) > 2 else ''}"
+            return response
+        except Exception as e:
+            logging.error(f"Error searching files: {e}")
+            return "Sorry, I couldn't search your files"
+
+    def handle_music(self, query: str) -> str:
+        """Play or queue songs from the music library by title, artist or album"""
+        tokens = IntentMatcher.tokenize(query)
+        words = [word for word in tokens if word not in MusicLibrary.STOPWORDS]
+        try:
+            if not self.library.tracks:
+                return "I couldn't find any music in your music folder"
+            tracks = self.library.find(words)
+            if not tracks:
+                return f"Sorry, I couldn't find {' '.join(words)} in your music"
+            if 'queue' in tokens:
+                self.player.enqueue(tracks)
+                if len(tracks) == 1:
+                    return f"Added {describe_track(tracks[0])} to the queue"
+                return f"Added {len(tracks)} songs to the queue"
+            # With nothing asked for in particular, shuffle the whole library
+            track = self.player.play(tracks, shuffle=True if not words else None)
+            return f"Playing {describe_track(track)}"
+        except Exception as e:
+            logging.error(f"Error playing music: {e}")
+            return "Sorry, I couldn't play that"
+
+    def handle_playback(self, query: str) -> str:
+        """Skip, go back, pause, resume, stop or shuffle the music"""
+        tokens = set(IntentMatcher.tokenize(query))
+        player = self.player
+        try:
+            if 'shuffle' in tokens or 'shuffling' in tokens:
+                on = not tokens & {'off', 'stop'}
+                player.set_shuffle(on)
+                if on and player.current() is None and self.library.tracks:
+                    return f"Shuffling your music, starting with {describe_track(player.play(self.library.tracks))}"
+                return "Shuffle is on" if on else "Shuffle is off"
+            if player.current() is None:
+                return "Nothing is playing"
+            if tokens & {'next', 'skip'}:
+                track = player.next()
+                return f"Playing {describe_track(track)}" if track else "That was the last song"
+            if tokens & {'previous', 'last'}:
+                return f"Playing {describe_track(player.previous())}"
+            if 'pause' in tokens:
+                return "Paused" if player.pause() else "The music is already paused"
+            if tokens & {'resume', 'continue'}:
+                return "Resuming" if player.resume() else "The music is already playing"
+            if 'stop' in tokens:
+                player.stop()
+                return "Music stopped"
+            return f"This is {describe_track(player.current())}"
+        except Exception as e:
+            logging.error(f"Error controlling playback: {e}")
+            return "Sorry, I couldn't do that"
+
+    def handle_reminder(self, query: str) -> str:
+        """Set, list or cancel reminders"""
+        tokens = set(IntentMatcher.tokenize(query))
+        now = datetime.datetime.now()
+        try:
+            if tokens & {'cancel', 'delete', 'remove', 'clear'}:
+                return self.cancel_reminders(query)
+            due, task = parse_reminder(query, now)
+            if tokens & {'what', 'list', 'any', 'reminders'} and (due is None or not task):
+                return self.list_reminders(now)
+            if not task:
+                return "What should I remind you about?"
+            if due is None:
+                return f"When should I remind you to {task}?"
+            if due <= now:
+                return f"That time has already passed. When should I remind you to {task}?"
+            self.reminders.add(due.timestamp(), task)
+            return f"I'll remind you to {task} {describe_due(due, now)}"
+        except Exception as e:
+            logging.error(f"Error setting reminder: {e}")
+            return "Sorry, I couldn't set that reminder"
+
+    def list_reminders(self, now: datetime.datetime) -> str:
+        pending = self.reminders.pending()
+        if not pending:
+            return "You have no reminders"
+        upcoming = [f"{r.text} {describe_due(datetime.datetime.fromtimestamp(r.due), now)}" for r in pending[:3]]
+        count = f"{len(pending)} reminder{'s' if len(pending) != 1 else ''}"
+        return f"You have {count}. Next: " + "; ".join(upcoming)
+
+    def cancel_reminders(self, query: str) -> str:
+        """Cancel the reminders whose text contains the spoken words, or all of them"""
+        words = set(IntentMatcher.tokenize(reminder_task(query.lower()))) - {
+            'cancel', 'delete', 'remove', 'clear', 'my', 'all', 'the', 'reminders', 'to'}
+        cancelled = [r for r in self.reminders.pending()
+                     if words <= set(IntentMatcher.tokenize(r.text)) and self.reminders.cancel(r.id)]
+        if not cancelled:
+            return "I couldn't find that reminder"
+        if len(cancelled) == 1:
+            return f"Cancelled the reminder to {cancelled[0].text}"
+        return f"Cancelled {len(cancelled)} reminders"
+
+    def remind(self, reminder: Reminder) -> bool:
+        """Announce a reminder that came due; False if there was nobody to tell"""
+        late = time.time() - reminder.due > 60
+        message = (f"Earlier you asked me to remind you to {reminder.text}" if late
+                   else f"{self.user}, this is your reminder to {reminder.text}")
+        listeners = list(self.listeners)
+        if not self.voice and not listeners:
+            logging.info(f"Reminder {reminder.id} due with no one to tell; keeping it pending")
+            return False
+        logging.info(f"Reminder {reminder.id} due: {reminder.text}", extra={"intent": "reminder"})
+        for listener in listeners:
+            listener({"event": "reminder", "id": reminder.id, "response": message})
+        self.speak(message, priority=AudioOutput.URGENT)
+        return True
+
+    def handle_translate(self, query: str) -> str:
+        """Translate a phrase and say it in the target language"""
+        text, target = parse_translation(query)
+        if not text:
+            return "What should I translate?"
+        if target is None:
+            return f"Which language should I translate {text} to?"
+        source = self.config['preferences']['language'].split('-')[0]
+        try:
+            return LocalizedText(self.translator.translate(text, source, target), target)
+        except Exception as e:
+            logging.error(f"Error translating: {e}")
+            return "Sorry, I couldn't translate that"
+
+
+class WaveformRenderer:
+    """Live voice waveform drawn as one persistent Tk canvas polyline.
+
+    Each frame pulls the newest samples from the microphone ring buffer,
+    reduces them to a fixed number of points, smooths them with a precomputed
+    Savitzky-Golay kernel and moves the existing line with coords(), so no
+    canvas items are created or rasterized per frame.
+    """
+
+    def __init__(self, canvas: tk.Canvas, source: Callable[[int], Optional[np.ndarray]],
+                 width: int = 800, height: int = 200, points: int = 100, window: int = 2048):
+        self.canvas = canvas
+        self.source = source
+        self.width = width
+        self.height = height
+        self.points = points
+        self.window = window - window % points
+        self.kernel = savgol_kernel(5, 2)
+        self.gain = 1.0
+        self.x = np.linspace(0, width, points)
+        self.coords = np.empty(points * 2)
+        self.line = canvas.create_line(*([0, 0] * points), fill='#00ff88', width=2, tags="waveform")
+        self.frame_times: deque = deque(maxlen=120)
+        self.place(int(canvas.cget('width')) / 2, int(canvas.cget('height')) / 2)
+
+    def place(self, centre_x: float, centre_y: float) -> None:
+        """Centre the waveform on the given canvas position"""
+        self.origin = (centre_x - self.width / 2, centre_y)
+
+    def levels(self) -> np.ndarray:
+        """Peak-preserving, smoothed waveform in [-1, 1]"""
+        samples = self.source(self.window)
+        if samples is None or samples.size < self.window:
+            return np.zeros(self.points)
+        groups = samples[-self.window:].reshape(self.points, -1)
+        peaks = groups[np.arange(self.points), np.abs(groups).argmax(axis=1)]
+        smoothed = np.convolve(peaks, self.kernel, mode='same')
+        # Auto-gain with a slow release so quiet rooms still show movement
+        self.gain = max(float(np.abs(smoothed).max()), self.gain * 0.95, 0.02)
+        return smoothed / self.gain
+
+    def render(self) -> None:
+        started = time.perf_counter()
+        left, centre_y = self.origin
+        self.coords[0::2] = left + self.x
+        self.coords[1::2] = centre_y - self.levels() * (self.height / 2)
+        self.canvas.coords(self.line, *self.coords.tolist())
+        self.frame_times.append(time.perf_counter() - started)
+
+    def frame_stats(self) -> Dict[str, float]:
+        """Average and worst render time over recent frames, in milliseconds"""
+        if not self.frame_times:
+            return {"avg_ms": 0.0, "max_ms": 0.0}
+        return {"avg_ms": sum(self.frame_times) / len(self.frame_times) * 1000,
+                "max_ms": max(self.frame_times) * 1000}
+
+
+class TelemetryGauge:
+    """CPU and memory sparklines drawn from the telemetry ring buffer.
+
+    Reads only the sampler's buffer, so the gauge adds no psutil calls. Like
+    the waveform, the lines are persistent canvas items moved with coords().
+    """
+
+    def __init__(self, canvas: tk.Canvas, sampler: TelemetrySampler,
+                 width: int = 240, height: int = 60, points: int = 60):
+        self.canvas = canvas
+        self.sampler = sampler
+        self.width = width
+        self.height = height
+        self.points = points
+        self.x = np.linspace(0, width, points)
+        self.coords = np.empty(points * 2)
+        self.border = canvas.create_rectangle(0, 0, 0, 0, outline='#0088ff', tags="gauge")
+        self.lines = {
+            'cpu': canvas.create_line(*([0, 0] * points), fill='#00ff88', width=2, tags="gauge"),
+            'memory': canvas.create_line(*([0, 0] * points), fill='#0088ff', width=2, tags="gauge")
+        }
+        self.label = canvas.create_text(0, 0, anchor='se', text="", fill='#00ff88',
+                                        font=("Courier", 12), tags="gauge")
+        self.place(int(canvas.cget('width')) - 20, 40)
+
+    def place(self, right: float, top: float) -> None:
+        """Anchor the gauge's top-right corner"""
+        self.origin = (right - self.width, top)
+        self.canvas.coords(self.border, right - self.width, top, right, top + self.height)
+        self.canvas.coords(self.label, right, top - 4)
+        self.render()
+
+    def render(self) -> None:
+        rows = self.sampler.history()[-self.points:]
+        if not len(rows):
             return
+        left, top = self.origin
+        for name, line in self.lines.items():
+            values = np.nan_to_num(rows[:, self.sampler.column[name]])
+            # Pad on the left until the buffer holds a full gauge's worth
+            values = np.concatenate([np.full(self.points - len(values), values[0]), values])
+            self.coords[0::2] = left + self.x
+            self.coords[1::2] = top + self.height * (1 - np.clip(values, 0, 100) / 100)
+            self.canvas.coords(line, *self.coords.tolist())
+        latest = rows[-1]
+        self.canvas.itemconfigure(self.label, text=(
+            f"CPU {latest[self.sampler.column['cpu']]:3.0f}%  "
+            f"MEM {latest[self.sampler.column['memory']]:3.0f}%"))
+
+
+class FrameClock:
+    """One Tk after() loop driving every GUI animation.
+
+    Animations register a callback and the interval they want. Each tick runs
+    the ones that are due, then schedules the next tick at the rate of the
+    fastest animation. The whole clock slows down while the window is unfocused and nearly
+    stops while it is hidden. It also measures FPS and process CPU for the
+    overlay.
+    """
+
+    UNFOCUSED_INTERVAL = 0.1
+    HIDDEN_INTERVAL = 0.5
+
+    def __init__(self, root: tk.Misc):
+        self.root = root
+        self.animations: List[List[Any]] = []
+        self.visible = True
+        self.focused = True
+        self.frames = 0
+        self.fps = 0.0
+        self.cpu_percent = 0.0
+        self.frame_ms = 0.0
+        self._sample_at = time.perf_counter()
+        self._sample_cpu = time.process_time()
+
+    def add(self, callback: Callable[[], None], interval: float) -> None:
+        """Run callback every interval seconds (at most)"""
+        self.animations.append([callback, interval, 0.0])
+
+    def start(self) -> None:
+        # The toplevel's bindings also see these events for every child widget
+        self.root.bind('<Map>', lambda e: e.widget is self.root and self._set_visible(True), add='+')
+        self.root.bind('<Unmap>', lambda e: e.widget is self.root and self._set_visible(False), add='+')
+        self.root.bind('<FocusIn>', self._focus_changed, add='+')
+        self.root.bind('<FocusOut>', self._focus_changed, add='+')
+        self.tick()
+
+    def _focus_changed(self, event: "tk.Event") -> None:
+        # Focus moving between widgets of this window is not the window losing
+        # it, so ask Tk once the events have settled whether anything here has focus
+        self.root.after_idle(self._update_focus)
+
+    def _update_focus(self) -> None:
+        self.focused = bool(self.root.tk.call('focus', '-displayof', self.root))
+
+    def _set_visible(self, visible: bool) -> None:
+        if visible != self.visible:
+            self.visible = visible
+            logging.info(f"Animations {'resumed' if visible else 'throttled'}: window {'shown' if visible else 'hidden'}")
+
+    def tick(self) -> None:
+        now = time.perf_counter()
+        floor = 0.0
+        if not self.visible:
+            floor = self.HIDDEN_INTERVAL
+        elif not self.focused:
+            floor = self.UNFOCUSED_INTERVAL
+
+        if self.visible:
+            for animation in self.animations:
+                callback, interval, due = animation
+                # Half a millisecond of slack keeps 16 ms ticks from skipping frames
+                if now >= due - 0.0005:
+                    callback()
+                    animation[2] = now + max(interval, floor)
+            self.frames += 1
+        self.frame_ms = (time.perf_counter() - now) * 1000
+
+        elapsed = now - self._sample_at
+        if elapsed >= 1.0:
+            cpu = time.process_time()
+            self.fps = self.frames / elapsed
+            self.cpu_percent = (cpu - self._sample_cpu) / elapsed * 100
+            self.frames = 0
+            self._sample_at = now
+            self._sample_cpu = cpu
+
+        # Tick at the rate of the fastest animation, or slower when throttled
+        interval = max(min((animation[1] for animation in self.animations), default=floor), floor)
+        delay = max(now + interval - time.perf_counter(), 0.001)
+        self.root.after(int(delay * 1000), self.tick)
 
-        # If no command matches
-        self.speak("I'm not sure how to help with that. Could you please rephrase?")
 
 class JarvisGUI:
     def __init__(self, root, jarvis_instance):
@@ -565,7 +4496,8 @@ class JarvisGUI:
         self.pulse_growing = True
         self.rings = []
         self.particles = []
-        self.voice_visualizer = []
+        self.centre = (600, 400)
+        self.frame_clock = FrameClock(self.root)
         
         # Create custom fonts
         self.title_font = tkfont.Font(family="Helvetica", size=36, weight="bold")
@@ -595,105 +4527,130 @@ class JarvisGUI:
         
         # Start animations
         self.create_logo_animation()
-        self.animate_particles()
+        self.create_particles()
+        self.create_overlay()
+        self.create_gauge()
+        self.canvas.tag_raise("waveform")
+        self.canvas.bind('<Configure>', self.on_resize)
+        self.frame_clock.start()
         
         # Start voice recognition
         self.continuous_listen()
 
     def create_voice_visualizer(self):
-        # Create matplotlib figure for voice visualization
-        self.fig = Figure(figsize=(8, 2), facecolor='#000000')
-        self.ax = self.fig.add_subplot(111)
-        self.ax.set_facecolor('#000000')
-        self.ax.set_ylim(-1, 1)
-        self.ax.set_xlim(0, 100)
-        self.ax.axis('off')
-        
-        # Create canvas for matplotlib
-        self.canvas_visualizer = FigureCanvasTkAgg(self.fig, master=self.canvas)
-        self.canvas_visualizer.get_tk_widget().place(relx=0.5, rely=0.5, anchor='center')
-        
-        # Initialize line for visualization
-        self.line, = self.ax.plot([], [], color='#00ff88', linewidth=2)
+        # Waveform of the live microphone signal, drawn straight on the canvas
+        self.visualizer = WaveformRenderer(self.canvas, self.microphone_samples)
         
-        # Start animation
-        self.animate_voice_visualizer()
+        # Start animation (~60 fps)
+        self.frame_clock.add(self.visualizer.render, 1 / 60)
 
-    def animate_voice_visualizer(self):
-        # Generate random data for visualization
-        data = np.random.randn(100)
-        data = signal.savgol_filter(data, 5, 2)
-        
-        # Update line data
-        self.line.set_data(range(100), data)
-        self.canvas_visualizer.draw()
-        
-        # Schedule next update
-        self.root.after(50, self.animate_voice_visualizer)
+    def microphone_samples(self, count: int) -> Optional[np.ndarray]:
+        """Newest microphone samples, if the stream is running"""
+        microphone = self.jarvis.microphone
+        if microphone is None:
+            return None
+        return microphone.latest_samples(count)
+
+    def on_resize(self, event):
+        """Re-centre everything on the canvas's actual size"""
+        self.centre = (event.width / 2, event.height / 2)
+        self.visualizer.place(*self.centre)
+        self.canvas.coords(self.overlay, 10, event.height - 10)
+        if self.gauge is not None:
+            self.gauge.place(event.width - 20, 40)
+        self.animate_logo()
 
     def create_logo_animation(self):
-        # Clear canvas
-        self.canvas.delete("logo")
-        
-        center_x = 600
-        center_y = 400
+        # Create the rings, arcs and core once; animate_logo only moves them
+        for i in range(5):
+            ring = self.canvas.create_oval(0, 0, 0, 0, outline='#0088ff', width=2, tags="logo")
+            arc = self.canvas.create_arc(0, 0, 0, 0, start=0, extent=60,
+                                         outline='#00ff88', width=4, tags="logo")
+            self.rings.append((ring, arc))
+        self.core = self.canvas.create_oval(0, 0, 0, 0, fill='#0088ff', outline='#00ff88',
+                                            width=2, tags="logo")
+        self.logo_time = time.perf_counter()
+        self.frame_clock.add(self.animate_logo, 1 / 60)
+
+    def animate_logo(self):
+        center_x, center_y = self.centre
+        # Advance by elapsed time (the original stepped every 20 ms) so speed
+        # doesn't depend on the frame rate
+        now = time.perf_counter()
+        steps = min((now - self.logo_time) / 0.02, 5)
+        self.logo_time = now
         
         # Create pulsing effect
         if self.pulse_growing:
-            self.pulse += 0.5
+            self.pulse += 0.5 * steps
             if self.pulse >= 20:
                 self.pulse_growing = False
         else:
-            self.pulse -= 0.5
+            self.pulse -= 0.5 * steps
             if self.pulse <= 0:
                 self.pulse_growing = True
         
-        # Draw multiple rotating rings
-        for i in range(5):
+        # Rotate the rings' arcs
+        for i, (ring, arc) in enumerate(self.rings):
             radius = 100 + i * 40 + self.pulse
-            # Outer ring
-            self.canvas.create_oval(center_x-radius, center_y-radius,
-                                  center_x+radius, center_y+radius,
-                                  outline='#0088ff',
-                                  width=2,
-                                  tags="logo")
-            
-            # Animated arc
-            start_angle = self.angle + i * 30
-            extent = 60
-            self.canvas.create_arc(center_x-radius, center_y-radius,
-                                  center_x+radius, center_y+radius,
-                                  start=start_angle, extent=extent,
-                                  outline='#00ff88', width=4,
-                                  tags="logo")
+            box = (center_x-radius, center_y-radius, center_x+radius, center_y+radius)
+            self.canvas.coords(ring, *box)
+            self.canvas.coords(arc, *box)
+            self.canvas.itemconfigure(arc, start=self.angle + i * 30)
         
         # Central core
         core_radius = 60 + self.pulse/2
-        self.canvas.create_oval(center_x-core_radius, center_y-core_radius,
-                              center_x+core_radius, center_y+core_radius,
-                              fill='#0088ff', outline='#00ff88', width=2,
-                              tags="logo")
+        self.canvas.coords(self.core, center_x-core_radius, center_y-core_radius,
+                           center_x+core_radius, center_y+core_radius)
         
         # Update animation
-        self.angle = (self.angle + 1) % 360
-        self.root.after(20, self.create_logo_animation)
+        self.angle = (self.angle + steps) % 360
 
-    def animate_particles(self):
-        # Clear old particles
-        self.canvas.delete("particle")
-        
-        # Create new particles
+    def create_particles(self):
         for _ in range(5):
-            x = random.randint(0, 1200)
-            y = random.randint(0, 800)
-            size = random.randint(2, 4)
             color = random.choice(['#00ff88', '#0088ff'])
-            self.canvas.create_oval(x, y, x+size, y+size,
-                                  fill=color, outline=color,
-                                  tags="particle")
-        
-        # Schedule next update
-        self.root.after(100, self.animate_particles)
+            self.particles.append(self.canvas.create_oval(0, 0, 0, 0, fill=color, outline=color,
+                                                          tags="particle"))
+        self.frame_clock.add(self.animate_particles, 0.1)
+
+    def animate_particles(self):
+        # Move the existing particles to new random spots
+        width, height = self.centre[0] * 2, self.centre[1] * 2
+        for particle in self.particles:
+            x = random.randint(0, int(width))
+            y = random.randint(0, int(height))
+            size = random.randint(2, 4)
+            self.canvas.coords(particle, x, y, x+size, y+size)
+
+    def create_overlay(self):
+        """FPS/CPU readout, toggled with F3"""
+        self.overlay = self.canvas.create_text(10, self.centre[1] * 2 - 10, anchor='sw', text="",
+                                               fill='#00ff88', font=("Courier", 12),
+                                               state='hidden', tags="overlay")
+        self.root.bind('<F3>', self.toggle_overlay)
+        self.frame_clock.add(self.update_overlay, 0.5)
+
+    def create_gauge(self):
+        """Live CPU/memory gauge, if enabled in config.json"""
+        self.gauge = None
+        if not self.jarvis.config['telemetry']['gui_gauge']:
+            return
+        sampler = self.jarvis.start_telemetry()
+        self.gauge = TelemetryGauge(self.canvas, sampler)
+        self.frame_clock.add(self.gauge.render, sampler.interval)
+
+    def toggle_overlay(self, event=None):
+        hidden = self.canvas.itemcget(self.overlay, 'state') == 'hidden'
+        self.canvas.itemconfigure(self.overlay, state='normal' if hidden else 'hidden')
+
+    def update_overlay(self):
+        if self.canvas.itemcget(self.overlay, 'state') == 'hidden':
+            return
+        clock = self.frame_clock
+        visualizer = self.visualizer.frame_stats()
+        self.canvas.itemconfigure(self.overlay, text=(
+            f"FPS {clock.fps:5.1f}  CPU {clock.cpu_percent:5.1f}%  "
+            f"frame {clock.frame_ms:.2f} ms  waveform {visualizer['avg_ms']:.2f} ms"))
 
     def create_command_buttons(self):
         commands_frame = ttk.Frame(self.canvas)
@@ -723,18 +4680,327 @@ class JarvisGUI:
             btn.pack(side='left', padx=5)
 
     def continuous_listen(self):
-        def listen_thread():
-            query = self.jarvis.listen()
-            if query:
-                self.status_label.config(text="Processing...")
-                self.root.update()
-                self.jarvis.process_command(query)
-                self.status_label.config(text="Listening...")
-            self.root.after(100, self.continuous_listen)
-        
-        threading.Thread(target=listen_thread, daemon=True).start()
+        """Start the supervised listener and the Tk-side event pump"""
+        self.events: "queue.Queue[Tuple[str, Any]]" = queue.Queue()
+        self.stopping = threading.Event()
+        self.listener_metrics = {"iterations": 0, "errors": 0, "restarts": 0, "backoff": 0.0}
+        self.listener: Optional[threading.Thread] = None
+        self.start_listener()
+        self.pump_events()
+
+    def start_listener(self):
+        self.listener = threading.Thread(target=self.listener_loop, name="listener", daemon=True)
+        self.listener.start()
+
+    def listener_loop(self):
+        """Listen and dispatch forever; only talks to Tk through self.events"""
+        backoff = 0.0
+        self.events.put(("status", "Listening..."))
+        while not self.stopping.is_set():
+            self.listener_metrics["iterations"] += 1
+            try:
+                query = self.jarvis.listen(raise_errors=True)
+                backoff = 0.0
+                if not query:
+                    continue
+                self.events.put(("status", "Processing..."))
+                response = self.jarvis.process_command(query, turn_started=self.jarvis.heard_at)
+                response.add_done_callback(lambda _: self.events.put(("status", "Listening...")))
+            except SystemExit:
+                self.events.put(("quit", None))
+                return
+            except Exception as e:
+                # Back off on recognizer/network errors instead of spinning
+                self.listener_metrics["errors"] += 1
+                backoff = min(30.0, max(0.5, backoff * 2)) * random.uniform(0.8, 1.2)
+                logging.error(f"Listener error, retrying in {backoff:.1f}s: {e}")
+                self.events.put(("status", "Reconnecting..."))
+            self.listener_metrics["backoff"] = backoff
+            if backoff:
+                self.stopping.wait(backoff)
+
+    def pump_events(self):
+        """Drain listener events on the Tk thread and supervise the listener"""
+        while True:
+            try:
+                kind, value = self.events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "status":
+                self.status_label.config(text=value)
+            elif kind == "quit":
+                self.stopping.set()
+                self.root.destroy()
+                return
+
+        if not self.stopping.is_set() and not self.listener.is_alive():
+            self.listener_metrics["restarts"] += 1
+            logging.warning("Listener thread died, restarting")
+            self.start_listener()
+        self.root.after(50, self.pump_events)
+
+    def listener_stats(self) -> Dict[str, Any]:
+        """Loop iterations, errors, restarts and event queue depth"""
+        stats = dict(self.listener_metrics)
+        stats["queue_depth"] = self.events.qsize()
+        return stats
+
+class CommandSession:
+    """One client conversation with a headless Jarvis.
+
+    Each line is a JSON request such as {"id": 1, "query": "what time is it"}
+    or, for interactive use, plain text. Requests are dispatched through
+    Jarvis.process_command as soon as they arrive, so clients can pipeline
+    them; replies carry the request id and may come back out of order. With
+    "audio": true the reply also holds the spoken response as base64 mp3.
+    Unprompted events, like a due reminder, arrive as {"event": ...} lines.
+    """
+
+    def __init__(self, jarvis: Jarvis, reader: io.TextIOBase, write: Callable[[str], None],
+                 audio_pool: ThreadPoolExecutor, max_pending: int = 64):
+        self.jarvis = jarvis
+        self.reader = reader
+        self.write = write
+        self.audio_pool = audio_pool
+        self.write_lock = threading.Lock()
+        self.slots = threading.BoundedSemaphore(max_pending)
+        self.outstanding = 0
+        self.idle = threading.Condition()
+        # Whether the client last spoke plain text, which decides how events are sent
+        self.plain = False
+
+    def run(self) -> None:
+        """Serve requests until the client hangs up or says goodbye"""
+        self.jarvis.listeners.append(self.notify)
+        try:
+            for line in self.reader:
+                line = line.strip()
+                if line and not self.handle_line(line):
+                    break
+        except (OSError, ValueError) as e:
+            logging.warning(f"Client connection lost: {e}")
+        finally:
+            self.jarvis.listeners.remove(self.notify)
+        with self.idle:
+            self.idle.wait_for(lambda: self.outstanding == 0, timeout=60)
+
+    def handle_line(self, line: str) -> bool:
+        """Dispatch one request; returns False when the session should end"""
+        plain = self.plain = not line.startswith("{")
+        try:
+            request = {"query": line} if plain else json.loads(line)
+            query = str(request.get("query", "")).strip().lower()
+        except (ValueError, AttributeError) as e:
+            self.reply({"error": f"Invalid request: {e}"}, plain)
+            return True
+
+        started = time.perf_counter()
+        self.slots.acquire()
+        with self.idle:
+            self.outstanding += 1
+        try:
+            response = self.jarvis.process_command(query)
+        except SystemExit:
+            self.finish(request, plain, started, completed(self.jarvis.farewell_message()))
+            return False
+        response.add_done_callback(lambda f: self.finish(request, plain, started, f))
+        return True
+
+    def finish(self, request: Dict[str, Any], plain: bool, started: float, response: Future) -> None:
+        try:
+            reply = {"id": request.get("id"), "response": response.result()}
+            if isinstance(reply["response"], LocalizedText):
+                reply["language"] = reply["response"].language
+        except Exception as e:
+            logging.error(f"Error processing command: {e}")
+            reply = {"id": request.get("id"), "error": str(e)}
+        reply["latency_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        if request.get("audio") and reply.get("response"):
+            self.audio_pool.submit(self.attach_audio, reply, plain)
+        else:
+            self.reply(reply, plain)
+            self.done()
+
+    def attach_audio(self, reply: Dict[str, Any], plain: bool) -> None:
+        try:
+            response = reply["response"]
+            mp3 = self.jarvis.synthesize(response, getattr(response, 'language', None)).read_bytes()
+            reply["audio"] = base64.b64encode(mp3).decode("ascii")
+        except Exception as e:
+            logging.error(f"Error in speech synthesis: {e}")
+            reply["audio_error"] = str(e)
+        self.reply(reply, plain)
+        self.done()
+
+    def done(self) -> None:
+        self.slots.release()
+        with self.idle:
+            self.outstanding -= 1
+            self.idle.notify_all()
+
+    def notify(self, event: Dict[str, Any]) -> None:
+        """Push an unprompted event, such as a due reminder, to the client"""
+        self.reply(event, self.plain)
+
+    def reply(self, reply: Dict[str, Any], plain: bool) -> None:
+        text = (reply.get("response") or reply.get("error") or "") if plain else json.dumps(reply)
+        try:
+            with self.write_lock:
+                self.write(text + "\n")
+        except OSError as e:
+            logging.warning(f"Could not send reply: {e}")
+
+
+class CommandTCPServer(socketserver.ThreadingTCPServer):
+    """TCP listener for CommandServer that can rebind a port left in TIME_WAIT"""
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+class CommandServer:
+    """Serves CommandSessions on a local UNIX socket and/or a TCP port.
+
+    Every connection gets its own thread, but all of them share one Jarvis,
+    so commands from many clients go through the same intent dispatcher and
+    executor.
+    """
+
+    def __init__(self, jarvis: Jarvis, unix_path: Optional[str] = None,
+                 tcp_address: Optional[Tuple[str, int]] = None,
+                 max_pending: int = 64, audio_workers: int = 2):
+        self.jarvis = jarvis
+        self.max_pending = max_pending
+        self.audio_pool = ThreadPoolExecutor(max_workers=audio_workers, thread_name_prefix="reply-audio")
+        self.servers: List[socketserver.BaseServer] = []
+        self.threads: List[threading.Thread] = []
+        handler = self.handler_class()
+        if unix_path:
+            if os.path.exists(unix_path):
+                os.unlink(unix_path)
+            server = socketserver.ThreadingUnixStreamServer(unix_path, handler)
+            os.chmod(unix_path, 0o600)
+            self.servers.append(server)
+        if tcp_address:
+            self.servers.append(CommandTCPServer(tcp_address, handler))
+        for server in self.servers:
+            server.daemon_threads = True
+
+    def handler_class(self) -> type:
+        command_server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                reader = io.TextIOWrapper(self.rfile, encoding="utf-8", errors="replace")
+                command_server.session(reader, lambda text: self.wfile.write(text.encode("utf-8"))).run()
+
+        return Handler
+
+    def session(self, reader: io.TextIOBase, write: Callable[[str], None]) -> CommandSession:
+        return CommandSession(self.jarvis, reader, write, self.audio_pool, self.max_pending)
+
+    def addresses(self) -> List[str]:
+        return [str(server.server_address) for server in self.servers]
+
+    def start(self) -> None:
+        for server in self.servers:
+            thread = threading.Thread(target=server.serve_forever, name="command-server", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        for address in self.addresses():
+            logging.info(f"Accepting commands on {address}")
+
+    def shutdown(self) -> None:
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+            if isinstance(server.server_address, str) and os.path.exists(server.server_address):
+                os.unlink(server.server_address)
+        self.audio_pool.shutdown(wait=False)
+
+
+def parse_tcp_address(value: str) -> Tuple[str, int]:
+    """Parse [HOST:]PORT, defaulting to localhost"""
+    host, _, port = value.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+def record_wake_word(directory: str, count: int) -> None:
+    """Record wake word templates from the microphone into directory"""
+    Path(directory).mkdir(parents=True, exist_ok=True)
+    microphone = MicrophoneStream()
+    microphone.start()
+    try:
+        while microphone.noise_floor is None:
+            time.sleep(0.05)
+        recorded = 0
+        while recorded < count:
+            print(f"Say \"Jarvis\" ({recorded + 1}/{count})")
+            try:
+                audio = microphone.capture_phrase(timeout=10, phrase_time_limit=2, pause_threshold=0.5)
+            except sr.WaitTimeoutError:
+                continue
+            recorded += 1
+            path = Path(directory) / f"wake_{datetime.datetime.now():%Y%m%d_%H%M%S}_{recorded}.wav"
+            path.write_bytes(audio.get_wav_data())
+    finally:
+        microphone.stop()
+    print(f"Saved {count} wake word templates to {directory}")
+
+
+def run_headless(args: argparse.Namespace) -> None:
+    """Run Jarvis without the GUI or microphone, taking commands as text"""
+    jarvis = Jarvis(voice=args.speak)
+    if args.speak:
+        jarvis.warm_up_speech()
+    jarvis.start_services()
+
+    server = CommandServer(jarvis, unix_path=args.socket,
+                           tcp_address=parse_tcp_address(args.tcp) if args.tcp else None)
+    server.start()
+    try:
+        if not args.no_stdin:
+            def write(text: str) -> None:
+                sys.stdout.write(text)
+                sys.stdout.flush()
+
+            server.session(sys.stdin, write).run()
+        # Keep serving sockets after stdin closes, e.g. under a service manager
+        if server.servers:
+            threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        jarvis.executor.shutdown()
+
 
 def main():
+    parser = argparse.ArgumentParser(description="JARVIS voice assistant")
+    parser.add_argument("--headless", action="store_true",
+                        help="Run without the GUI or microphone and take commands as text")
+    parser.add_argument("--socket", help="UNIX socket path for JSON-lines commands (headless)")
+    parser.add_argument("--tcp", help="[HOST:]PORT for JSON-lines commands (headless)")
+    parser.add_argument("--no-stdin", action="store_true", help="Don't read commands from stdin (headless)")
+    parser.add_argument("--speak", action="store_true", help="Also speak responses aloud (headless)")
+    parser.add_argument("--startup-report", action="store_true",
+                        help="Print the startup report once listening starts, then exit")
+    parser.add_argument("--record-wake-word", type=int, nargs="?", const=5, metavar="N",
+                        help="Record N wake word templates (default 5), then exit")
+    args = parser.parse_args()
+
+    if args.record_wake_word:
+        try:
+            with open('config.json', 'r') as f:
+                config = merge_config(DEFAULT_CONFIG, json.load(f))
+        except FileNotFoundError:
+            config = DEFAULT_CONFIG
+        record_wake_word(config['wake_word']['templates'], args.record_wake_word)
+        return
+
+    if args.headless:
+        run_headless(args)
+        return
+
     print("Initializing JARVIS...")
     
     # Create Tkinter root window
@@ -742,12 +5008,15 @@ def main():
     
     # Create Jarvis instance
     jarvis = Jarvis()
+    jarvis.exit_after_startup = args.startup_report
+    jarvis.warm_up_speech()
+    jarvis.start_services()
     
     # Create GUI
     gui = JarvisGUI(root, jarvis)
     
     # Welcome message
-    jarvis.speak(f"Hello {jarvis.user}, I am {jarvis.name}, your personal assistant. How may I help you?")
+    jarvis.speak(jarvis.welcome_message())
     
     # Start GUI main loop
     try:
@@ -0,0 +1,15 @@
+import os
+import sys
+
+import pytest
+
+# jarvis.py is a script at the repository root, not an installed package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import jarvis  # noqa: E402
+
+
+@pytest.fixture(scope="session", autouse=True)
+def log_to_temp_dir(tmp_path_factory):
+    """Keep test runs from appending to jarvis.log in the checkout"""
+    jarvis.setup_logging(file=str(tmp_path_factory.mktemp("logs") / "jarvis.log"))
@@ -0,0 +1,114 @@
+"""
+Regenerate the synthetic WAV fixtures used by the VAD and wake word tests.
+
+The voices are formant-synthesised (a glottal pulse train through three
+resonators), so the fixtures are small, deterministic and need no
+recordings. Run from the repository root:
+
+    python tests/fixtures/generate.py
+"""
+
+import os
+import wave
+
+import numpy as np
+
+RATE = 16000
+FIXTURES = os.path.dirname(os.path.abspath(__file__))
+
+# First three formants of a few vowels, in Hz
+EE, AH, ER, IH = (270, 2290, 3010), (730, 1090, 2440), (490, 1350, 1690), (390, 1990, 2550)
+OH, OO, EH = (570, 840, 2410), (300, 870, 2240), (530, 1840, 2480)
+
+rng = np.random.default_rng(7)
+
+
+def write(name: str, samples: np.ndarray) -> None:
+    path = os.path.join(FIXTURES, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with wave.open(path, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(RATE)
+        wav.writeframes((np.clip(samples, -1, 1) * 32767).astype('<i2').tobytes())
+
+
+def track(points, n: int) -> np.ndarray:
+    """Piecewise linear track through (fraction, value) points"""
+    fractions, values = zip(*points)
+    return np.interp(np.linspace(0, 1, n), fractions, values)
+
+
+def resonate(x: np.ndarray, freq: np.ndarray, bandwidth: float) -> np.ndarray:
+    """Two-pole resonator with a time-varying centre frequency"""
+    c = -np.exp(-2 * np.pi * bandwidth / RATE)
+    b = 2 * np.exp(-np.pi * bandwidth / RATE) * np.cos(2 * np.pi * freq / RATE)
+    a = 1 - b - c
+    y = np.zeros_like(x)
+    y1 = y2 = 0.0
+    for n in range(len(x)):
+        y[n] = a[n] * x[n] + b[n] * y1 + c * y2
+        y2, y1 = y1, y[n]
+    return y
+
+
+def voice(formants, pitch, seconds: float, fricative: float = 0.0) -> np.ndarray:
+    """Voiced sound gliding through formants; fricative fades to hiss from that fraction on"""
+    n = int(seconds * RATE)
+    f0 = track(pitch, n) * (1 + 0.01 * rng.standard_normal(n).cumsum() / np.sqrt(n))
+    pulses = np.diff(np.floor(np.cumsum(f0 / RATE)), prepend=0.0)
+    out = np.convolve(pulses, np.exp(-np.arange(40) / 8.0))[:n]
+    for k, bandwidth in enumerate((80, 100, 140)):
+        out = resonate(out, track([(p, f[k]) for p, f in formants], n), bandwidth)
+    out *= np.minimum(1, np.minimum(np.arange(n), n - np.arange(n)) / (0.03 * RATE))
+    out = 0.3 * out / np.max(np.abs(out))
+    if fricative:
+        start = int(fricative * n)
+        noise = rng.standard_normal(n - start)
+        noise -= np.convolve(noise, np.ones(3) / 3, 'same')
+        out[start:] = out[start:] * np.linspace(1, 0, n - start) + 0.08 * noise * np.linspace(0, 1, n - start)
+    return out
+
+
+def pad(samples: np.ndarray, before: float = 0.3, after: float = 0.3) -> np.ndarray:
+    """Surround with silence and add a faint noise floor"""
+    samples = np.concatenate([np.zeros(int(before * RATE)), samples, np.zeros(int(after * RATE))])
+    return samples + 3e-4 * rng.standard_normal(len(samples))
+
+
+def hum(seconds: float = 1.2) -> np.ndarray:
+    """Mains hum: loud, but all of its energy is below the speech band"""
+    t = np.arange(int(seconds * RATE)) / RATE
+    return sum(a * np.sin(2 * np.pi * f * t) for f, a in ((50, 0.2), (100, 0.08), (150, 0.04)))
+
+
+def wake_word(f0: float, speed: float) -> np.ndarray:
+    """Two syllables, "ee-ah-er" then "ih-s", standing in for the wake word"""
+    return voice([(0, EE), (0.15, AH), (0.45, ER), (0.6, IH), (1, IH)],
+                 [(0, f0 * 1.1), (0.5, f0), (1, f0 * 0.9)], 0.65 / speed, fricative=0.8)
+
+
+def command(f0: float) -> np.ndarray:
+    return voice([(0, OH), (0.3, EH), (0.6, AH), (1, OO)], [(0, f0), (1, f0 * 0.85)], 0.7)
+
+
+def main() -> None:
+    write("vad/silence.wav", pad(np.zeros(int(0.6 * RATE))))
+    write("vad/hum.wav", pad(hum(), 0, 0))
+    write("vad/voiced.wav", pad(voice([(0, AH), (0.5, EE), (1, OH)], [(0, 130), (1, 110)], 0.6)))
+    write("vad/click.wav", pad(voice([(0, AH), (1, AH)], [(0, 130), (1, 130)], 0.08)))
+
+    for i, (f0, speed) in enumerate(((120, 1.0), (135, 0.95), (110, 1.05)), 1):
+        write(f"wake_word/templates/wake_{i}.wav", pad(wake_word(f0, speed), 0.2, 0.2))
+    for i, (f0, speed) in enumerate(((125, 1.0), (140, 1.05), (115, 0.92)), 1):
+        write(f"wake_word/positives/wake_then_command_{i}.wav",
+              pad(np.concatenate([wake_word(f0, speed), np.zeros(int(0.15 * RATE)), command(f0)])))
+    write("wake_word/negatives/other_words.wav",
+          pad(np.concatenate([command(125), np.zeros(int(0.1 * RATE)), command(140)])))
+    write("wake_word/negatives/vowels.wav", pad(voice([(0, OO), (0.5, OH), (1, AH)], [(0, 120), (1, 100)], 0.8)))
+    write("wake_word/negatives/hum.wav", pad(hum(), 0, 0))
+    write("wake_word/negatives/silence.wav", pad(np.zeros(int(0.6 * RATE))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import threading
+import time
+
+import pytest
+
+from jarvis import CommandExecutor, DeadlineTimer
+
+
+@pytest.fixture
+def acknowledged():
+    return []
+
+
+@pytest.fixture
+def executor(acknowledged):
+    executor = CommandExecutor(workers=4, timeouts={"default": 0.3}, concurrency={"weather": 1},
+                               acknowledge_after=0.1, on_acknowledge=acknowledged.append)
+    yield executor
+    executor.shutdown()
+
+
+def test_fast_commands_are_not_acknowledged(executor, acknowledged):
+    assert executor.submit("time", lambda query: query.upper(), "now").result(timeout=1) == "NOW"
+    time.sleep(0.2)
+    assert acknowledged == []
+
+
+def test_slow_commands_are_acknowledged_then_time_out(executor, acknowledged):
+    release = threading.Event()
+    response = executor.submit("news", lambda query: release.wait(2) and "done", "news")
+    assert response.result(timeout=1) == "Sorry, the news request is taking too long"
+    assert acknowledged == ["news"]
+    release.set()
+
+
+def test_concurrency_limit_per_intent(executor):
+    release = threading.Event()
+    first = executor.submit("weather", lambda query: release.wait(1) and "sunny", "weather")
+    second = executor.submit("weather", lambda query: "rain", "weather")
+    assert second.result(timeout=1) == "I'm still working on the previous weather request"
+    release.set()
+    assert first.result(timeout=1) == "sunny"
+
+
+def test_deadlines_share_one_thread(executor):
+    before = threading.active_count()
+    release = threading.Event()
+    responses = [executor.submit("search", lambda query: release.wait(1) and query, str(i)) for i in range(200)]
+    # While they are pending: the four workers and the deadline thread, not two timers per request
+    assert threading.active_count() - before <= 5
+    release.set()
+    for response in responses:
+        response.result(timeout=2)
+
+
+def test_deadline_timer_runs_callbacks_in_order_and_skips_cancelled():
+    timer = DeadlineTimer()
+    fired = []
+    done = threading.Event()
+    timer.call_later(0.15, lambda: (fired.append("late"), done.set()))
+    timer.call_later(0.05, lambda: fired.append("early"))
+    timer.call_later(0.1, lambda: fired.append("cancelled")).cancel()
+    assert done.wait(1)
+    assert fired == ["early", "late"]
+    timer.stop()
@@ -0,0 +1,138 @@
+import json
+import threading
+import time
+import types
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+from jarvis import HttpClient, Jarvis, ResponseCache
+
+
+class Upstream(BaseHTTPRequestHandler):
+    """Stub web API: healthy, slow, failing and rate-limited routes"""
+
+    protocol_version = "HTTP/1.1"
+    hits: Counter = Counter()
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        route = self.path.split("?")[0]
+        with self.lock:
+            self.hits[route] += 1
+            attempt = self.hits[route]
+            Upstream.active += 1
+            Upstream.peak = max(Upstream.peak, Upstream.active)
+        try:
+            if route == "/slow":
+                time.sleep(1.0)
+            elif route == "/busy":
+                time.sleep(0.2)
+            elif route == "/fail":
+                return self.send(503)
+            elif route == "/limited":
+                return self.send(429)
+            elif route == "/flaky" and attempt <= 2:
+                return self.send(502)
+            self.send(200, BODIES.get(route, {"status": "ok"}))
+        finally:
+            with self.lock:
+                Upstream.active -= 1
+
+    def send(self, status, payload=None):
+        body = json.dumps(payload).encode() if payload is not None else b""
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # The client timed out and hung up first
+
+    def log_message(self, format, *args):
+        pass
+
+
+BODIES = {
+    "/weather": {"cod": 200, "main": {"temp": 18.5, "humidity": 60},
+                 "weather": [{"description": "light rain"}], "wind": {"speed": 3.2}},
+    "/news": {"status": "ok", "articles": [{"title": "First headline"}, {"title": "Second headline"}]},
+}
+
+
+@pytest.fixture
+def upstream():
+    Upstream.hits.clear()
+    Upstream.active = Upstream.peak = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Upstream)
+    threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def client():
+    client = HttpClient(timeout=0.3, connect_timeout=0.3, retries=2, backoff=0.01, max_concurrency=2)
+    yield client
+    client.close()
+
+
+def test_times_out_on_a_slow_upstream(upstream, client):
+    start = time.perf_counter()
+    with pytest.raises(requests.Timeout):
+        client.get(f"{upstream}/slow")
+    # Three attempts of 0.3 s each, not three full second-long responses
+    assert time.perf_counter() - start < 2.0
+    assert Upstream.hits["/slow"] == 3
+
+
+def test_retries_server_errors_until_they_clear(upstream, client):
+    assert client.get_json(f"{upstream}/flaky") == {"status": "ok"}
+    assert Upstream.hits["/flaky"] == 3
+
+
+@pytest.mark.parametrize("route, status", [("/fail", 503), ("/limited", 429)])
+def test_gives_up_after_the_last_retry(upstream, client, route, status):
+    assert client.get(f"{upstream}{route}").status_code == status
+    assert Upstream.hits[route] == client.retries + 1
+
+
+def test_caps_concurrent_requests(upstream, client):
+    threads = [threading.Thread(target=client.get, args=(f"{upstream}/busy",)) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert Upstream.hits["/busy"] == 6
+    assert Upstream.peak == client.max_concurrency
+
+
+def api_host(client, base, weather="/weather", news="/news"):
+    """Just enough of a Jarvis to run the weather and news lookups"""
+    host = SimpleNamespace(config={"apis": {"openweathermap": "key", "newsapi": "key"}},
+                           http=client, responses=ResponseCache({"weather": 600, "news": 1800}),
+                           WEATHER_URL=base + weather, NEWS_URL=base + news)
+    for name in ("get_weather", "fetch_weather", "get_news", "fetch_news"):
+        setattr(host, name, types.MethodType(getattr(Jarvis, name), host))
+    return host
+
+
+def test_weather_and_news_through_the_shared_client(upstream, client):
+    host = api_host(client, upstream)
+    assert host.get_weather("Paris") == ("The temperature in Paris is 18.5°C with light rain. "
+                                         "Humidity is 60% and wind speed is 3.2 m/s")
+    assert host.get_news() == "Here are the top headlines: First headline. Second headline"
+
+
+def test_failing_upstream_gives_a_spoken_error(upstream, client):
+    host = api_host(client, upstream, weather="/fail", news="/slow")
+    assert host.get_weather("Paris") == "Sorry, I couldn't get the weather information."
+    assert host.get_news() == "Sorry, I couldn't get the news"
+    assert Upstream.hits["/fail"] == client.retries + 1
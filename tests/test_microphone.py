@@ -0,0 +1,54 @@
+from types import SimpleNamespace
+from unittest import mock
+
+import numpy as np
+import pytest
+
+import jarvis
+from jarvis import MicrophoneStream
+
+
+class FakeMicrophone:
+    SAMPLE_RATE = 16000
+    SAMPLE_WIDTH = 2
+    CHUNK = 1024
+
+
+@pytest.fixture
+def stream():
+    # The device is never opened; energies are fed to track_noise directly
+    with mock.patch.object(jarvis, "sr", SimpleNamespace(Microphone=FakeMicrophone)):
+        yield MicrophoneStream()
+
+
+def feed(stream, levels):
+    for energy in levels:
+        stream.track_noise(float(energy))
+
+
+def seconds(stream, value):
+    return int(value / stream.frame_seconds)
+
+
+def test_threshold_follows_a_step_in_background_noise(stream):
+    rng = np.random.default_rng(1)
+    feed(stream, rng.normal(100, 5, seconds(stream, 1)))
+    assert stream.noise_floor == pytest.approx(100, rel=0.1)
+    assert stream.energy_threshold == pytest.approx(250, rel=0.1)
+
+    # A fan switches on, louder than the old speech threshold
+    feed(stream, rng.normal(700, 20, seconds(stream, 15)))
+    assert stream.noise_floor == pytest.approx(700, rel=0.1)
+    assert stream.energy_threshold > 700 * 2
+
+
+def test_speech_does_not_move_the_noise_floor(stream):
+    rng = np.random.default_rng(2)
+    feed(stream, rng.normal(100, 5, seconds(stream, 1)))
+    calibrations = stream.calibrations
+    # Talking for most of the time, with short pauses between words
+    levels = rng.normal(100, 5, seconds(stream, 30))
+    levels[rng.random(levels.size) < 0.7] = 3000
+    feed(stream, levels)
+    assert stream.calibrations == calibrations
+    assert stream.noise_floor == pytest.approx(100, rel=0.1)
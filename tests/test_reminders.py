@@ -0,0 +1,108 @@
+import datetime
+
+import pytest
+
+from jarvis import ReminderScheduler, parse_reminder
+
+# A Sunday afternoon
+NOW = datetime.datetime(2026, 10, 18, 14, 30)
+
+
+@pytest.mark.parametrize("query, due, task", [
+    ("remind me in 10 minutes to call mom", NOW + datetime.timedelta(minutes=10), "call mom"),
+    ("remind me in half an hour to stretch", NOW + datetime.timedelta(minutes=30), "stretch"),
+    ("remind me at 5 pm to check the oven", datetime.datetime(2026, 10, 18, 17, 0), "check the oven"),
+    ("remind me at 9 to take my pills", datetime.datetime(2026, 10, 18, 21, 0), "take my pills"),
+    ("remind me at 1 pm to water the plants", datetime.datetime(2026, 10, 19, 13, 0), "water the plants"),
+    ("remind me tomorrow at 9 am to buy milk", datetime.datetime(2026, 10, 19, 9, 0), "buy milk"),
+    ("remind me on friday evening to book tickets", datetime.datetime(2026, 10, 23, 20, 0), "book tickets"),
+    ("remind me on sunday at 1 pm to call dad", datetime.datetime(2026, 10, 25, 13, 0), "call dad"),
+    ("remind me on march 3rd to renew my passport", datetime.datetime(2027, 3, 3, 9, 0), "renew my passport"),
+    ("remind me on october 18 at 1 pm to pay rent", datetime.datetime(2027, 10, 18, 13, 0), "pay rent"),
+    ("remind me on october 18 at 6 pm to pay rent", datetime.datetime(2026, 10, 18, 18, 0), "pay rent"),
+    ("remind me to call mom", None, "call mom"),
+])
+def test_parse_reminder(query, due, task):
+    assert parse_reminder(query, NOW) == (due, task)
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def scheduler(tmp_path, clock, fired, delivered=True):
+    def on_due(reminder):
+        fired.append(reminder)
+        return delivered
+    return ReminderScheduler(str(tmp_path / "reminders.sqlite"), on_due=on_due, clock=clock)
+
+
+def test_run_due_fires_in_order_once(tmp_path):
+    clock, fired = FakeClock(), []
+    reminders = scheduler(tmp_path, clock, fired)
+    later = reminders.add(1300.0, "later")
+    sooner = reminders.add(1100.0, "sooner")
+    reminders.add(5000.0, "much later")
+
+    assert reminders.run_due() == []
+    clock.now = 1400.0
+    assert reminders.run_due() == [sooner, later]
+    assert reminders.run_due() == []
+    assert fired == [sooner, later]
+    assert [r.text for r in reminders.pending()] == ["much later"]
+
+
+def test_pending_reminders_are_rearmed_on_restart(tmp_path):
+    clock, fired = FakeClock(), []
+    reminders = scheduler(tmp_path, clock, fired)
+    done = reminders.add(1100.0, "done")
+    waiting = reminders.add(2000.0, "waiting")
+    clock.now = 1500.0
+    reminders.run_due()
+    reminders.db.close()
+
+    # Came due while switched off: fires straight away after the restart
+    clock.now = 3000.0
+    restarted = scheduler(tmp_path, clock, fired)
+    assert restarted.pending() == [waiting]
+    assert restarted.run_due() == [waiting]
+    assert fired == [done, waiting]
+
+
+def test_cancelled_reminders_are_skipped(tmp_path):
+    clock, fired = FakeClock(), []
+    reminders = scheduler(tmp_path, clock, fired)
+    cancelled = reminders.add(1100.0, "cancelled")
+    kept = reminders.add(1200.0, "kept")
+    assert reminders.cancel(cancelled.id)
+    assert not reminders.cancel(cancelled.id)
+    assert reminders.pending() == [kept]
+
+    clock.now = 1500.0
+    assert reminders.run_due() == [kept]
+    assert fired == [kept]
+
+
+def test_undelivered_reminders_stay_pending(tmp_path):
+    clock, fired = FakeClock(), []
+    reminders = scheduler(tmp_path, clock, fired, delivered=False)
+    reminder = reminders.add(1100.0, "nobody listening")
+    clock.now = 1200.0
+    assert reminders.run_due() == []
+    assert fired == [reminder]
+
+    # Retried later, still reporting the original due time
+    clock.now += ReminderScheduler.RETRY_SECONDS - 1
+    reminders.run_due()
+    assert len(fired) == 1
+    clock.now += 1
+    reminders.run_due()
+    assert fired == [reminder, reminder]
+    reminders.db.close()
+
+    restarted = scheduler(tmp_path, clock, fired, delivered=True)
+    assert restarted.run_due() == [reminder]
@@ -0,0 +1,128 @@
+import time
+
+import pytest
+
+from jarvis import ResponseCache
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class Fetcher:
+    """Counts calls and returns the queued values in turn"""
+
+    def __init__(self, *values):
+        self.values = list(values)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        value = self.values.pop(0)
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+
+def wait_for_refresh(cache):
+    deadline = time.monotonic() + 2
+    while cache.refreshing and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not cache.refreshing
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def cache(clock):
+    return ResponseCache({"weather": 600}, clock=clock)
+
+
+def test_fresh_entries_are_served_from_cache(cache):
+    fetch = Fetcher("sunny")
+    assert cache.get("weather", "paris", fetch) == "sunny"
+    assert cache.get("weather", "paris", fetch) == "sunny"
+    assert fetch.calls == 1
+    assert cache.stats()["weather"] == {"hits": 1, "stale": 0, "misses": 1, "hit_rate": 0.5}
+
+
+def test_stale_entries_are_served_while_refreshing(cache, clock):
+    cache.get("weather", "paris", Fetcher("sunny"))
+    clock.now += 601
+    refresh = Fetcher("rain")
+    assert cache.get("weather", "paris", refresh) == "sunny"
+    wait_for_refresh(cache)
+    assert refresh.calls == 1
+    assert cache.get("weather", "paris", Fetcher()) == "rain"
+    assert cache.stats()["weather"]["stale"] == 1
+
+
+def test_expired_entries_are_fetched_again(cache, clock):
+    cache.get("weather", "paris", Fetcher("sunny"))
+    clock.now += 600 * cache.stale_factor
+    fetch = Fetcher("snow")
+    assert cache.get("weather", "paris", fetch) == "snow"
+    assert fetch.calls == 1
+    assert cache.lookup("weather", "paris") == "snow"
+
+
+def test_least_recently_used_entries_are_evicted(clock):
+    cache = ResponseCache({"weather": 600}, max_entries=2, clock=clock)
+    cache.put("weather", "paris", "sunny")
+    cache.put("weather", "oslo", "snow")
+    assert cache.lookup("weather", "paris") == "sunny"
+    cache.put("weather", "rome", "hot")
+    assert cache.lookup("weather", "oslo") is None
+    assert cache.lookup("weather", "paris") == "sunny"
+    assert cache.lookup("weather", "rome") == "hot"
+
+
+def test_entries_are_reloaded_from_sqlite(tmp_path, clock):
+    path = str(tmp_path / "responses.sqlite")
+    ResponseCache({"weather": 600}, path=path, clock=clock).put("weather", "paris", "sunny")
+
+    reloaded = ResponseCache({"weather": 600}, path=path, clock=clock)
+    fetch = Fetcher("rain")
+    assert reloaded.get("weather", "paris", fetch) == "sunny"
+    assert fetch.calls == 0
+    # The original fetch time survives the restart
+    clock.now += 600 * reloaded.stale_factor
+    assert reloaded.get("weather", "paris", fetch) == "rain"
+
+
+def test_evicted_entries_are_reloaded_from_sqlite(tmp_path, clock):
+    cache = ResponseCache({"weather": 600}, max_entries=1, path=str(tmp_path / "responses.sqlite"), clock=clock)
+    cache.put("weather", "paris", "sunny")
+    cache.put("weather", "oslo", "snow")
+    assert ("weather", "paris") not in cache.memory
+    assert cache.lookup("weather", "paris") == "sunny"
+
+
+def test_failed_fetches_are_not_cached(cache):
+    fetch = Fetcher(None, RuntimeError("upstream down"), "sunny")
+    assert cache.get("weather", "paris", fetch) is None
+    with pytest.raises(RuntimeError):
+        cache.get("weather", "paris", fetch)
+    assert cache.get("weather", "paris", fetch) == "sunny"
+    assert fetch.calls == 3
+
+
+def test_failed_refresh_keeps_the_stale_entry(cache, clock):
+    cache.get("weather", "paris", Fetcher("sunny"))
+    clock.now += 601
+    assert cache.get("weather", "paris", Fetcher(RuntimeError("upstream down"))) == "sunny"
+    wait_for_refresh(cache)
+    assert cache.get("weather", "paris", Fetcher(None)) == "sunny"
+
+
+def test_sources_without_a_ttl_are_never_cached(cache):
+    fetch = Fetcher("42", "43")
+    assert cache.get("wolfram", "answer", fetch) == "42"
+    assert cache.get("wolfram", "answer", fetch) == "43"
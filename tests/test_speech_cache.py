@@ -0,0 +1,46 @@
+import pytest
+
+from jarvis import SpeechCache
+
+
+def render_bytes(size):
+    def render(path):
+        with open(path, 'wb') as f:
+            f.write(b"\0" * size)
+    return render
+
+
+def test_hits_skip_rendering(tmp_path):
+    cache = SpeechCache(str(tmp_path), max_bytes=1000)
+    first = cache.get("hello", "en", 1.0, render_bytes(100))
+    assert cache.get("hello", "en", 1.0, lambda path: pytest.fail("rendered twice")) == first
+    assert cache.stats()["hits"] == 1
+
+
+def test_least_recently_used_clips_are_evicted(tmp_path):
+    cache = SpeechCache(str(tmp_path), max_bytes=250)
+    old = cache.get("one", "en", 1.0, render_bytes(100))
+    cache.get("two", "en", 1.0, render_bytes(100))
+    cache.get("three", "en", 1.0, render_bytes(100))
+    assert not old.exists()
+    assert cache.stats()["bytes"] == 200
+
+
+def test_failed_render_leaves_no_partial_file(tmp_path):
+    cache = SpeechCache(str(tmp_path), max_bytes=1000)
+
+    def fail(path):
+        with open(path, 'wb') as f:
+            f.write(b"\0" * 10)
+        raise ConnectionError("gTTS unreachable")
+
+    with pytest.raises(ConnectionError):
+        cache.get("hello", "en", 1.0, fail)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_stray_partial_files_are_removed_on_load(tmp_path):
+    (tmp_path / "abc.123.part").write_bytes(b"\0" * 10)
+    cache = SpeechCache(str(tmp_path), max_bytes=1000)
+    assert list(tmp_path.iterdir()) == []
+    assert cache.stats()["bytes"] == 0
@@ -0,0 +1,44 @@
+import os
+
+import pytest
+
+from jarvis import VoiceActivityDetector, WakeWordGate
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def fixture(*parts):
+    return WakeWordGate.read_wav(os.path.join(FIXTURES, *parts))
+
+
+@pytest.mark.parametrize("name, speech", [
+    ("silence.wav", False),
+    ("hum.wav", False),
+    ("click.wav", False),
+    ("voiced.wav", True),
+])
+def test_vad_decisions(name, speech):
+    samples, rate = fixture("vad", name)
+    assert VoiceActivityDetector().is_speech(samples, rate) == speech
+
+
+@pytest.fixture(scope="module")
+def gate():
+    gate = WakeWordGate(os.path.join(FIXTURES, "wake_word", "templates"))
+    assert len(gate.templates) == 3
+    return gate
+
+
+@pytest.mark.parametrize("name", sorted(os.listdir(os.path.join(FIXTURES, "wake_word", "positives"))))
+def test_wake_word_detected(gate, name):
+    samples, rate = fixture("wake_word", "positives", name)
+    end = gate.detect(samples, rate)
+    assert end is not None
+    # The command after the wake word is what reaches the recognizer
+    assert gate.vad.is_speech(samples[end:], rate)
+
+
+@pytest.mark.parametrize("name", sorted(os.listdir(os.path.join(FIXTURES, "wake_word", "negatives"))))
+def test_wake_word_rejected(gate, name):
+    samples, rate = fixture("wake_word", "negatives", name)
+    assert not gate.vad.is_speech(samples, rate) or gate.detect(samples, rate) is None